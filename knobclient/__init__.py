@@ -10,7 +10,22 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
-import pbr.version
+import sys
 
 
-__version__ = pbr.version.VersionInfo('python-knobclient').version_string()
+def _version():
+    import pbr.version
+    return pbr.version.VersionInfo('python-knobclient').version_string()
+
+
+if sys.version_info >= (3, 7):
+    # Resolving the version is slow, so do it on first access only.
+    def __getattr__(name):
+        if name == '__version__':
+            global __version__
+            __version__ = _version()
+            return __version__
+        raise AttributeError("module %r has no attribute %r"
+                             % (__name__, name))
+else:
+    __version__ = _version()
@@ -0,0 +1,108 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""asyncio interface to the Knob API.
+
+The keystoneauth session the client is built on is blocking, so every call
+is run on a private thread pool and awaited from the event loop.  Requests
+go through the same :class:`knobclient.client._HTTPClient` as the blocking
+client, which keeps error mapping and header handling identical.
+"""
+
+import asyncio
+from concurrent import futures
+import functools
+import logging
+
+from knobclient import client
+
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class _AsyncManager(object):
+    """Exposes the public methods of a blocking manager as coroutines."""
+
+    def __init__(self, manager, executor):
+        self._manager = manager
+        self._executor = executor
+
+    def __getattr__(self, name):
+        attr = getattr(self._manager, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(attr, *args, **kwargs))
+        return call
+
+
+class AsyncGatesManager(_AsyncManager):
+    """Coroutine version of :class:`knobclient.v1.gates.GatesManager`."""
+
+
+class AsyncTargetsManager(_AsyncManager):
+    """Coroutine version of :class:`knobclient.v1.targets.TargetsManager`."""
+
+
+class AsyncServiceManager(_AsyncManager):
+    """Coroutine version of :class:`knobclient.v1.services.ServiceManager`."""
+
+
+class AsyncClient(object):
+
+    def __init__(self, session=None, *args, **kwargs):
+        """
+        Knob client object whose manager methods are coroutines.
+
+        Takes the same arguments as :class:`knobclient.client.Client`, plus:
+
+        :param max_concurrency: Maximum number of requests in flight at
+            once.  Defaults to 100, and is the default `pool_maxsize`.
+        """
+        LOG.debug("Creating AsyncClient object")
+        max_concurrency = kwargs.pop('max_concurrency',
+                                     DEFAULT_MAX_CONCURRENCY)
+        kwargs.setdefault('pool_maxsize', max_concurrency)
+        self._client = client.Client(session, *args, **kwargs)
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=max_concurrency)
+
+        self.gates = AsyncGatesManager(self._client.gates, self._executor)
+        self.targets = AsyncTargetsManager(self._client.targets,
+                                           self._executor)
+        self.services = AsyncServiceManager(self._client.services,
+                                            self._executor)
+
+    def add_request_hook(self, on_start=None, on_end=None):
+        """See :meth:`knobclient.client.Client.add_request_hook`."""
+        return self._client.add_request_hook(on_start, on_end)
+
+    def remove_request_hook(self, hook):
+        self._client.remove_request_hook(hook)
+
+    async def close(self):
+        """Waits for requests in flight and releases the thread pool."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
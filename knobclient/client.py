@@ -13,13 +13,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
+import copy
+import hashlib
 import logging
 import os
+import time
+import zlib
 
 from keystoneauth1 import adapter
+from keystoneauth1 import exceptions as ks_exceptions
 from keystoneauth1 import session as ks_session
-from oslo_serialization import jsonutils
-
+import requests
+from urllib3.util import request as urllib3_request
+
+from knobclient.common import cache as response_cache
+from knobclient.common import codec
+from knobclient.common import metrics
+from knobclient.common import jsonstream
+from knobclient.common import retry
 from knobclient.v1 import targets
 from knobclient.v1 import gates
 from knobclient.v1 import services
@@ -30,6 +42,60 @@ LOG = logging.getLogger(__name__)
 _DEFAULT_SERVICE_TYPE = 'ssh'
 _DEFAULT_SERVICE_INTERFACE = 'public'
 _DEFAULT_API_VERSION = 'v1'
+# Prefix of the validators get_if_changed makes from a body digest.
+_DIGEST_VALIDATOR = 'sha1:'
+# Request bodies that fit in one TCP segment gain nothing from compression.
+DEFAULT_COMPRESS_THRESHOLD = 1400
+# Response encodings asked for, best first.  urllib3 decodes them, and
+# zstd only when the zstandard module is installed.
+_ACCEPT_ENCODING = ', '.join(
+    encoding for encoding in ('zstd', 'gzip', 'deflate')
+    if encoding in urllib3_request.ACCEPT_ENCODING.split(','))
+
+
+# Identity headers sent with every request: header name, _HTTPClient
+# argument and the environment variable used when the argument is not given.
+_IDENTITY_HEADERS = (
+    ('X-Project-Name', 'project_name', 'OS_PROJECT_NAME'),
+    ('X-User-Name', 'user_name', 'OS_USERNAME'),
+    ('X-User-Domain-Id', 'user_domain_id', 'OS_USER_DOMAIN_ID'),
+    ('X-Project-Domain-Id', 'project_domain_id', 'OS_PROJECT_DOMAIN_ID'),
+)
+
+_JSON_HEADERS = (('Content-Type', 'application/json'),
+                 ('Accept', 'application/json'))
+_METHOD_HEADERS = {
+    'GET': _JSON_HEADERS,
+    'POST': _JSON_HEADERS,
+    'DELETE': (('Content-Type', 'application/octet-stream'),),
+}
+
+
+def _gzip(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _configure_pool(session, pool_connections=None, pool_maxsize=None,
+                    pool_block=False):
+    """Replaces the session's connection pools with sized ones.
+
+    :param pool_connections: number of per-host pools kept
+    :param pool_maxsize: connections kept open per host
+    :param pool_block: wait for a free connection instead of opening one
+        that is discarded afterwards
+    """
+    if not (pool_connections or pool_maxsize):
+        return
+    default = requests.adapters.DEFAULT_POOLSIZE
+    pool_kwargs = {
+        'pool_connections': pool_connections or default,
+        'pool_maxsize': pool_maxsize or default,
+        'pool_block': pool_block,
+    }
+    for scheme in ('https://', 'http://'):
+        session.session.mount(scheme,
+                              ks_session.TCPKeepAliveAdapter(**pool_kwargs))
 
 
 class _HTTPClient(adapter.Adapter):
@@ -39,6 +105,31 @@ class _HTTPClient(adapter.Adapter):
         kwargs.setdefault('service_type', _DEFAULT_SERVICE_TYPE)
         kwargs.setdefault('version', _DEFAULT_API_VERSION)
         endpoint = kwargs.pop('endpoint', None)
+        identity = dict((arg, kwargs.pop(arg, None))
+                        for _header, arg, _env in _IDENTITY_HEADERS)
+        cache = kwargs.pop('cache', None)
+        cache_ttl = kwargs.pop('cache_ttl', None)
+        cache_size = kwargs.pop('cache_size',
+                                response_cache.DEFAULT_MAX_ENTRIES)
+        self.retry_policy = retry.RetryPolicy(
+            retries=kwargs.pop('retries', 0) or 0,
+            backoff=kwargs.pop('retry_backoff', retry.DEFAULT_BACKOFF),
+            max_backoff=kwargs.pop('retry_max_backoff',
+                                   retry.DEFAULT_MAX_BACKOFF))
+        circuit_threshold = kwargs.pop('circuit_failure_threshold', None)
+        circuit_reset = kwargs.pop('circuit_reset_timeout',
+                                   retry.DEFAULT_RESET_TIMEOUT)
+        _configure_pool(session,
+                        pool_connections=kwargs.pop('pool_connections', None),
+                        pool_maxsize=kwargs.pop('pool_maxsize', None),
+                        pool_block=kwargs.pop('pool_block', False))
+        keep_alive = kwargs.pop('keep_alive', True)
+        connect_timeout = kwargs.pop('connect_timeout', None)
+        read_timeout = kwargs.pop('read_timeout', None)
+        compression = kwargs.pop('compression', True)
+        self.codec = codec.get_codec(kwargs.pop('json_codec', None))
+        self.compress_threshold = kwargs.pop('compress_threshold',
+                                             DEFAULT_COMPRESS_THRESHOLD)
 
         super(_HTTPClient, self).__init__(session, **kwargs)
 
@@ -51,55 +142,368 @@ class _HTTPClient(adapter.Adapter):
             # If provided we'll include the project ID in all requests.
             self._default_headers = {'X-Project-Id': project_id}
 
-    def request(self, *args, **kwargs):
+        # Identity headers are resolved once per client; the per-method
+        # templates are immutable and only copied when a request is sent.
+        identity_headers = []
+        for header, arg, env in _IDENTITY_HEADERS:
+            value = identity[arg] or os.environ.get(env)
+            if value:
+                identity_headers.append((header, value))
+        if not keep_alive:
+            identity_headers.append(('Connection', 'close'))
+        # requests asks for gzip and deflate on its own; the header is set
+        # either way so that turning compression off does turn it off.
+        identity_headers.append(('Accept-Encoding', _ACCEPT_ENCODING
+                                 if compression else 'identity'))
+        if not compression:
+            self.compress_threshold = None
+        self._header_templates = dict(
+            (method, headers + tuple(identity_headers))
+            for method, headers in _METHOD_HEADERS.items())
+
+        # requests takes a (connect, read) tuple; a missing part falls back
+        # to the session timeout.
+        self._timeout = None
+        if connect_timeout is not None or read_timeout is not None:
+            default = session.timeout
+            self._timeout = (
+                default if connect_timeout is None else connect_timeout,
+                default if read_timeout is None else read_timeout)
+
+        if cache is True:
+            cache = response_cache.ResponseCache(ttl=cache_ttl,
+                                                 max_entries=cache_size)
+        self.cache = cache or None
+
+        # (on_start, on_end) pairs called with a metrics.RequestTiming;
+        # shared with the region copies.
+        self.request_hooks = []
+
+        # One breaker per client, i.e. per knob endpoint.
+        self.circuit = None
+        if circuit_threshold:
+            self.circuit = retry.CircuitBreaker(circuit_threshold,
+                                                circuit_reset)
+
+    @property
+    def project_id(self):
+        """The project requests are made in, None when it is not known."""
+        project_id = self._default_headers.get('X-Project-Id')
+        if project_id is None and (self.auth or self.session.auth):
+            project_id = self.get_project_id()
+        return project_id
+
+    def request(self, url, method, **kwargs):
+        # Given by _json_request, which times the request as a whole.
+        timing = kwargs.pop('timing', None)
+        if timing is not None or not self.request_hooks:
+            return self._send(url, method, timing, **kwargs)
+        with self._timed(url, method) as timing:
+            return self._send(url, method, timing, **kwargs)
+
+    def _send(self, url, method, timing, **kwargs):
         headers = kwargs.setdefault('headers', {})
         headers.update(self._default_headers)
 
         # Set raise_exc=False by default so that we handle request exceptions
         kwargs.setdefault('raise_exc', False)
-        
-        resp = super(_HTTPClient, self).request(*args, **kwargs)
-        self._check_status_code(resp)
-        return resp
-
-    def get(self, *args, **kwargs):
-        headers = kwargs.setdefault('headers', {})
-        headers.setdefault('Content-Type', 'application/json')
-        headers.setdefault('Accept', 'application/json')
-        headers.setdefault('X-Project-Name', os.environ['OS_PROJECT_NAME'])
-        headers.setdefault('X-User-Name', os.environ['OS_USERNAME'])
-        headers.setdefault('X-User-Domain-Id', os.environ['OS_USER_DOMAIN_ID'])
-        headers.setdefault('X-Project-Domain-Id', os.environ['OS_PROJECT_DOMAIN_ID'])
-
-        return super(_HTTPClient, self).get(*args, **kwargs).json()
-
-    def post(self, *args, **kwargs):
-        #path = self._fix_path(path)
-        headers = kwargs.setdefault('headers', {})
-        headers.setdefault('Content-Type', 'application/json')
-        headers.setdefault('Accept', 'application/json')
-        headers.setdefault('X-Project-Name', os.environ['OS_PROJECT_NAME'])
-        headers.setdefault('X-User-Name', os.environ['OS_USERNAME'])
-        headers.setdefault('X-User-Domain-Id', os.environ['OS_USER_DOMAIN_ID'])
-        headers.setdefault('X-Project-Domain-Id', os.environ['OS_PROJECT_DOMAIN_ID'])
-
+        if self._timeout is not None:
+            kwargs.setdefault('timeout', self._timeout)
+
+        if timing is not None:
+            self._time_auth(timing)
+            timing.request_bytes = len(kwargs.get('data') or b'')
+
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            if self.circuit is not None and not self.circuit.allow():
+                policy.count('circuit_rejected')
+                raise exceptions.CircuitOpenError(
+                    'Circuit open for %s, not sending %s %s'
+                    % (self.endpoint_override or self.service_type,
+                       method, url))
+            policy.count('attempts')
+            sent_at = time.time()
+            try:
+                resp = super(_HTTPClient, self).request(url, method,
+                                                        **kwargs)
+            except ks_exceptions.ConnectionError as e:
+                if timing is not None:
+                    timing.attempts += 1
+                    timing.add('wait', time.time() - sent_at)
+                self._record_failure()
+                if not policy.should_retry(method, attempt):
+                    if attempt:
+                        policy.count('gave_up')
+                    raise
+                delay = policy.delay(attempt)
+                LOG.warning('%s %s failed (%s), retrying in %.2fs',
+                            method, url, e, delay)
+            except Exception:
+                # Not a failure of the endpoint, but it must not keep a
+                # half-open circuit waiting for the result of its trial.
+                if self.circuit is not None:
+                    self.circuit.release()
+                raise
+            else:
+                status = resp.status_code or 0
+                if not status or status >= 500:
+                    self._record_failure()
+                elif self.circuit is not None:
+                    self.circuit.record_success()
+                if timing is not None:
+                    self._time_response(timing, resp, sent_at,
+                                        kwargs.get('stream'))
+                if status < 400 or not policy.should_retry(
+                        method, attempt, status):
+                    if attempt and not 0 < status < 400:
+                        policy.count('gave_up')
+                    self._check_status_code(resp)
+                    return resp
+                delay = policy.delay(attempt, resp)
+                LOG.warning('%s %s returned %s, retrying in %.2fs',
+                            method, url, status, delay)
+            policy.count('retries')
+            attempt += 1
+            time.sleep(delay)
+            if timing is not None:
+                timing.add('backoff', delay)
+
+    @contextlib.contextmanager
+    def _timed(self, url, method):
+        """Runs the request hooks around a request.
+
+        Yields the metrics.RequestTiming to fill in.
+        """
+        timing = metrics.RequestTiming(method, url)
+        self._call_hooks(0, timing)
+        try:
+            yield timing
+        except Exception as e:
+            timing.error = e
+            raise
+        finally:
+            timing.elapsed = time.time() - timing.started_at
+            self._call_hooks(1, timing)
+
+    def _call_hooks(self, index, timing):
+        for hook in list(self.request_hooks):
+            if hook[index] is None:
+                continue
+            try:
+                hook[index](timing)
+            except Exception:
+                # A broken hook must not fail the request it observes.
+                LOG.exception('Request hook %r failed', hook[index])
+
+    def _time_auth(self, timing):
+        """Gets the token ahead of the request, timing it.
+
+        The session reuses it when sending, so the wait phase does not
+        include authentication.
+        """
+        auth = self.auth or self.session.auth
+        if auth is None:
+            return
+        start = time.time()
+        self.session.get_auth_headers(auth)
+        timing.add('auth', time.time() - start)
+
+    @staticmethod
+    def _time_response(timing, resp, sent_at, stream):
+        total = time.time() - sent_at
+        # requests measures up to the response headers; the rest of the
+        # call is reading the body, unless it is streamed.
+        wait = min(total, resp.elapsed.total_seconds())
+        timing.attempts += 1
+        timing.add('wait', wait)
+        timing.add('read', total - wait)
+        timing.status = resp.status_code
+        length = resp.headers.get('Content-Length')
+        if length is not None:
+            timing.response_bytes = int(length)
+        elif not stream:
+            timing.response_bytes = len(resp.content)
+
+    def _record_failure(self):
+        if self.circuit is not None and self.circuit.record_failure():
+            self.retry_policy.count('circuit_opened')
+            LOG.warning('Circuit opened after %d consecutive failures',
+                        self.circuit.failure_threshold)
+
+    def get(self, url, **kwargs):
+        return self._json_request(url, 'GET', **kwargs)
+
+    def get_if_changed(self, url, validator=None):
+        """GETs url, decoding the body only when it has changed.
+
+        `validator` is the one returned by the previous call for url: the
+        response ETag, sent as If-None-Match, or a digest of the body when
+        the server sends no ETag.  The response cache is not used.
+
+        :returns: (body, validator), where body is None when unchanged
+        """
+        headers = dict(self._header_templates['GET'])
+        if validator and not validator.startswith(_DIGEST_VALIDATOR):
+            headers['If-None-Match'] = validator
+        resp = self.request(url, 'GET', headers=headers)
+        if resp.status_code == 304:
+            return None, validator
+        content = resp.content
+        new_validator = resp.headers.get('ETag') or (
+            _DIGEST_VALIDATOR + hashlib.sha1(content).hexdigest())
+        if new_validator == validator:
+            return None, validator
+        return self._decode(content), new_validator
+
+    def get_stream(self, url, key=None):
+        """GETs a collection and returns an iterator over its items.
+
+        Items are decoded one at a time as the body is received, so the
+        body is never held in memory as a whole.  The response cache is
+        not used.
+
+        :param key: member of the body holding the items, None when the
+            body is the array itself
+        """
+        headers = dict(self._header_templates['GET'])
+        resp = self.request(url, 'GET', headers=headers, stream=True)
+
+        def items():
+            try:
+                for item in jsonstream.iter_array(
+                        resp.iter_content(jsonstream.CHUNK_SIZE), key):
+                    yield item
+            finally:
+                resp.close()
+        return items()
+
+    def post(self, url, **kwargs):
+        return self._json_request(url, 'POST', **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._json_request(url, 'DELETE', **kwargs)
+
+    def _json_request(self, url, method, **kwargs):
+        """Sends a request with the method's header template.
+
+        Headers given by the caller take precedence over the template.
+        GET responses are served from the cache when one is configured,
+        and any other method invalidates what it may have changed.
+        Returns the decoded JSON body, or None when the body is empty.
+        """
+        headers = dict(self._header_templates[method])
+        if kwargs.get('headers'):
+            headers.update(kwargs['headers'])
+        kwargs['headers'] = headers
 
+        plain = None
         if 'data' in kwargs:
-            kwargs['data'] = jsonutils.dumps(kwargs['data'])
+            kwargs['data'] = self.codec.dumps(kwargs['data'])
+            threshold = self.compress_threshold
+            if threshold is not None and len(kwargs['data']) >= threshold:
+                plain = kwargs['data']
+                kwargs['data'] = _gzip(plain)
+                headers['Content-Encoding'] = 'gzip'
+
+        cache = self.cache if method == 'GET' else None
+        if cache is not None and cache.cacheable(url):
+            content, etag = cache.lookup(url)
+            if content is not None:
+                return self._decode(content)
+            if etag is not None:
+                headers['If-None-Match'] = etag
+        else:
+            cache = None
 
-        return super(_HTTPClient, self).post(*args, **kwargs).json()
+        if not self.request_hooks:
+            return self._exchange(url, method, None, cache, plain, **kwargs)
+        with self._timed(url, method) as timing:
+            return self._exchange(url, method, timing, cache, plain,
+                                  **kwargs)
+
+    def _exchange(self, url, method, timing, cache, plain, **kwargs):
+        """Sends a request prepared by _json_request, decoding the body."""
+        headers = kwargs['headers']
+        try:
+            resp = self.request(url, method, timing=timing, **kwargs)
+        except exceptions.HTTPClientError as e:
+            if plain is None or e.status_code not in (400, 415):
+                raise
+            del headers['Content-Encoding']
+            kwargs['data'] = plain
+            resp = self.request(url, method, timing=timing, **kwargs)
+            # Only once the plain body went through is the compression
+            # known to be what the server rejected.
+            LOG.warning('Server rejected a gzip request body, sending '
+                        'request bodies uncompressed from now on')
+            self.compress_threshold = None
+        content = resp.content
+        if cache is not None:
+            if resp.status_code == 304:
+                content = cache.renew(url)
+                if content is None:
+                    # Evicted while revalidating, fetch it again.
+                    del headers['If-None-Match']
+                    return self._exchange(url, method, timing, cache, plain,
+                                          **kwargs)
+            else:
+                cache.store(url, content, resp.headers.get('ETag'))
+        elif method != 'GET' and self.cache is not None:
+            self.cache.invalidate(url)
+        if timing is None:
+            return self._decode(content)
+        start = time.time()
+        body = self._decode(content)
+        timing.add('decode', time.time() - start)
+        return body
+
+    def _decode(self, content):
+        if not content:
+            return None
+        return self.codec.loads(content)
+
+    def for_region(self, region_name, timeout=None):
+        """Returns a copy of this client bound to another region.
+
+        The copy shares the session and retry policy but has its own
+        circuit breaker and no response cache, since cached URLs do not
+        carry the region.
+
+        :param timeout: request timeout of the copy, in seconds
+        :raises ValueError: when the endpoint is overridden, as the copy
+            would send its requests to that same endpoint
+        """
+        if self.endpoint_override:
+            raise ValueError('The endpoint is set to %s, it cannot be '
+                             'looked up in region %s'
+                             % (self.endpoint_override, region_name))
+        http = copy.copy(self)
+        http.region_name = region_name
+        http.cache = None
+        if self.circuit is not None:
+            http.circuit = retry.CircuitBreaker(self.circuit.failure_threshold,
+                                                self.circuit.reset_timeout)
+        if timeout is not None:
+            http._timeout = timeout
+        return http
+
+    def regions(self):
+        """Returns the regions with a knob endpoint in the catalog."""
+        auth = self.auth or self.session.auth
+        if auth is None:
+            return []
+        catalog = auth.get_access(self.session).service_catalog
+        endpoints = catalog.get_endpoints(service_type=self.service_type,
+                                          interface=self.interface)
+        regions = []
+        for endpoint in endpoints.get(self.service_type, []):
+            region = endpoint.get('region_id') or endpoint.get('region')
+            if region and region not in regions:
+                regions.append(region)
+        return regions
 
-    def delete(self, *args, **kwargs):
-        headers = kwargs.setdefault('headers', {})
-        headers.setdefault('Content-Type', 'application/octet-stream')
-        headers.setdefault('X-Project-Name', os.environ['OS_PROJECT_NAME'])
-        headers.setdefault('X-User-Name', os.environ['OS_USERNAME'])
-        headers.setdefault('X-User-Domain-Id', os.environ['OS_USER_DOMAIN_ID'])
-        headers.setdefault('X-Project-Domain-Id', os.environ['OS_PROJECT_DOMAIN_ID'])
-
-        
-        return super(_HTTPClient, self).delete(*args, **kwargs).json()
-        
     def _fix_path(self, path):
         if not path[-1] == '/':
             path += '/'
@@ -110,28 +514,18 @@ class _HTTPClient(adapter.Adapter):
 
     def _check_status_code(self, resp):
         status = resp.status_code
-        LOG.debug('Response status {0}'.format(status))
+        LOG.debug('Response status %s', status)
+        if status and status < 400:
+            return
+        message = '{0}'.format(self._get_error_message(resp))
         if status == 401:
-            LOG.error('Auth error: {0}'.format(self._get_error_message(resp)))
-            raise exceptions.HTTPAuthError(
-                '{0}'.format(self._get_error_message(resp))
-            )
+            LOG.error('Auth error: %s', message)
+            raise exceptions.HTTPAuthError(message)
         if not status or status >= 500:
-            LOG.error('5xx Server error: {0}'.format(
-                self._get_error_message(resp)
-            ))
-            raise exceptions.HTTPServerError(
-                '{0}'.format(self._get_error_message(resp)),
-                status
-            )
-        if status >= 400:
-            LOG.error('4xx Client error: {0}'.format(
-                self._get_error_message(resp)
-            ))
-            raise exceptions.HTTPClientError(
-                '{0}'.format(self._get_error_message(resp)),
-                status
-            )
+            LOG.error('5xx Server error: %s', message)
+            raise exceptions.HTTPServerError(message, status)
+        LOG.error('4xx Client error: %s', message)
+        raise exceptions.HTTPClientError(message, status)
 
     def _get_error_message(self, resp):
         try:
@@ -180,6 +574,51 @@ class Client(object):
             authenticated keystone session. Defaults to 'public'.
         :param region_name: Used as an endpoint filter when using an
             authenticated keystone session.
+        :param project_name: Sent as X-Project-Name. Defaults to
+            env[OS_PROJECT_NAME].
+        :param user_name: Sent as X-User-Name. Defaults to env[OS_USERNAME].
+        :param user_domain_id: Sent as X-User-Domain-Id. Defaults to
+            env[OS_USER_DOMAIN_ID].
+        :param project_domain_id: Sent as X-Project-Domain-Id. Defaults to
+            env[OS_PROJECT_DOMAIN_ID].
+        :param cache: True, or a
+            :class:`knobclient.common.cache.ResponseCache`, to cache gate,
+            target and key reads.  Writes through this client invalidate
+            the affected entries.  Disabled by default.
+        :param cache_ttl: Mapping of resource type ('gates', 'targets',
+            'keys') to the seconds its responses are served from the cache
+            before being revalidated.
+        :param cache_size: Maximum number of cached responses.
+        :param retries: Number of times a failed idempotent request, or a
+            request rejected with 429, is retried.  Defaults to 0.
+        :param retry_backoff: Delay before the first retry in seconds; it
+            doubles with each retry and is randomized (full jitter).
+            Retry-After on 429 and 503 responses takes precedence.
+        :param retry_max_backoff: Upper bound of a retry delay in seconds.
+        :param circuit_failure_threshold: Number of consecutive 5xx
+            responses or connection failures after which requests to the
+            endpoint fail fast with CircuitOpenError.  Disabled by default.
+        :param circuit_reset_timeout: Seconds the circuit stays open
+            before a trial request is let through.
+        :param pool_connections: Number of per-host connection pools the
+            session keeps.  Applies to a given session as well.
+        :param pool_maxsize: Maximum number of connections kept open to
+            one host; size it to the number of threads sharing the client.
+        :param pool_block: When all pooled connections are busy, wait for
+            one instead of opening an extra connection.  Defaults to False.
+        :param keep_alive: Reuse connections between requests.  Defaults
+            to True; False sends 'Connection: close'.
+        :param connect_timeout: Seconds to wait for a connection.
+        :param read_timeout: Seconds to wait for the server to respond.
+        :param compression: Ask for compressed responses (zstd when the
+            zstandard module is installed, gzip or deflate) and compress
+            large request bodies.  Defaults to True.
+        :param compress_threshold: Size in bytes from which request bodies
+            are sent gzip compressed; None to never compress them.  A
+            server rejecting them gets uncompressed bodies from then on.
+        :param json_codec: JSON library bodies are encoded and decoded
+            with: 'orjson', 'ujson' or 'json'.  Defaults to the first of
+            these installed, see :mod:`knobclient.common.codec`.
         """
         LOG.debug("Creating Client object")
 
@@ -197,7 +636,27 @@ class Client(object):
 
         httpclient = _HTTPClient(session=session, *args, **kwargs)
 
+        self.cache = httpclient.cache
+        self.retry_metrics = httpclient.retry_policy.metrics
+        self._request_hooks = httpclient.request_hooks
         self.gates = gates.GatesManager(httpclient)
         self.targets = targets.TargetsManager(httpclient)
         self.services = services.ServiceManager(httpclient)
-        
\ No newline at end of file
+
+    def add_request_hook(self, on_start=None, on_end=None):
+        """Calls `on_start` and `on_end` around every HTTP request.
+
+        Both get the :class:`knobclient.common.metrics.RequestTiming` of
+        the request, with its method, URL template, status, sizes and
+        phase timings filled in by the time `on_end` is called.  Hooks run
+        in the thread sending the request and their errors are logged,
+        not raised.
+
+        :returns: the hook, to give to `remove_request_hook`
+        """
+        hook = (on_start, on_end)
+        self._request_hooks.append(hook)
+        return hook
+
+    def remove_request_hook(self, hook):
+        self._request_hooks.remove(hook)
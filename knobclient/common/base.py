@@ -0,0 +1,130 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Base class of the resources returned by the managers."""
+
+try:
+    from collections import abc as collections_abc
+except ImportError:
+    import collections as collections_abc
+
+
+class Resource(collections_abc.MutableMapping):
+    """An API record, usable both as an object and as a dict.
+
+    The fields a resource type is known to have are listed in `FIELDS`
+    and kept in slots, so subclasses set `__slots__ = FIELDS`; any other
+    field the server sends goes to a small dict that only exists when
+    needed.  Dict access only ever sees what the server returned.
+    Attribute access to a known field the record lacks fetches the full
+    record once, see `_load_details`.
+
+    :param manager: manager the resource was returned by
+    :param info: the record as decoded from the response
+    :param loaded: whether `info` is already the full record
+    """
+
+    FIELDS = ()
+    __slots__ = ('_manager', '_extra', '_loaded')
+
+    def __init__(self, manager, info, loaded=False):
+        self._manager = manager
+        self._loaded = loaded
+        fields = self.FIELDS
+        extra = None
+        for key, value in info.items():
+            if key in fields:
+                object.__setattr__(self, key, value)
+            elif extra is None:
+                extra = {key: value}
+            else:
+                extra[key] = value
+        self._extra = extra
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                # Bypasses __getattr__, so that no details are loaded.
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            object.__setattr__(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            try:
+                object.__delattr__(self, key)
+                return
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if self._has(field):
+                yield field
+        if self._extra is not None:
+            for key in self._extra:
+                yield key
+
+    def __len__(self):
+        count = sum(1 for field in self.FIELDS if self._has(field))
+        return count + len(self._extra or ())
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return self._has(key)
+        return self._extra is not None and key in self._extra
+
+    def __getattr__(self, name):
+        # Only called for names normal lookup did not find: unset known
+        # fields and unknown fields.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in self.FIELDS:
+            if not self._loaded:
+                self._loaded = True
+                self._load_details()
+                if self._has(name):
+                    return object.__getattribute__(self, name)
+        elif self._extra is not None and name in self._extra:
+            return self._extra[name]
+        raise AttributeError("%s has no attribute %r"
+                             % (type(self).__name__, name))
+
+    def __repr__(self):
+        return '<%s %s>' % (type(self).__name__, dict(self))
+
+    def _has(self, field):
+        try:
+            object.__getattribute__(self, field)
+        except AttributeError:
+            return False
+        return True
+
+    def _load_details(self):
+        """Fills in the fields of the full record; no-op by default."""
+
+    def to_dict(self):
+        return dict(self)
@@ -0,0 +1,143 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Client-side cache of GET response bodies."""
+
+import collections
+import logging
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+
+# Seconds a cached body is served without asking the server.  Resource
+# types missing from the mapping are never cached.
+DEFAULT_TTL = {
+    'gates': 30,
+    'targets': 10,
+    'keys': 10,
+}
+
+_Entry = collections.namedtuple('_Entry', ['expires', 'etag', 'content'])
+
+
+def _split(url):
+    path = url.split('?', 1)[0]
+    return [part for part in path.split('/') if part]
+
+
+def resource_type(url):
+    """Returns the collection a URL points into.
+
+    '/gates?x=1' and '/gates/<id>' are 'gates', '/gates/<id>/keys' and
+    '/gates/<id>/keys/<key>' are 'keys'.
+    """
+    parts = _split(url)
+    if not parts:
+        return None
+    return parts[(len(parts) - 1) // 2 * 2]
+
+
+class ResponseCache(object):
+    """LRU cache of response bodies keyed by URL.
+
+    Entries younger than the TTL of their resource type are served as is.
+    Older entries that came with an ETag are revalidated with
+    If-None-Match; a 304 answer renews them.
+    """
+
+    def __init__(self, ttl=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = dict(DEFAULT_TTL)
+        if ttl:
+            self.ttl.update(ttl)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def cacheable(self, url):
+        return bool(self.ttl.get(resource_type(url)))
+
+    def lookup(self, url):
+        """Returns (content, etag) for url.
+
+        content is set only when the entry is fresh; etag is set when a
+        stale entry can be revalidated.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None, None
+            self._entries[url] = self._entries.pop(url)
+            if entry.expires > time.time():
+                self.hits += 1
+                return entry.content, None
+            if entry.etag is None:
+                del self._entries[url]
+                return None, None
+            return None, entry.etag
+
+    def store(self, url, content, etag=None):
+        """Caches a body fetched from the server, which counts as a miss."""
+        expires = time.time() + self.ttl.get(resource_type(url), 0)
+        with self._lock:
+            self.misses += 1
+            self._entries.pop(url, None)
+            self._entries[url] = _Entry(expires, etag, content)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def renew(self, url):
+        """Marks a stale entry fresh after a 304 and returns its content."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            self.revalidated += 1
+            self.hits += 1
+            expires = time.time() + self.ttl.get(resource_type(url), 0)
+            self._entries[url] = entry._replace(expires=expires)
+            return entry.content
+
+    def invalidate(self, url):
+        """Drops everything a write to url may have changed.
+
+        That is the resource itself, everything below it and the listing
+        of its collection, e.g. a write to '/gates/<id>/keys' drops
+        '/gates/<id>', '/gates/<id>/...' and '/gates?...'.
+        """
+        root = _split(url)[:2]
+        if not root:
+            return
+
+        def is_stale(key):
+            parts = _split(key)
+            return parts[:len(root)] == root or parts == root[:1]
+
+        with self._lock:
+            stale = [key for key in self._entries if is_stale(key)]
+            for key in stale:
+                del self._entries[key]
+        LOG.debug('Invalidated %d cached responses for %s', len(stale), url)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'revalidated': self.revalidated,
+                'entries': len(self._entries)}
@@ -0,0 +1,121 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""JSON codecs for request and response bodies.
+
+orjson and ujson are used when installed, the json module otherwise.
+Codecs decode straight from the response bytes and encode to bytes, and
+values JSON has no type for are converted with
+:func:`oslo_serialization.jsonutils.to_primitive`, as jsonutils.dumps does.
+"""
+
+import importlib
+import json
+
+from oslo_serialization import jsonutils
+
+# Codec names, in the order they are tried when none is chosen.
+CODECS = ('orjson', 'ujson', 'json')
+
+
+class Codec(object):
+    """Encodes and decodes JSON bodies with one library."""
+
+    name = None
+
+    def dumps(self, obj):
+        """Returns `obj` encoded as UTF-8 JSON bytes."""
+        raise NotImplementedError()
+
+    def loads(self, content):
+        """Decodes JSON bytes."""
+        raise NotImplementedError()
+
+
+class StdlibCodec(Codec):
+
+    name = 'json'
+
+    def dumps(self, obj):
+        return json.dumps(obj, default=jsonutils.to_primitive).encode('utf-8')
+
+    def loads(self, content):
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        return json.loads(content)
+
+
+class OrjsonCodec(Codec):
+
+    name = 'orjson'
+
+    def __init__(self):
+        self._orjson = importlib.import_module('orjson')
+        # Datetimes are left to to_primitive too, which formats them the
+        # way the other codecs do.
+        self._option = self._orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, default=jsonutils.to_primitive,
+                                  option=self._option)
+
+    def loads(self, content):
+        return self._orjson.loads(content)
+
+
+class UjsonCodec(Codec):
+
+    name = 'ujson'
+
+    def __init__(self):
+        self._ujson = importlib.import_module('ujson')
+
+    def dumps(self, obj):
+        # ujson escapes '/' and non-ASCII characters unless told not to.
+        return self._ujson.dumps(obj, ensure_ascii=False,
+                                 escape_forward_slashes=False,
+                                 default=jsonutils.to_primitive
+                                 ).encode('utf-8')
+
+    def loads(self, content):
+        return self._ujson.loads(content)
+
+
+_CLASSES = {'json': StdlibCodec, 'orjson': OrjsonCodec, 'ujson': UjsonCodec}
+_default = None
+
+
+def get_codec(name=None):
+    """Returns a codec by name, or the fastest one installed.
+
+    :param name: one of `CODECS`, a :class:`Codec`, or None
+    :raises ValueError: for an unknown name or a library not installed
+    """
+    global _default
+    if isinstance(name, Codec):
+        return name
+    if name is None:
+        if _default is None:
+            for candidate in CODECS:
+                try:
+                    _default = _CLASSES[candidate]()
+                    break
+                except ImportError:
+                    continue
+        return _default
+    if name not in _CLASSES:
+        raise ValueError('Unknown JSON codec %s, expected one of %s'
+                         % (name, ', '.join(CODECS)))
+    try:
+        return _CLASSES[name]()
+    except ImportError:
+        raise ValueError('JSON codec %s is not installed' % name)
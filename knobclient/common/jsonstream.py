@@ -0,0 +1,123 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Incremental decoding of the collection array of a JSON document.
+
+Only the array and the item being decoded are held in memory, so listing
+a large collection takes memory in proportion to one read chunk rather
+than to the whole response.
+"""
+
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _Reader(object):
+    """Text buffer filled from an iterable of byte chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Appends the next chunk, returns False at the end of the input."""
+        if self.eof:
+            return False
+        text = None
+        for chunk in self._chunks:
+            if chunk:
+                text = self._decoder.decode(chunk)
+                break
+        else:
+            self.eof = True
+            text = self._decoder.decode(b'', True)
+        # What was decoded already is dropped here, which keeps the buffer
+        # about one chunk long.
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return not self.eof or bool(text)
+
+    def peek(self):
+        """Returns the next character that is not whitespace."""
+        while True:
+            buffer = self.buffer
+            while self.pos < len(buffer) and buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(buffer):
+                return buffer[self.pos]
+            if not self.fill():
+                raise ValueError('Unexpected end of JSON document')
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError('Expected %r in JSON document, found %r'
+                             % (char, found))
+        self.pos += 1
+
+    def value(self, decoder):
+        """Decodes the next JSON value, reading as much as it needs."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self.fill():
+                    raise
+                continue
+            # A number at the end of the buffer may go on in the next chunk.
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(chunks, key=None):
+    """Yields the items of a JSON array as they are decoded.
+
+    :param chunks: iterable of the bytes of the document
+    :param key: member of the top-level object holding the array, or None
+        when the document is the array itself
+    :raises ValueError: for malformed documents
+    :raises KeyError: when the object has no `key` member
+    """
+    decoder = json.JSONDecoder()
+    reader = _Reader(chunks)
+    if key is not None:
+        reader.expect('{')
+        if reader.peek() == '}':
+            raise KeyError(key)
+        while True:
+            name = reader.value(decoder)
+            reader.expect(':')
+            if name == key:
+                break
+            reader.value(decoder)
+            if reader.peek() == '}':
+                raise KeyError(key)
+            reader.expect(',')
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value(decoder)
+        if reader.peek() == ']':
+            return
+        reader.expect(',')
@@ -0,0 +1,194 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Timing of the requests sent by the client.
+
+Hooks added with :meth:`knobclient.client.Client.add_request_hook` get a
+:class:`RequestTiming` when a request starts and again when it ends.
+:class:`LatencyHistogram` is such a hook, keeping latency percentiles for
+each method and URL template.
+"""
+
+import collections
+import json
+import math
+import threading
+import time
+
+# Phases of a request, in the order they happen.  `auth` is getting the
+# token, `wait` runs from sending the request to receiving the response
+# headers, `read` is receiving the body and `decode` parsing it; `backoff`
+# is the time slept between retries.
+PHASES = ('auth', 'wait', 'read', 'backoff', 'decode')
+
+PERCENTILES = (50, 95, 99)
+
+# Path segments that are part of the API rather than resource IDs.
+_LITERALS = frozenset(['batch'])
+
+
+def url_template(url):
+    """Returns the path of `url` with the resource IDs replaced by {id}.
+
+    Knob paths alternate collections and IDs, as in /gates/{id}/targets.
+    """
+    path = url.split('?', 1)[0]
+    parts = path.strip('/').split('/')
+    return '/' + '/'.join(
+        '{id}' if index % 2 and part not in _LITERALS else part
+        for index, part in enumerate(parts))
+
+
+class RequestTiming(object):
+    """What is known about a request, filled in as it goes.
+
+    :ivar method: HTTP method
+    :ivar url: URL as requested, relative to the endpoint
+    :ivar template: `url` with IDs replaced, see `url_template`
+    :ivar status: response status code, None when there was no response
+    :ivar attempts: number of times the request was sent
+    :ivar request_bytes: size of the request body as sent
+    :ivar response_bytes: size of the response body on the wire, from
+        Content-Length when given
+    :ivar phases: dict of phase name to seconds, see `PHASES`
+    :ivar started_at: time the request started, as time.time()
+    :ivar elapsed: seconds from start to end, None until it ended
+    :ivar error: exception the request failed with, if any
+    """
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+        self.template = url_template(url)
+        self.status = None
+        self.attempts = 0
+        self.request_bytes = 0
+        self.response_bytes = None
+        self.phases = dict((phase, 0.0) for phase in PHASES)
+        self.started_at = time.time()
+        self.elapsed = None
+        self.error = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds
+
+    def __repr__(self):
+        return '<RequestTiming %s %s %s %s>' % (
+            self.method, self.url, self.status, self.elapsed)
+
+
+class _Buckets(object):
+    """Counts of values in buckets growing by a constant ratio."""
+
+    def __init__(self, log_ratio):
+        self._log_ratio = log_ratio
+        self.counts = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        # Values below a microsecond all go to the first bucket.
+        self.counts[int(math.floor(
+            math.log(max(value, 1e-6)) / self._log_ratio))] += 1
+
+    def percentile(self, percent):
+        """Returns the upper bound of the bucket holding `percent`."""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * percent / 100.0)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.max, math.exp((index + 1) * self._log_ratio))
+        return self.max
+
+    def summary(self):
+        result = {'count': self.count,
+                  'mean': self.total / self.count if self.count else None,
+                  'max': self.max}
+        for percent in PERCENTILES:
+            result['p%d' % percent] = self.percentile(percent)
+        return result
+
+
+class LatencyHistogram(object):
+    """Request latencies for each method and URL template.
+
+    Latencies go into buckets `ratio` apart, so memory does not grow with
+    the number of requests and percentiles are within that ratio of the
+    exact value.  The phases of the requests are kept the same way.
+
+    Usable as a request hook: ``client.add_request_hook(
+    on_end=histogram.record)``.
+
+    :param ratio: ratio between the bounds of consecutive buckets
+    """
+
+    def __init__(self, ratio=1.05):
+        self._log_ratio = math.log(ratio)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def record(self, timing):
+        key = '%s %s' % (timing.method, timing.template)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'latency': _Buckets(self._log_ratio),
+                    'phases': dict((phase, _Buckets(self._log_ratio))
+                                   for phase in PHASES),
+                    'statuses': collections.Counter(),
+                    'errors': 0,
+                    'request_bytes': 0,
+                    'response_bytes': 0,
+                }
+            series['latency'].add(timing.elapsed)
+            for phase, seconds in timing.phases.items():
+                series['phases'][phase].add(seconds)
+            series['statuses'][str(timing.status)] += 1
+            series['errors'] += timing.error is not None
+            series['request_bytes'] += timing.request_bytes or 0
+            series['response_bytes'] += timing.response_bytes or 0
+
+    def summary(self):
+        """Returns a dict of 'METHOD template' to its statistics.
+
+        Latencies and phases are given in seconds, with count, mean, max
+        and the `PERCENTILES`; phases that took no time are left out.
+        """
+        with self._lock:
+            result = {}
+            for key, series in self._series.items():
+                result[key] = {
+                    'latency': series['latency'].summary(),
+                    'phases': dict(
+                        (phase, buckets.summary())
+                        for phase, buckets in series['phases'].items()
+                        if buckets.total),
+                    'statuses': dict(series['statuses']),
+                    'errors': series['errors'],
+                    'request_bytes': series['request_bytes'],
+                    'response_bytes': series['response_bytes'],
+                }
+            return result
+
+    def write(self, path):
+        """Writes the summary to `path` as JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+            f.write('\n')
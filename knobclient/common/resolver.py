@@ -0,0 +1,110 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Resolution of resource names to IDs."""
+
+import collections
+import threading
+import time
+
+from oslo_utils import uuidutils
+
+from knobclient import exc
+
+DEFAULT_TTL = 30
+
+
+class NameResolver(object):
+    """Maps the names of a collection to IDs with an index of its listing.
+
+    UUIDs are taken as IDs and returned without a request.  Other values
+    are looked up in the index, which is fetched on first use.  It is
+    fetched again only when a value is not in it, or once it is older
+    than `ttl` seconds.  Values found nowhere are returned unchanged, for
+    the API to decide on.
+
+    :param list_func: callable returning the items of the collection
+    :param id_key: item field holding the ID
+    :param name_key: item field holding the name
+    :param ttl: seconds the index is trusted for
+    """
+
+    def __init__(self, list_func, id_key='id', name_key='name',
+                 ttl=DEFAULT_TTL):
+        self.list_func = list_func
+        self.id_key = id_key
+        self.name_key = name_key
+        self.ttl = ttl
+        self._ids = set()
+        self._names = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._fetched_at = None
+
+    def resolve(self, value):
+        """Returns the ID of the item named or identified by `value`.
+
+        :raises knobclient.exc.NoUniqueMatch: when several items have the
+            name `value`
+        """
+        return self.resolve_all([value])[0]
+
+    def resolve_all(self, values):
+        """Returns the IDs of several `values`, see `resolve`.
+
+        The index is fetched at most once for all of them.
+        """
+        values = list(values)
+        names = set(value for value in values
+                    if not uuidutils.is_uuid_like(value))
+        found = {}
+        with self._lock:
+            fetched_at = self._fetched_at
+            if fetched_at is not None and time.time() - fetched_at < self.ttl:
+                self._lookup_all(names, found)
+            if len(found) < len(names):
+                self._refresh()
+                self._lookup_all(names, found)
+        return [found.get(value, value) for value in values]
+
+    def _refresh(self):
+        ids = set()
+        names = collections.defaultdict(list)
+        for item in self.list_func():
+            ids.add(item[self.id_key])
+            if item.get(self.name_key):
+                names[item[self.name_key]].append(item[self.id_key])
+        self._ids = ids
+        self._names = dict(names)
+        self._fetched_at = time.time()
+
+    def _lookup_all(self, values, found):
+        for value in values:
+            if value not in found:
+                match = self._lookup(value)
+                if match is not None:
+                    found[value] = match
+
+    def _lookup(self, value):
+        if value in self._ids:
+            return value
+        ids = self._names.get(value)
+        if not ids:
+            return None
+        if len(ids) > 1:
+            raise exc.NoUniqueMatch(
+                'Name %s is ambiguous, it matches %s'
+                % (value, ', '.join(sorted(ids))))
+        return ids[0]
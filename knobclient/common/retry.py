@@ -0,0 +1,153 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Retry policy and circuit breaker used by the HTTP client."""
+
+import collections
+import email.utils
+import logging
+import random
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30
+DEFAULT_RESET_TIMEOUT = 30
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+
+def parse_retry_after(value):
+    """Returns the seconds to wait from a Retry-After header, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    date = email.utils.parsedate_tz(value)
+    if date is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(date) - time.time())
+
+
+class RetryPolicy(object):
+    """Decides whether and when a failed request is sent again.
+
+    Idempotent requests are retried on connection failures and on the
+    statuses in RETRY_STATUSES.  A 429 means the server did not process
+    the request, so it is retried whatever the method.  The delay grows
+    exponentially with full jitter, unless a 429 or 503 carries a
+    Retry-After header; either way it is capped at `max_backoff`.
+
+    :param retries: number of retries after the first attempt
+    :param backoff: delay before the first retry, in seconds
+    :param max_backoff: upper bound of any delay, in seconds
+    """
+
+    def __init__(self, retries=0, backoff=DEFAULT_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = collections.Counter()
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        """Adds one to metric `name`; requests may run in threads."""
+        with self._lock:
+            self.metrics[name] += 1
+
+    def should_retry(self, method, attempt, status=None):
+        """Whether attempt number `attempt` (from 0) may be retried.
+
+        `status` is None for connection failures.
+        """
+        if attempt >= self.retries:
+            return False
+        if status == 429:
+            return True
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        return status is None or status in RETRY_STATUSES
+
+    def delay(self, attempt, resp=None):
+        if resp is not None and resp.status_code in (429, 503):
+            retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            if retry_after is not None:
+                self.count('retry_after')
+                return min(retry_after, self.max_backoff)
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+
+class CircuitBreaker(object):
+    """Fails fast while an endpoint keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests are refused for `reset_timeout` seconds.  Then one trial
+    request is let through: success closes the circuit, failure opens it
+    again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            elapsed = time.time() - self._opened_at
+            if self.state == self.OPEN and elapsed >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+
+    def release(self):
+        """Gives up the trial request of a half-open circuit.
+
+        For a request that ended neither in success nor in failure of the
+        endpoint: the next request is let through as a new trial.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self):
+        """Counts a failure, returns True if it opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            tripped = self._failures >= self.failure_threshold
+            if self.state == self.HALF_OPEN or tripped:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self._opened_at = time.time()
+                return opened
+            return False
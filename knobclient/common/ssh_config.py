@@ -0,0 +1,140 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Helpers for SSH client configuration files."""
+
+import hashlib
+import logging
+import os
+import tempfile
+
+from oslo_serialization import jsonutils
+
+from knobclient.common import utils
+
+LOG = logging.getLogger(__name__)
+
+# Record fields that change whenever the record does, in order of trust.
+REVISION_FIELDS = ('revision', 'etag', 'updated_at')
+
+
+def split_stanzas(config):
+    """Splits an ssh_config text into its Host/Match stanzas.
+
+    Lines before the first stanza are returned as a stanza of their own.
+    """
+    stanzas = []
+    current = []
+    for line in config.splitlines():
+        keyword = line.strip().split(None, 1)[:1]
+        if keyword and keyword[0].lower() in ('host', 'match') and current:
+            stanzas.append(current)
+            current = []
+        current.append(line.rstrip())
+    if current:
+        stanzas.append(current)
+    return ['\n'.join(stanza).strip('\n') for stanza in stanzas
+            if any(line.strip() for line in stanza)]
+
+
+def merge(configs):
+    """Concatenates configs, keeping the first copy of repeated stanzas.
+
+    Configs generated for targets behind the same gate all carry the
+    gate's ProxyJump stanza; it is written once.
+    """
+    seen = set()
+    stanzas = []
+    for config in configs:
+        for stanza in split_stanzas(config):
+            key = tuple(line.strip() for line in stanza.splitlines())
+            if key not in seen:
+                seen.add(key)
+                stanzas.append(stanza)
+    return '\n\n'.join(stanzas) + '\n' if stanzas else ''
+
+
+def write_atomic(path, content, mode=0o600):
+    """Replaces path with content so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.knob-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.rename(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+def default_cache_directory():
+    base = utils.env('XDG_CACHE_HOME',
+                     default=os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'knobclient', 'ssh_configs')
+
+
+def revision(record):
+    """Returns a value that changes whenever the API record changes.
+
+    That is the first of REVISION_FIELDS the record carries, or else a
+    digest of the whole record.
+    """
+    for field in REVISION_FIELDS:
+        if record.get(field):
+            return '%s:%s' % (field, record[field])
+    content = jsonutils.dumps(record, sort_keys=True)
+    return 'sha256:' + hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ConfigCache(object):
+    """On-disk cache of generated SSH configs.
+
+    Entries are keyed by the `generate_config` fields and hold the
+    revision of the gate and target they were generated from; an entry
+    is only returned while that revision is current.
+
+    :param directory: cache directory, see :func:`default_cache_directory`
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_cache_directory()
+
+    def _path(self, fields):
+        key = jsonutils.dumps(fields, sort_keys=True)
+        return os.path.join(self.directory,
+                            hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def get(self, fields, revision):
+        """Returns the cached config, or None if missing or outdated."""
+        path = self._path(fields)
+        try:
+            with open(path) as f:
+                entry = jsonutils.loads(f.read())
+        except (IOError, OSError, ValueError) as e:
+            LOG.debug('SSH config cache %s not usable: %s', path, e)
+            return None
+        if entry.get('revision') != revision:
+            return None
+        return entry.get('config')
+
+    def put(self, fields, revision, config):
+        path = self._path(fields)
+        try:
+            write_atomic(path, jsonutils.dumps({'revision': revision,
+                                                'config': config}))
+        except (IOError, OSError) as e:
+            LOG.warning('Could not write SSH config cache %s: %s', path, e)
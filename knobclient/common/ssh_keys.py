@@ -0,0 +1,109 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Parsing and fingerprinting of SSH public keys."""
+
+import base64
+import binascii
+import collections
+import hashlib
+import os
+import re
+import struct
+
+KEY_TYPES = (
+    'ssh-rsa', 'ssh-dss', 'ssh-ed25519',
+    'ecdsa-sha2-nistp256', 'ecdsa-sha2-nistp384', 'ecdsa-sha2-nistp521',
+    'sk-ssh-ed25519@openssh.com', 'sk-ecdsa-sha2-nistp256@openssh.com',
+)
+
+# authorized_keys options precede the key type and may quote spaces.
+_OPTIONS = re.compile(r'^(?:[^\s"]|"(?:[^"\\]|\\.)*")+\s+')
+
+
+class InvalidKey(ValueError):
+    pass
+
+
+class PublicKey(collections.namedtuple(
+        'PublicKey', ['key_type', 'blob', 'comment', 'source'])):
+    """A public key; `source` is where it was read, as "path:line"."""
+
+    @property
+    def content(self):
+        """The key as the API stores it, without authorized_keys options."""
+        parts = [self.key_type, self.blob]
+        if self.comment:
+            parts.append(self.comment)
+        return ' '.join(parts)
+
+    @property
+    def fingerprint(self):
+        """SHA256 fingerprint, as printed by `ssh-keygen -l`."""
+        digest = hashlib.sha256(base64.b64decode(self.blob)).digest()
+        return 'SHA256:' + base64.b64encode(digest).decode('ascii').rstrip('=')
+
+
+def parse(line, source=None):
+    """Parses one authorized_keys or .pub line.
+
+    :raises InvalidKey: if the line holds no well-formed key
+    """
+    line = line.strip()
+    if line and line.split(None, 1)[0] not in KEY_TYPES:
+        line = _OPTIONS.sub('', line, count=1)
+    fields = line.split(None, 2)
+    if len(fields) < 2 or fields[0] not in KEY_TYPES:
+        raise InvalidKey('no supported key type')
+    key_type, blob = fields[:2]
+    try:
+        decoded = base64.b64decode(blob)
+        length = struct.unpack('>I', decoded[:4])[0]
+        embedded = decoded[4:4 + length].decode('ascii')
+    except (binascii.Error, struct.error, TypeError, UnicodeDecodeError):
+        raise InvalidKey('key data is not valid base64')
+    if embedded != key_type:
+        raise InvalidKey('key data is for %s, not %s' % (embedded, key_type))
+    comment = fields[2].strip() if len(fields) > 2 else ''
+    return PublicKey(key_type, blob, comment, source)
+
+
+def read(path):
+    """Reads the keys in an authorized_keys-format file or a directory.
+
+    Of a directory, the *.pub and authorized_keys files are read, in name
+    order; private keys next to them are left alone.  Blank lines and
+    comments are skipped.
+
+    :returns: list of (source, key) pairs, where key is a
+        :class:`PublicKey`, or an :class:`InvalidKey` for lines that could
+        not be parsed
+    """
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                 if name.endswith('.pub') or name == 'authorized_keys']
+        paths = [p for p in paths if os.path.isfile(p)]
+    else:
+        paths = [path]
+
+    keys = []
+    for file_path in paths:
+        with open(file_path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip() or line.strip().startswith('#'):
+                    continue
+                source = '%s:%d' % (file_path, number)
+                try:
+                    keys.append((source, parse(line, source)))
+                except InvalidKey as e:
+                    keys.append((source, e))
+    return keys
@@ -0,0 +1,115 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""On-disk cache of keystone tokens for the knob CLI.
+
+The cached state is the keystoneauth plugin auth state, i.e. the token and
+the service catalog, so a warm invocation skips both authentication and
+the catalog fetch.  Files are readable by their owner only.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+
+from knobclient.common import utils
+
+LOG = logging.getLogger(__name__)
+
+# Cached tokens are not reused when they expire within this many seconds.
+EXPIRY_MARGIN = 300
+
+
+def default_directory():
+    base = utils.env('XDG_CACHE_HOME',
+                     default=os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'knobclient', 'tokens')
+
+
+class TokenCache(object):
+    """Token cache entry for one set of credentials.
+
+    :param auth: keystoneauth identity plugin
+    :param region_name: region the endpoint is resolved in
+    :param directory: cache directory, see :func:`default_directory`
+    """
+
+    def __init__(self, auth, region_name=None, directory=None):
+        self.auth = auth
+        self.directory = directory or default_directory()
+        # The plugin cache id covers the auth URL, user, project, domains
+        # and secret, so changed credentials never pick up a stale token.
+        cache_id = auth.get_cache_id()
+        if cache_id is None:
+            self.path = None
+        else:
+            key = '%s\0%s' % (cache_id, region_name or '')
+            self.path = os.path.join(
+                self.directory,
+                hashlib.sha256(key.encode('utf-8')).hexdigest())
+        self._loaded = None
+
+    def load(self):
+        """Installs the cached token on the plugin if it is still valid.
+
+        :returns: True when a cached token was installed
+        """
+        if self.path is None:
+            return False
+        try:
+            st = os.stat(self.path)
+            if st.st_uid != os.getuid() or st.st_mode & 0o077:
+                LOG.warning('Ignoring token cache %s: it is accessible by '
+                            'other users', self.path)
+                return False
+            with open(self.path) as f:
+                state = f.read()
+            self.auth.set_auth_state(state)
+        except (IOError, OSError, ValueError, KeyError) as e:
+            LOG.debug('Token cache %s not usable: %s', self.path, e)
+            return False
+
+        if self.auth.auth_ref.will_expire_soon(EXPIRY_MARGIN):
+            LOG.debug('Cached token in %s expires soon', self.path)
+            self.auth.invalidate()
+            return False
+        self._loaded = state
+        return True
+
+    def save(self):
+        """Writes the plugin's current token, if it changed since load."""
+        if self.path is None:
+            return
+        state = self.auth.get_auth_state()
+        if not state or state == self._loaded:
+            return
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory, 0o700)
+            fd, tmp = tempfile.mkstemp(dir=self.directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(state)
+                os.chmod(tmp, 0o600)
+                os.rename(tmp, self.path)
+            except Exception:
+                os.unlink(tmp)
+                raise
+        except (IOError, OSError) as e:
+            LOG.warning('Could not write token cache %s: %s', self.path, e)
+            return
+        self._loaded = state
+
+    def clear(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
@@ -12,15 +12,37 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import collections
+from concurrent import futures
+import functools
+import itertools
 import logging
 import os
+import random
+import threading
+import time
 
-from oslo_serialization import jsonutils
+import six
 
 from knobclient.i18n import _LE
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_POLL_INTERVAL = 1
+DEFAULT_MAX_POLL_INTERVAL = 15
+DEFAULT_WAIT_TIMEOUT = 600
+
+
+class ItemResult(collections.namedtuple('ItemResult',
+                                        ['item', 'result', 'error'])):
+    """Outcome of one item of a batch operation."""
+
+    @property
+    def ok(self):
+        return self.error is None
+
 
 def env(*args, **kwargs):
     """Returns the first environment variable set.
@@ -44,3 +66,259 @@ def get_response_body(resp):
     else:
         body = None
     return body
+
+
+class RateLimiter(object):
+    """Spaces calls out to at most `rate` per second, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def run_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY,
+                     rate=None, callback=None):
+    """Calls `func` on every item with at most `concurrency` calls in flight.
+
+    An exception raised for one item is recorded on its result instead of
+    being propagated, so a single failure does not cancel the whole batch.
+
+    :param func: callable taking a single item
+    :param items: iterable of items to process
+    :param concurrency: maximum number of concurrent calls
+    :param rate: maximum number of calls started per second, if any
+    :param callback: called with each :class:`ItemResult` as soon as it is
+        done, from the thread that made the call
+    :returns: list of :class:`ItemResult`, in the order of `items`
+    """
+    items = list(items)
+    limiter = RateLimiter(rate) if rate else None
+
+    def call(item):
+        if limiter is not None:
+            limiter.wait()
+        result = _call_item(func, item)
+        if callback is not None:
+            callback(result)
+        return result
+
+    if not items:
+        return []
+    workers = max(1, min(concurrency or 1, len(items)))
+    if workers == 1:
+        return [call(item) for item in items]
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(call, items))
+
+
+def iter_concurrently(func, items, concurrency=DEFAULT_CONCURRENCY):
+    """Like :func:`run_concurrently`, yielding results as calls complete.
+
+    :param func: callable taking a single item
+    :param items: iterable of items to process
+    :param concurrency: maximum number of concurrent calls
+    :returns: iterator of :class:`ItemResult`, in the order the calls
+        complete
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = max(1, min(concurrency or 1, len(items)))
+    if workers == 1:
+        for item in items:
+            yield _call_item(func, item)
+        return
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = [executor.submit(_call_item, func, item) for item in items]
+        for future in futures.as_completed(pending):
+            yield future.result()
+
+
+def _call_item(func, item):
+    try:
+        return ItemResult(item, func(item), None)
+    except Exception as e:
+        LOG.debug('Batch item %s failed: %s', item, e)
+        return ItemResult(item, None, e)
+
+
+def poll(check, timeout=DEFAULT_WAIT_TIMEOUT,
+         interval=DEFAULT_POLL_INTERVAL,
+         max_interval=DEFAULT_MAX_POLL_INTERVAL):
+    """Calls `check` until it reports completion or `timeout` passes.
+
+    The wait between calls doubles from `interval` up to `max_interval`,
+    and each one is jittered to between half and all of that, so that
+    many clients waiting together do not poll in lockstep.
+
+    :param check: callable returning a (done, result) pair
+    :param timeout: seconds after which to give up
+    :returns: the result of the call that reported completion
+    :raises knobclient.exc.WaitTimeout: when the deadline passes first
+    """
+    deadline = time.time() + timeout
+    attempt = 0
+    while True:
+        done, result = check()
+        if done:
+            return result
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            # Imported here: knobclient.exc pulls in oslo.serialization,
+            # which the CLI does not otherwise need to start up.
+            from knobclient import exc
+            raise exc.WaitTimeout('Not done after %s seconds' % timeout)
+        delay = min(max_interval, interval * (2 ** attempt))
+        time.sleep(min(remaining, random.uniform(delay / 2.0, delay)))
+        attempt += 1
+
+
+def paginate(fetch_page, page_size=DEFAULT_PAGE_SIZE, marker_key='id',
+             prefetch=True):
+    """Yields the items of a marker/limit paginated collection.
+
+    While the caller works through one page the next one is fetched in the
+    background, unless `prefetch` is False.
+
+    :param fetch_page: callable taking `marker` and `limit` keyword
+        arguments and returning the list of items on that page; without
+        prefetch, an iterator over them will do
+    :param page_size: number of items requested per page
+    :param marker_key: item field passed as the marker for the next page
+    :param prefetch: fetch the next page while the current one is consumed
+    """
+    # A server ignoring the marker sends the same page again and again;
+    # the listing stops at the first page starting with an item some
+    # earlier page started with, or ending at a marker already used.
+    starts = set()
+    markers = set()
+
+    def repeated(item):
+        key = item[marker_key]
+        if key in starts:
+            return True
+        starts.add(key)
+        return False
+
+    def next_marker(item):
+        marker = item[marker_key]
+        if marker in markers:
+            return None
+        markers.add(marker)
+        return marker
+
+    def next_page(page):
+        # A short page is the last one; a long one means the server
+        # ignored the limit and returned the whole collection.
+        if len(page) != page_size:
+            return None
+        marker = next_marker(page[-1])
+        if marker is None:
+            return None
+        return functools.partial(fetch_page, marker=marker, limit=page_size)
+
+    page = fetch_page(marker=None, limit=page_size)
+    if not prefetch:
+        # Pages may be iterators here, so they are counted as they go.
+        while True:
+            count = 0
+            for item in page:
+                if not count and repeated(item):
+                    return
+                count += 1
+                yield item
+            if count != page_size:
+                return
+            marker = next_marker(item)
+            if marker is None:
+                return
+            page = fetch_page(marker=marker, limit=page_size)
+
+    executor = futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        while True:
+            if page and repeated(page[0]):
+                return
+            fetch = next_page(page)
+            pending = executor.submit(fetch) if fetch else None
+            for item in page:
+                yield item
+            if pending is None:
+                return
+            page = pending.result()
+    finally:
+        executor.shutdown(wait=False)
+
+
+def list_params(params, filters=None, fields=None, sort=None,
+                required_fields=()):
+    """Returns the query parameters of a filtered, sorted listing.
+
+    :param params: other query parameters
+    :param filters: dict of field values the items must have
+    :param fields: fields the server should return; `required_fields`,
+        the filtered and the sort fields are added, as the client needs
+        them
+    :param sort: list of (field, direction) pairs, direction being 'asc'
+        or 'desc'
+    """
+    params = dict(params)
+    params.update(filters or {})
+    if fields:
+        wanted = list(fields)
+        for field in itertools.chain(required_fields, filters or (),
+                                     (key for key, _dir in sort or ())):
+            if field not in wanted:
+                wanted.append(field)
+        params['fields'] = ','.join(wanted)
+    if sort:
+        params['sort'] = ','.join('%s:%s' % pair for pair in sort)
+    return params
+
+
+def _filter_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return '' if value is None else six.text_type(value)
+
+
+def _sort_value(value):
+    return (value is None, value)
+
+
+def select(items, filters=None, sort=None, limit=None):
+    """Applies filters, sort order and limit to listed items.
+
+    Servers ignore the query parameters they do not support, see
+    `list_params`, so this is done again on what they return; on items
+    the server did handle it is a cheap pass.  Filtering and limiting
+    work on the stream of items, sorting needs all of them.
+
+    :param items: iterable of dicts
+    :returns: iterable of the selected items
+    """
+    if filters:
+        filters = [(key, _filter_value(value))
+                   for key, value in filters.items()]
+        items = (item for item in items
+                 if all(_filter_value(item.get(key)) == value
+                        for key, value in filters))
+    if sort:
+        items = list(items)
+        # Sorting is stable, so sorting by the last field first orders by
+        # all of them.
+        for key, direction in reversed(sort):
+            items.sort(key=lambda item: _sort_value(item.get(key)),
+                       reverse=direction == 'desc')
+    if limit is not None:
+        items = itertools.islice(items, limit)
+    return items
@@ -0,0 +1,96 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Polling of collections for changes."""
+
+import collections
+
+from six.moves.urllib import parse
+
+from knobclient.common import utils
+
+ADDED = '+'
+REMOVED = '-'
+CHANGED = '~'
+
+
+class CollectionWatcher(object):
+    """Polls a marker/limit paginated collection with conditional requests.
+
+    Each page is fetched with the validator of its previous response, so
+    pages that did not change are neither downloaded again (when the
+    server supports ETags) nor decoded.
+
+    :param client: :class:`knobclient.client._HTTPClient`
+    :param path: collection path, e.g. /gates
+    :param key: response body key holding the items
+    :param marker_key: item field used as the marker of the next page
+    :param params: query parameters of the listing
+    :param page_size: number of items requested per page
+    """
+
+    def __init__(self, client, path, key, marker_key='id', params=None,
+                 page_size=utils.DEFAULT_PAGE_SIZE):
+        self.client = client
+        self.path = path
+        self.key = key
+        self.marker_key = marker_key
+        self.params = dict(params or {})
+        self.page_size = page_size
+        self._pages = {}
+
+    def _url(self, marker):
+        params = dict(self.params, limit=self.page_size)
+        if marker is not None:
+            params['marker'] = marker
+        return '%s?%s' % (self.path, parse.urlencode(sorted(params.items())))
+
+    def poll(self):
+        """Returns the items of the collection, or None if unchanged."""
+        pages = {}
+        downloaded = []
+
+        def fetch_page(marker, limit):
+            url = self._url(marker)
+            validator, page = self._pages.get(url, (None, None))
+            body, validator = self.client.get_if_changed(url, validator)
+            if body is not None:
+                page = body[self.key]
+                downloaded.append(url)
+            pages[url] = (validator, page)
+            return page
+
+        # paginate also stops when the server ignores the marker.
+        items = list(utils.paginate(fetch_page, self.page_size,
+                                    self.marker_key, prefetch=False))
+        # Fewer pages than last time also means items went away.
+        changed = bool(downloaded) or set(pages) != set(self._pages)
+        self._pages = pages
+        return items if changed else None
+
+
+def diff(previous, current, key):
+    """Compares two lists of items matched on their `key` field.
+
+    :returns: list of (change, item) pairs, change being one of ADDED,
+        REMOVED and CHANGED; removed items come last
+    """
+    before = collections.OrderedDict((item[key], item) for item in previous)
+    changes = []
+    for item in current:
+        old = before.pop(item[key], None)
+        if old is None:
+            changes.append((ADDED, item))
+        elif old != item:
+            changes.append((CHANGED, item))
+    changes.extend((REMOVED, item) for item in before.values())
+    return changes
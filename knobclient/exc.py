@@ -34,6 +34,14 @@ class PayloadException(KnobException):
     pass
 
 
+class WaitTimeout(KnobException):
+    """Timed out waiting for an operation to complete."""
+
+
+class NoUniqueMatch(KnobException):
+    """Several resources match the given name."""
+
+
 class HTTPError(KnobException):
 
     """Base exception for HTTP errors."""
@@ -49,6 +57,13 @@ class HTTPServerError(HTTPError):
     pass
 
 
+class CircuitOpenError(HTTPServerError):
+
+    """Raised without a request while an endpoint's circuit is open."""
+    def __init__(self, message, status_code=503):
+        super(CircuitOpenError, self).__init__(message, status_code)
+
+
 class HTTPClientError(HTTPError):
 
     """Raised for 4xx responses from the server."""
@@ -59,7 +74,7 @@ class HTTPAuthError(HTTPError):
 
     """Raised for 401 Unauthorized responses from the server."""
     def __init__(self, message, status_code=401):
-        super(HTTPError, self).__init__(message, status_code)
+        super(HTTPAuthError, self).__init__(message, status_code)
 
 
 class HTTPException(KnobException):
@@ -17,6 +17,7 @@
 Command-line interface to the Knob API.
 """
 
+import argparse
 from collections import namedtuple
 import logging
 import sys
@@ -26,17 +27,16 @@ from cliff import command
 from cliff import commandmanager
 from cliff import complete
 from cliff import help
-from keystoneauth1.identity import v2
-from keystoneauth1.identity import v3
-from keystoneauth1 import loading
-from keystoneauth1 import session
 import six
 
-import knobclient
-from knobclient import client
 from knobclient.i18n import _LW
+from knobclient.common import token_cache
 from knobclient.common import utils
 
+# keystoneauth1, knobclient.client and the package version are imported
+# where they are used, so that commands which do not talk to the API (e.g.
+# "knob help") start without loading them.
+
 
 LOG = logging.getLogger(__name__)
 
@@ -46,11 +46,28 @@ _IDENTITY_API_VERSION_2 = ['2', '2.0']
 _IDENTITY_API_VERSION_3 = ['3']
 
 
+class _VersionAction(argparse.Action):
+    """Prints the package version, resolving it only when asked for."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS,
+                 default=argparse.SUPPRESS, help=None):
+        super(_VersionAction, self).__init__(
+            option_strings=option_strings, dest=dest, default=default,
+            nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        import knobclient
+        parser.exit(
+            message='%s %s\n' % (parser.prog, knobclient.__version__))
+
+
 class Knob(app.App):
     """Knob command line interface."""
 
     def __init__(self, **kwargs):
         self.client = None
+        self.token_cache = None
+        self.request_metrics = None
 
         # Patch command.Command to add a default auth_required = True
         command.Command.auth_required = True
@@ -61,7 +78,7 @@ class Knob(app.App):
 
         super(Knob, self).__init__(
             description=__doc__.strip(),
-            version=knobclient.__version__,
+            version=None,
             command_manager=commandmanager.CommandManager(
                 'knobclient.v1'),
             deferred_help=True,
@@ -135,6 +152,7 @@ class Knob(app.App):
         kwargs.update(kwargs_dict)
 
         if api_version in _IDENTITY_API_VERSION_2:
+            from keystoneauth1.identity import v2
             method = v2.Token if auth_type == 'token' else v2.Password
         else:
             if not api_version or api_version not in _IDENTITY_API_VERSION_3:
@@ -146,15 +164,36 @@ class Knob(app.App):
                         _DEFAULT_IDENTITY_API_VERSION
                     )
                 )
+            from keystoneauth1.identity import v3
             method = v3.Token if auth_type == 'token' else v3.Password
 
         auth = method(**kwargs)
-
-        return session.Session(auth=auth, verify=not args.insecure)
+        # A cached token the API rejects, e.g. because it was revoked
+        # before it expired, is replaced by the session: on a 401 it
+        # authenticates again and resends that one request.  clean_up
+        # then caches the new token.
+        if not args.no_token_cache:
+            self.token_cache = token_cache.TokenCache(
+                auth, args.region_name, args.token_cache_dir or None)
+            self.token_cache.load()
+
+        from keystoneauth1 import session
+        return session.Session(auth=auth, **self._get_session_kwargs(args))
+
+    def _get_session_kwargs(self, args):
+        verify = False if args.insecure else (args.os_cacert or True)
+        cert = args.os_cert
+        if args.os_cert and args.os_key:
+            cert = (args.os_cert, args.os_key)
+        return {'verify': verify, 'cert': cert, 'timeout': args.timeout}
 
     def create_client(self, args):
+        from knobclient import client
+
         created_client = None
         endpoint_filter_kwargs = self._get_endpoint_filter_kwargs(args)
+        endpoint_filter_kwargs.update(self._get_identity_kwargs(args))
+        endpoint_filter_kwargs.update(self._get_retry_kwargs(args))
 
         api_version = args.os_identity_api_version
         if args.no_auth and args.os_auth_url:
@@ -211,6 +250,13 @@ class Knob(app.App):
         else:
             raise Exception('ERROR: please specify authentication credentials')
 
+        if args.metrics_file:
+            from knobclient.common import metrics
+            # Shared by the clients of all the commands of a session.
+            if self.request_metrics is None:
+                self.request_metrics = metrics.LatencyHistogram()
+            created_client.add_request_hook(
+                on_end=self.request_metrics.record)
         return created_client
 
     def _get_endpoint_filter_kwargs(self, args):
@@ -222,12 +268,34 @@ class Knob(app.App):
             kwargs['version'] = kwargs.pop('knob_api_version')
         return kwargs
 
+    def _get_identity_kwargs(self, args):
+        identity_keys = (('project_name', 'os_project_name'),
+                         ('user_name', 'os_username'),
+                         ('user_domain_id', 'os_user_domain_id'),
+                         ('project_domain_id', 'os_project_domain_id'))
+        return dict((key, getattr(args, arg)) for key, arg in identity_keys
+                    if getattr(args, arg, None))
+
+    def _get_retry_kwargs(self, args):
+        retry_keys = (
+            ('retries', 'retries'),
+            ('retry_backoff', 'retry_backoff'),
+            ('circuit_failure_threshold', 'circuit_breaker_threshold'),
+            ('circuit_reset_timeout', 'circuit_breaker_reset'))
+        return dict((key, getattr(args, arg)) for key, arg in retry_keys
+                    if getattr(args, arg, None) is not None)
+
     def build_option_parser(self, description, version, argparse_kwargs=None):
         """Introduces global arguments for the application.
         This is inherited from the framework.
         """
+        # Let the --version option below replace the one cliff adds.
+        argparse_kwargs = dict(argparse_kwargs or {},
+                               conflict_handler='resolve')
         parser = super(Knob, self).build_option_parser(
             description, version, argparse_kwargs)
+        parser.add_argument('--version', action=_VersionAction,
+                            help="show program's version number and exit")
         parser.add_argument('--no-auth', '-N', action='store_true',
                             help='Do not use authentication.')
         parser.add_argument('--os-identity-api-version',
@@ -318,9 +386,90 @@ class Knob(app.App):
                             metavar='<knob-api-version>',
                             default=utils.env('KNOB_API_VERSION'),
                             help='Defaults to env[KNOB_API_VERSION].')
+        parser.add_argument('--retries',
+                            metavar='<retries>',
+                            type=int,
+                            default=utils.env('KNOB_RETRIES') or None,
+                            help='Number of retries of failed idempotent '
+                                 'requests. Defaults to env[KNOB_RETRIES] '
+                                 'or 0.')
+        parser.add_argument('--retry-backoff',
+                            metavar='<seconds>',
+                            type=float,
+                            default=utils.env('KNOB_RETRY_BACKOFF') or None,
+                            help='Delay before the first retry, doubled for '
+                                 'each further retry. Defaults to '
+                                 'env[KNOB_RETRY_BACKOFF] or 0.5.')
+        parser.add_argument('--circuit-breaker-threshold',
+                            metavar='<failures>',
+                            type=int,
+                            default=utils.env(
+                                'KNOB_CIRCUIT_BREAKER_THRESHOLD') or None,
+                            help='Consecutive server failures after which '
+                                 'requests fail fast. Defaults to '
+                                 'env[KNOB_CIRCUIT_BREAKER_THRESHOLD], '
+                                 'disabled when unset.')
+        parser.add_argument('--circuit-breaker-reset',
+                            metavar='<seconds>',
+                            type=float,
+                            default=utils.env(
+                                'KNOB_CIRCUIT_BREAKER_RESET') or None,
+                            help='Seconds requests fail fast before one is '
+                                 'tried again. Defaults to '
+                                 'env[KNOB_CIRCUIT_BREAKER_RESET] or 30.')
+        parser.add_argument('--no-token-cache',
+                            action='store_true',
+                            help='Do not reuse or store keystone tokens '
+                                 'in the on-disk token cache.')
+        parser.add_argument('--token-cache-dir',
+                            metavar='<token-cache-dir>',
+                            default=utils.env('KNOB_TOKEN_CACHE_DIR'),
+                            help='Directory of the token cache. Defaults '
+                                 'to env[KNOB_TOKEN_CACHE_DIR] or '
+                                 '~/.cache/knobclient/tokens.')
+        parser.add_argument('--metrics-file',
+                            metavar='<metrics-file>',
+                            default=utils.env('KNOB_METRICS_FILE') or None,
+                            help='Write request latency percentiles for '
+                                 'each API endpoint to this file, as JSON. '
+                                 'Defaults to env[KNOB_METRICS_FILE].')
         parser.epilog = ('See "knob help COMMAND" for help '
                          'on a specific command.')
-        loading.register_session_argparse_arguments(parser)
+
+        # The keystoneauth session options, declared here rather than
+        # through keystoneauth1.loading to keep it out of startup.
+        session_group = parser.add_argument_group(
+            'API Connection Options',
+            'Options controlling the HTTP API Connections')
+        session_group.add_argument('--insecure',
+                                   default=False,
+                                   action='store_true',
+                                   help='Explicitly allow client to perform '
+                                        '"insecure" TLS (https) requests. '
+                                        'The server\'s certificate will not '
+                                        'be verified against any certificate '
+                                        'authorities. This option should be '
+                                        'used with caution.')
+        session_group.add_argument('--os-cacert',
+                                   metavar='<ca-certificate>',
+                                   default=utils.env('OS_CACERT') or None,
+                                   help='Specify a CA bundle file to use in '
+                                        'verifying a TLS (https) server '
+                                        'certificate. Defaults to '
+                                        'env[OS_CACERT].')
+        session_group.add_argument('--os-cert',
+                                   metavar='<certificate>',
+                                   default=utils.env('OS_CERT') or None,
+                                   help='Defaults to env[OS_CERT].')
+        session_group.add_argument('--os-key',
+                                   metavar='<key>',
+                                   default=utils.env('OS_KEY') or None,
+                                   help='Defaults to env[OS_KEY].')
+        session_group.add_argument('--timeout',
+                                   default=600,
+                                   type=float,
+                                   metavar='<seconds>',
+                                   help='Set request timeout (in seconds).')
         return parser
 
     def prepare_to_run_command(self, cmd):
@@ -329,9 +478,15 @@ class Knob(app.App):
         client interface.
         This is inherited from the framework.
         """
-        self.client_manager = namedtuple('ClientManager', 'key_manager')
+        self.client_manager = namedtuple('ClientManager', 'knob')
         if cmd.auth_required:
-            self.client_manager.key_manager = self.create_client(self.options)
+            self.client_manager.knob = self.create_client(self.options)
+
+    def clean_up(self, cmd, result, err):
+        if self.token_cache is not None:
+            self.token_cache.save()
+        if self.request_metrics is not None:
+            self.request_metrics.write(self.options.metrics_file)
 
     def run(self, argv):
         # If no arguments are provided, usage is displayed
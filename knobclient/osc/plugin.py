@@ -32,6 +32,19 @@ def make_client(instance):
 
     # Remember interface only if it is set
     kwargs = utils.build_kwargs_dict('endpoint_type', instance._interface)
+    auth_options = getattr(instance._cli_options, 'auth', None) or {}
+    for key, option in (('project_name', 'project_name'),
+                        ('user_name', 'username'),
+                        ('user_domain_id', 'user_domain_id'),
+                        ('project_domain_id', 'project_domain_id')):
+        kwargs.update(utils.build_kwargs_dict(key, auth_options.get(option)))
+    # openstack.config strips the os_ prefix of the options added below.
+    config = getattr(instance._cli_options, 'config', None) or {}
+    for key, option in (('retries', 'knob_retries'),
+                        ('retry_backoff', 'knob_retry_backoff'),
+                        ('circuit_failure_threshold',
+                         'knob_circuit_breaker_threshold')):
+        kwargs.update(utils.build_kwargs_dict(key, config.get(option)))
     client = knob_client(
         session=instance.session,
         region_name=instance._region_name,
@@ -52,4 +65,25 @@ def build_option_parser(parser):
         help='Knob API version, default=' +
              DEFAULT_KNOB_API_VERSION +
              ' (Env: OS_KNOB_API_VERSION)')
+    parser.add_argument(
+        '--os-knob-retries',
+        metavar='<retries>',
+        type=int,
+        default=utils.env('OS_KNOB_RETRIES') or None,
+        help='Number of retries of failed idempotent knob requests'
+             ' (Env: OS_KNOB_RETRIES)')
+    parser.add_argument(
+        '--os-knob-retry-backoff',
+        metavar='<seconds>',
+        type=float,
+        default=utils.env('OS_KNOB_RETRY_BACKOFF') or None,
+        help='Delay before the first retry of a knob request'
+             ' (Env: OS_KNOB_RETRY_BACKOFF)')
+    parser.add_argument(
+        '--os-knob-circuit-breaker-threshold',
+        metavar='<failures>',
+        type=int,
+        default=utils.env('OS_KNOB_CIRCUIT_BREAKER_THRESHOLD') or None,
+        help='Consecutive knob server failures after which requests fail'
+             ' fast (Env: OS_KNOB_CIRCUIT_BREAKER_THRESHOLD)')
     return parser
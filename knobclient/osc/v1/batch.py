@@ -0,0 +1,203 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Knob v1 batch execution"""
+
+from concurrent import futures
+import itertools
+import logging
+import shlex
+import sys
+import threading
+import time
+
+from cliff import commandmanager
+from cliff import lister
+from cliff import show
+from osc_lib.command import command
+from oslo_serialization import jsonutils
+import six
+
+from knobclient.i18n import _
+
+# Namespace of the commands a batch can run when the application has not
+# loaded them, as is the case of the knob CLI.
+COMMAND_NAMESPACE = 'openstack.knob.v1'
+
+
+class RunBatch(command.Command):
+    """Run commands read from a file, one per line, over one session."""
+
+    log = logging.getLogger(__name__ + '.RunBatch')
+
+    def get_parser(self, prog_name):
+        parser = super(RunBatch, self).get_parser(prog_name)
+        parser.add_argument(
+            'file',
+            metavar='<file>',
+            nargs='?',
+            default='-',
+            help=_('File of commands, e.g. "gate list" (default: stdin)')
+        )
+        parser.add_argument(
+            '--parallel',
+            type=int,
+            default=1,
+            metavar='<count>',
+            help=_('Number of commands run at the same time')
+        )
+        parser.add_argument(
+            '--continue-on-error',
+            action='store_true',
+            default=False,
+            help=_('Keep going after a command fails')
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)', parsed_args)
+
+        if parsed_args.file == '-':
+            lines = sys.stdin.readlines()
+        else:
+            with open(parsed_args.file) as f:
+                lines = f.readlines()
+        commands = [(number, line.strip())
+                    for number, line in enumerate(lines, 1)
+                    if line.strip() and not line.strip().startswith('#')]
+
+        # Loaded before the commands run in threads, and only for a batch
+        # so that other commands do not pay for it.
+        self._commands = commandmanager.CommandManager(COMMAND_NAMESPACE)
+        stop = threading.Event()
+        failed = []
+
+        def run(entry):
+            if stop.is_set():
+                return dict(self._record(*entry), status='skipped')
+            record = self._run_command(*entry)
+            if record['status'] != 'ok':
+                failed.append(record)
+                if not parsed_args.continue_on_error:
+                    stop.set()
+            return record
+
+        # Commands that print would interleave with the JSON lines, so
+        # they get an application whose stdout is stderr.
+        self._subcommand_app = _SubcommandApp(self.app)
+        with futures.ThreadPoolExecutor(
+                max_workers=max(1, parsed_args.parallel)) as executor:
+            for record in executor.map(run, commands):
+                self.app.stdout.write(jsonutils.dumps(record) + '\n')
+                self.app.stdout.flush()
+        return 1 if failed else 0
+
+    def _record(self, number, line):
+        return {'line': number, 'command': line}
+
+    def _run_command(self, number, line):
+        record = self._record(number, line)
+        start = time.time()
+        try:
+            argv = shlex.split(line)
+            cmd_factory, cmd_name, sub_argv = self._find_command(argv)
+            if issubclass(cmd_factory, RunBatch):
+                raise ValueError(_('batch commands cannot be nested'))
+            cmd = cmd_factory(self._subcommand_app, self.app_args,
+                              cmd_name=cmd_name)
+            parser = cmd.get_parser(cmd_name)
+            try:
+                parsed = parser.parse_args(sub_argv)
+            except SystemExit:
+                raise ValueError(_('invalid arguments: %s') % line)
+            record['result'] = self._format(cmd, parsed,
+                                            cmd.take_action(parsed))
+            record['status'] = 'ok'
+        except Exception as e:
+            self.log.debug('Batch line %d failed', number, exc_info=True)
+            record['status'] = 'error'
+            record['error'] = six.text_type(e)
+        record['elapsed'] = round(time.time() - start, 6)
+        return record
+
+    def _find_command(self, argv):
+        try:
+            return self.app.command_manager.find_command(argv)
+        except ValueError:
+            return self._commands.find_command(argv)
+
+    def _format(self, cmd, parsed_args, result):
+        """Returns the result of cmd as JSON data.
+
+        Rows of a listing and the values of a show are limited to the
+        columns given with -c/--column; other formatter options do not
+        apply, the result always being a record of the batch output.
+        """
+        if isinstance(cmd, lister.Lister):
+            columns, rows = result
+            columns, selector = self._select_columns(parsed_args, columns)
+            return [dict(zip(columns, self._compress(row, selector)))
+                    for row in rows]
+        if isinstance(cmd, show.ShowOne):
+            columns, values = result
+            columns, selector = self._select_columns(parsed_args, columns)
+            return dict(zip(columns, self._compress(values, selector)))
+        if isinstance(result, six.string_types + (dict, list)):
+            return result
+        return None
+
+    @staticmethod
+    def _select_columns(parsed_args, columns):
+        """Returns the columns asked for with -c and a selector for them.
+
+        Column names are matched the way cliff does: case insensitive,
+        with "_" standing for a space. The selector is None when all
+        columns are shown.
+        """
+        wanted = getattr(parsed_args, 'columns', None)
+        if not wanted:
+            return list(columns), None
+
+        def normalize(name):
+            return name.lower().strip().replace(' ', '_')
+
+        wanted = set(normalize(name) for name in wanted)
+        selector = [normalize(name) in wanted for name in columns]
+        if not any(selector):
+            raise ValueError(
+                _('No recognized column names in %(wanted)s, expected '
+                  'some of %(columns)s')
+                % {'wanted': ', '.join(parsed_args.columns),
+                   'columns': ', '.join(columns)})
+        return list(itertools.compress(columns, selector)), selector
+
+    @staticmethod
+    def _compress(values, selector):
+        if selector is None:
+            return values
+        return itertools.compress(values, selector)
+
+
+class _SubcommandApp(object):
+    """The application as seen by the commands of a batch.
+
+    Its stdout is the stderr of the application, so that what a command
+    prints does not mix with the JSON lines of the batch.
+    """
+
+    def __init__(self, app):
+        self._app = app
+        self.stdout = app.stderr
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
@@ -13,14 +13,219 @@
 
 """Knob v1 Facet gate implementations"""
 
+import argparse
+import collections
+import csv
 import logging
+import os
+import sys
+import threading
+import time
 
 from osc_lib.command import command
 from osc_lib import utils
 import six
+import yaml
 
+from knobclient.common import ssh_keys
+from knobclient.common import utils as knob_utils
+from knobclient.common import watch
 from knobclient.i18n import _
 from knobclient import exc as exceptions
+from knobclient.osc.v1 import listing
+from knobclient.v1 import sync
+
+
+def _read_ids(values):
+    """Returns IDs given on the command line, or read from stdin.
+
+    Stdin is used when no value is given or the only value is '-'.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    if values and values != ['-']:
+        return values
+    return [line.strip() for line in sys.stdin
+            if line.strip() and not line.strip().startswith('#')]
+
+
+def _page_size(value):
+    """argparse type of --page-size, a positive number of rows."""
+    try:
+        size = int(value)
+    except ValueError:
+        size = 0
+    if size < 1:
+        raise argparse.ArgumentTypeError(
+            _('page size must be a positive integer, not %s') % value)
+    return size
+
+
+def _add_wait_arguments(parser, action):
+    parser.add_argument(
+        '--wait',
+        action='store_true',
+        default=False,
+        help=_('Wait for the gate %s to complete') % action
+    )
+    parser.add_argument(
+        '--wait-timeout',
+        type=int,
+        default=knob_utils.DEFAULT_WAIT_TIMEOUT,
+        metavar='<seconds>',
+        help=_('Give up waiting after this many seconds (default: %d)')
+        % knob_utils.DEFAULT_WAIT_TIMEOUT
+    )
+
+
+def _add_routable_arguments(parser):
+    routable = parser.add_mutually_exclusive_group()
+    routable.add_argument(
+        '--routable',
+        action='store_true',
+        dest='routable',
+        default=True,
+        help=_('Refer to state network VM target VM is connected to '
+               '(default)')
+    )
+    routable.add_argument(
+        '--no-routable',
+        action='store_false',
+        dest='routable',
+        help=_('Mark the target as not routable')
+    )
+
+
+def _wait(wait, *args, **kwargs):
+    """Calls a GatesManager wait method, failing the command on timeout."""
+    try:
+        return wait(*args, **kwargs)
+    except exceptions.WaitTimeout as e:
+        raise exceptions.CommandError(six.text_type(e))
+
+
+def _resolve(resolve, *args):
+    """Calls a GatesManager resolve method, failing the command when a
+    name matches several resources."""
+    try:
+        return resolve(*args)
+    except exceptions.NoUniqueMatch as e:
+        raise exceptions.CommandError(six.text_type(e))
+
+
+def _batch_rows_of_operations(results):
+    for result in results:
+        operation = result.item
+        yield (operation.gate_id, operation.action, operation.item,
+               'ok' if result.ok else 'error',
+               '' if result.ok else six.text_type(result.error))
+
+
+def _batch_rows(results, key):
+    for result in results:
+        if result.ok:
+            yield (result.item if key is None else result.item[key],
+                   'ok', '')
+        else:
+            yield (result.item if key is None else result.item[key],
+                   'error', six.text_type(result.error))
+
+
+class _WatchMixin(listing.ListOptionsMixin):
+    """Adds --watch to a listing, printing only the rows that change.
+
+    The list options apply to the watched rows too.
+    """
+
+    DEFAULT_WATCH_INTERVAL = 5
+
+    def add_watch_argument(self, parser):
+        parser.add_argument(
+            '--watch',
+            type=float,
+            nargs='?',
+            const=self.DEFAULT_WATCH_INTERVAL,
+            metavar='<interval>',
+            help=_('Keep polling every <interval> seconds (default: %d) '
+                   'and print the rows added (+), removed (-) or changed '
+                   '(~), until interrupted') % self.DEFAULT_WATCH_INTERVAL
+        )
+
+    def run(self, parsed_args):
+        if not getattr(parsed_args, 'watch', None):
+            return super(_WatchMixin, self).run(parsed_args)
+        self.formatter = self._formatter_plugins[parsed_args.formatter].obj
+        columns = self.list_columns(parsed_args, self.watch_columns)
+        options = self.list_options(parsed_args)
+        watcher = self.make_watcher(parsed_args)
+        previous = []
+        try:
+            while True:
+                items = watcher.poll()
+                # None means no page changed, so there is nothing to parse
+                # or render.
+                if items is not None:
+                    items = list(knob_utils.select(
+                        items, options['filters'], options['sort'],
+                        options['limit']))
+                    rows = [(change,) + utils.get_dict_properties(item,
+                                                                  columns)
+                            for change, item in watch.diff(
+                                previous, items, self.watch_key)]
+                    if rows:
+                        self.produce_output(parsed_args,
+                                            ['change'] + columns, rows)
+                        self.app.stdout.flush()
+                    previous = items
+                time.sleep(parsed_args.watch)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+
+def _add_gate_arguments(parser, required=True):
+    """Adds the options giving the fields of a new gate."""
+    parser.add_argument(
+        '--net-id',
+        required=required,
+        metavar='<net-id>',
+        help=_('Network to build gate server on it')
+    )
+    parser.add_argument(
+        '--public-net-id',
+        required=required,
+        metavar='<public-net-id>',
+        help=_('Network to build gate server on it')
+    )
+    parser.add_argument(
+        '--image',
+        metavar='<image>',
+        help=_('Image to boot from')
+    )
+    parser.add_argument(
+        '--flavor',
+        metavar='<flavor>',
+        help=_('Create server with this flavor (name or ID)'),
+    )
+    parser.add_argument(
+        '--security-group',
+        metavar='<security-group-name>',
+        help=_('Security group to assign to this server (name or ID) '
+               '(repeat option to set multiple groups)')
+    )
+
+
+def _gate_fields(parsed_args):
+    fields = {
+        'net_id': parsed_args.net_id,
+        'public_net_id': parsed_args.public_net_id,
+        }
+    if parsed_args.flavor:
+        fields['flavor'] = parsed_args.flavor
+    if parsed_args.image:
+        fields['image'] = parsed_args.image
+    if parsed_args.security_group:
+        fields['security_groups'] = parsed_args.security_group
+    return fields
 
 
 class CreateGate(command.ShowOne):
@@ -35,68 +240,174 @@ class CreateGate(command.ShowOne):
             metavar='<name>',
             help=_('Name of gate to create')
         )
-        
-        parser.add_argument(
-            '--net-id',
-            required=True,
-            metavar='<net-id>',
-            help=_('Network to build gate server on it')
-        )
-        
-        parser.add_argument(
-            '--public-net-id',
-            required=True,
-            metavar='<public-net-id>',
-            help=_('Network to build gate server on it')
-        )
-        
-        parser.add_argument(
-            '--image',
-            metavar='<image>',
-            help=_('Image to boot from')
-        )
-        
-        parser.add_argument(
-            '--flavor',
-            metavar='<flavor>',
-            help=_('Create server with this flavor (name or ID)'),
-        )
-        parser.add_argument(
-            '--security-group',
-            metavar='<security-group-name>',
-            help=_('Security group to assign to this server (name or ID) '
-                   '(repeat option to set multiple groups)')
-        )
-        
+        _add_gate_arguments(parser)
+        _add_wait_arguments(parser, 'creation')
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)', parsed_args)
         knob_client = self.app.client_manager.knob
 
-        fields = {
-            'name': parsed_args.name,
-            'net_id': parsed_args.net_id,
-            'public_net_id': parsed_args.public_net_id,
-            }
-        if parsed_args.flavor:
-            fields['flavor'] = parsed_args.flavor
-        if parsed_args.image:
-            fields['image'] = parsed_args.image
-        if parsed_args.security_group:
-            fields['security_groups'] = parsed_args.security_group
-       
-        print (fields) 
+        fields = _gate_fields(parsed_args)
+        fields['name'] = parsed_args.name
         try:
             gate = knob_client.gates.create(**fields)
         except exceptions.HTTPNotFound:
             raise exceptions.CommandError(_('Gate not found: %s')
                                    % parsed_args.name)
-                
+        if parsed_args.wait:
+            gate = _wait(knob_client.gates.wait_for, gate['id'],
+                         timeout=parsed_args.wait_timeout)
+            if gate.get('status') != 'ACTIVE':
+                raise exceptions.CommandError(
+                    _('Gate %(gate)s is %(status)s')
+                    % {'gate': gate['id'], 'status': gate.get('status')})
+
         rows = list(six.itervalues(gate))
         columns = list(six.iterkeys(gate))
         return columns, rows
-        
+
+
+class ImportGates(command.Lister):
+    """Create the gates listed in a CSV or YAML file.
+
+    Each CSV row or YAML list item gives the `name` of a gate and
+    optionally its net_id, public_net_id, image, flavor and
+    security_groups; the command line options fill in what is missing.
+    Gates whose name already exists are skipped, so an interrupted run
+    can be started again with the same file.
+    """
+
+    log = logging.getLogger(__name__ + '.ImportGates')
+
+    columns = ['name', 'id', 'status', 'error']
+
+    def get_parser(self, prog_name):
+        parser = super(ImportGates, self).get_parser(prog_name)
+        parser.add_argument(
+            'file',
+            metavar='<file>',
+            help=_('CSV (by extension) or YAML file of gates')
+        )
+        _add_gate_arguments(parser, required=False)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=knob_utils.DEFAULT_CONCURRENCY,
+            metavar='<concurrency>',
+            help=_('Maximum number of gates created at the same time')
+        )
+        _add_wait_arguments(parser, 'creation')
+        return parser
+
+    def take_action(self, parsed_args):
+        """Creates the gates of the file, one row per gate name."""
+        self.log.debug('take_action(%s)', parsed_args)
+        knob_client = self.app.client_manager.knob
+        defaults = _gate_fields(parsed_args)
+
+        entries = self._read_file(parsed_args.file)
+        for entry in entries:
+            if not entry.get('name'):
+                raise exceptions.CommandError(
+                    _('Every gate of %s needs a name') % parsed_args.file)
+        names = [entry['name'] for entry in entries]
+        existing = dict(zip(names, _resolve(knob_client.gates.resolve_all,
+                                            names)))
+
+        rows = collections.OrderedDict()
+        to_create = []
+        for entry in entries:
+            name = entry['name']
+            if name in rows:
+                continue
+            if existing[name] != name:
+                rows[name] = (name, existing[name], 'skipped',
+                              _('already exists'))
+                continue
+            gate = dict(defaults)
+            gate.update((key, value) for key, value in entry.items()
+                        if value not in (None, ''))
+            self._check_fields(gate, name)
+            rows[name] = None
+            to_create.append(gate)
+
+        progress = self._progress(len(to_create))
+        created = {}
+        for result in knob_client.gates.create_gates(
+                to_create, concurrency=parsed_args.concurrency,
+                callback=progress):
+            name = result.item['name']
+            if result.ok:
+                created[result.result['id']] = name
+                rows[name] = (name, result.result['id'], 'created', '')
+            else:
+                rows[name] = (name, '', 'error',
+                              six.text_type(result.error))
+
+        if parsed_args.wait and created:
+            # One gate listing per poll covers all the new gates.
+            gates = _wait(knob_client.gates.wait_for_all, list(created),
+                          timeout=parsed_args.wait_timeout)
+            for gate_id, gate in gates.items():
+                status = gate.get('status')
+                if status != 'ACTIVE':
+                    name = created[gate_id]
+                    rows[name] = (name, gate_id, 'error',
+                                  _('gate is %s') % status)
+        return self.columns, list(rows.values())
+
+    @staticmethod
+    def _check_fields(fields, name):
+        for field in ('net_id', 'public_net_id'):
+            if not fields.get(field):
+                raise exceptions.CommandError(
+                    _('No %(field)s given for gate %(name)s')
+                    % {'field': field, 'name': name})
+
+    def _progress(self, total):
+        """Returns a callback keeping a done/total counter on stderr."""
+        stream = self.app.stderr
+        if not total or not getattr(stream, 'isatty', lambda: False)():
+            return None
+        lock = threading.Lock()
+        counts = collections.Counter()
+
+        def update(result):
+            with lock:
+                counts['ok' if result.ok else 'failed'] += 1
+                done = counts['ok'] + counts['failed']
+                stream.write(_('\r%(done)d/%(total)d gates, %(failed)d '
+                               'failed') % {'done': done, 'total': total,
+                                            'failed': counts['failed']})
+                if done == total:
+                    stream.write('\n')
+                stream.flush()
+        return update
+
+    @staticmethod
+    def _read_file(path):
+        """Returns the gate dicts of a CSV (by extension) or YAML file."""
+        try:
+            with open(path) as f:
+                if path.lower().endswith('.csv'):
+                    entries = list(csv.DictReader(f))
+                    for entry in entries:
+                        groups = entry.get('security_groups')
+                        if groups:
+                            entry['security_groups'] = groups.split(';')
+                else:
+                    entries = yaml.safe_load(f) or []
+                    if isinstance(entries, dict):
+                        entries = entries.get('gates') or []
+        except (IOError, OSError, csv.Error, yaml.YAMLError) as e:
+            raise exceptions.CommandError(
+                _("Gate file '%(path)s' could not be read: %(error)s")
+                % {'path': path, 'error': e})
+        if not all(isinstance(entry, dict) for entry in entries):
+            raise exceptions.CommandError(
+                _("Gate file '%s' is not a list of gates") % path)
+        return entries
 
 
 class DeleteGate(command.Command):
@@ -110,23 +421,37 @@ class DeleteGate(command.Command):
             metavar='<gate_id>',
             help=_('gate to delete')
         )
+        _add_wait_arguments(parser, 'deletion')
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)', parsed_args)
         knob_client = self.app.client_manager.knob
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
         try:
-            knob_client.gates.delete(parsed_args.gate_id)
+            knob_client.gates.delete(gate_id)
         except exceptions.HTTPNotFound:
             raise exceptions.CommandError(_('Gate not found: %s')
                                    % parsed_args.gate_id)
+        if parsed_args.wait:
+            gate = _wait(knob_client.gates.wait_for, gate_id,
+                         status=knob_client.gates.DELETED,
+                         timeout=parsed_args.wait_timeout)
+            if gate is not None:
+                raise exceptions.CommandError(
+                    _('Gate %(gate)s is %(status)s')
+                    % {'gate': parsed_args.gate_id,
+                       'status': gate.get('status')})
 
 
 
-class ListGate(command.Lister):
+class ListGate(_WatchMixin, command.Lister):
     """List Knob gates."""
 
     log = logging.getLogger(__name__ + ".ListGate")
+    watch_columns = ['id', 'name', 'server_id', 'fip_id', 'port_id',
+                     'tenant_id']
+    watch_key = 'id'
 
     def get_parser(self, prog_name):
         parser = super(ListGate, self).get_parser(prog_name)
@@ -136,17 +461,30 @@ class ListGate(command.Lister):
             default=False,
             help=_("Request facet terms for all projects (admin only)")
         )
-                
+        parser.add_argument(
+            '--page-size',
+            type=_page_size,
+            default=knob_utils.DEFAULT_PAGE_SIZE,
+            metavar='<page-size>',
+            help=_('Number of rows fetched per request')
+        )
+        self.add_list_arguments(parser)
+        self.add_watch_argument(parser)
         return parser
 
+    def make_watcher(self, parsed_args):
+        return self.app.client_manager.knob.gates.watch_gates(
+            page_size=parsed_args.page_size,
+            all_projects=parsed_args.all_projects)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
-        params = {
-            "all_projects": parsed_args.all_projects
-        }
-        gates = self.app.client_manager.knob.gates.list(**params)
-        
-        columns = ['id', 'name', 'server_id', 'fip_id', 'port_id', 'tenant_id']
+        params = self.list_options(parsed_args)
+        params["all_projects"] = parsed_args.all_projects
+        gates = self.app.client_manager.knob.gates.iter_gates(
+            page_size=parsed_args.page_size, **params)
+
+        columns = self.list_columns(parsed_args, self.watch_columns)
         return (
             columns,
             (utils.get_dict_properties(s, columns) for s in gates)
@@ -172,8 +510,9 @@ class ShowGate(command.ShowOne):
         self.log.debug("take_action(%s)", parsed_args)
 
         knob_client = self.app.client_manager.knob
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
         try:
-            gate = knob_client.gates.get(parsed_args.gate_id)
+            gate = knob_client.gates.get(gate_id)
         except exceptions.HTTPNotFound:
             raise exceptions.CommandError(_('Gate not found: %s')
                                    % parsed_args.gate_id)
@@ -206,27 +545,22 @@ class GateAddTarget(command.Command):
             metavar='<name>',
             help=_('target to add to specified gate')
         )
-        parser.add_argument(
-            '--routable',
-            action='store_true',
-            default=True,
-            help=_('Refer to state network VM target VM is connected to')
-        )
+        _add_routable_arguments(parser)
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)', parsed_args)
         knob_client = self.app.client_manager.knob
-        
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
+
         fields = {
-            'gate_id': parsed_args.gate_id,
+            'gate_id': gate_id,
             'server_id': parsed_args.server_id,
             'name': parsed_args.name,
             'routable': parsed_args.routable,
             }
         try:
-            target = knob_client.gates.add_target(parsed_args.gate_id, 
-                                                  **fields)
+            target = knob_client.gates.add_target(gate_id, **fields)
         except exceptions.HTTPNotFound:
             raise exceptions.CommandError(_('Gate not found: %s')
                                    % parsed_args.gate_id)
@@ -258,20 +592,118 @@ class GateRemoveTarget(command.Command):
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)', parsed_args)
         knob_client = self.app.client_manager.knob
-        
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
+        target_id = _resolve(knob_client.gates.resolve_target, gate_id,
+                             parsed_args.target_id)
+
         try:
-            knob_client.gates.remove_target(parsed_args.gate_id,
-                                            parsed_args.target_id)
+            knob_client.gates.remove_target(gate_id, target_id)
         except exceptions.HTTPNotFound:
             raise exceptions.CommandError(_('Gate not found: %s')
                                    % parsed_args.gate)
 
 
 
-class GateListTargets(command.Lister):
+class GateAddTargets(command.Lister):
+    """Add several target VMs to SSH gate."""
+
+    log = logging.getLogger(__name__ + '.GateAddTargets')
+
+    def get_parser(self, prog_name):
+        parser = super(GateAddTargets, self).get_parser(prog_name)
+        parser.add_argument(
+            'gate_id',
+            metavar='<gate_id>',
+            help=_('gate to add targets to')
+        )
+        parser.add_argument(
+            'server_ids',
+            metavar='<server_id>',
+            nargs='*',
+            help=_('nova ID of target to add, optionally followed by '
+                   '"=<name>" (read from stdin when omitted or "-")')
+        )
+        _add_routable_arguments(parser)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=knob_utils.DEFAULT_CONCURRENCY,
+            metavar='<concurrency>',
+            help=_('Maximum number of requests in flight')
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)', parsed_args)
+        knob_client = self.app.client_manager.knob
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
+
+        targets = []
+        for value in _read_ids(parsed_args.server_ids):
+            server_id, _sep, name = value.partition('=')
+            targets.append({
+                'gate_id': gate_id,
+                'server_id': server_id,
+                'name': name or server_id,
+                'routable': parsed_args.routable,
+            })
+        results = knob_client.gates.add_targets(
+            gate_id, targets,
+            concurrency=parsed_args.concurrency)
+
+        columns = ['server_id', 'status', 'detail']
+        return columns, _batch_rows(results, 'server_id')
+
+
+class GateRemoveTargets(command.Lister):
+    """Remove several targets from SSH gate."""
+
+    log = logging.getLogger(__name__ + '.GateRemoveTargets')
+
+    def get_parser(self, prog_name):
+        parser = super(GateRemoveTargets, self).get_parser(prog_name)
+        parser.add_argument(
+            'gate_id',
+            metavar='<gate_id>',
+            help=_('gate to remove targets from')
+        )
+        parser.add_argument(
+            'target_ids',
+            metavar='<target_id>',
+            nargs='*',
+            help=_('target to remove (read from stdin when omitted or "-")')
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=knob_utils.DEFAULT_CONCURRENCY,
+            metavar='<concurrency>',
+            help=_('Maximum number of requests in flight')
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)', parsed_args)
+        knob_client = self.app.client_manager.knob
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
+        target_ids = [_resolve(knob_client.gates.resolve_target, gate_id,
+                               target_id)
+                      for target_id in _read_ids(parsed_args.target_ids)]
+
+        results = knob_client.gates.remove_targets(
+            gate_id, target_ids,
+            concurrency=parsed_args.concurrency)
+
+        columns = ['target_id', 'status', 'detail']
+        return columns, _batch_rows(results, None)
+
+
+class GateListTargets(_WatchMixin, command.Lister):
     """List targets accessible via gate."""
 
     log = logging.getLogger(__name__ + ".ListTargets")
+    watch_columns = ['server_id', 'name', 'gate_id', 'routable']
+    watch_key = 'server_id'
 
     def get_parser(self, prog_name):
         parser = super(GateListTargets, self).get_parser(prog_name)
@@ -280,15 +712,33 @@ class GateListTargets(command.Lister):
             metavar='<gate_id>',
             help=_('gate to delete')
         )
+        parser.add_argument(
+            '--page-size',
+            type=_page_size,
+            default=knob_utils.DEFAULT_PAGE_SIZE,
+            metavar='<page-size>',
+            help=_('Number of rows fetched per request')
+        )
+        self.add_list_arguments(parser)
+        self.add_watch_argument(parser)
         return parser
 
+    def make_watcher(self, parsed_args):
+        gates = self.app.client_manager.knob.gates
+        return gates.watch_targets(
+            _resolve(gates.resolve, parsed_args.gate_id),
+            page_size=parsed_args.page_size)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
-        params = {}
-            
-        targets = self.app.client_manager.knob.gates.list_targets(parsed_args.gate_id, **params)
-        
-        columns = ['server_id','name', 'gate_id','routable']
+        params = self.list_options(parsed_args)
+
+        gates = self.app.client_manager.knob.gates
+        targets = gates.iter_targets(
+            _resolve(gates.resolve, parsed_args.gate_id),
+            page_size=parsed_args.page_size, **params)
+
+        columns = self.list_columns(parsed_args, self.watch_columns)
         return (
             columns,
             (utils.get_dict_properties(s, columns) for s in targets)
@@ -334,7 +784,9 @@ class GateAddKey(command.Command):
             'key_content': key_content,
             }
         try:
-            key = knob_client.gates.add_key(parsed_args.gate_id, **fields)
+            key = knob_client.gates.add_key(
+                _resolve(knob_client.gates.resolve, parsed_args.gate_id),
+                **fields)
         except exceptions.HTTPNotFound:
             raise exceptions.CommandError(_('Key is not added to gate: %s')
                                    % parsed_args.gate_id)
@@ -346,6 +798,129 @@ class GateAddKey(command.Command):
         columns = list(six.iterkeys(key))
         return columns, rows
 
+
+
+class GateAddKeys(command.Lister):
+    """Add the public keys of files or directories to SSH gate.
+
+    Keys already authorized on the gate, or given twice, are skipped.
+    """
+
+    log = logging.getLogger(__name__ + '.GateAddKeys')
+
+    def get_parser(self, prog_name):
+        parser = super(GateAddKeys, self).get_parser(prog_name)
+        parser.add_argument(
+            'gate_id',
+            metavar='<gate_id>',
+            help=_('gate to add public keys to')
+        )
+        parser.add_argument(
+            'paths',
+            metavar='<path>',
+            nargs='+',
+            help=_('authorized_keys-format file, or directory of public '
+                   'key files')
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=knob_utils.DEFAULT_CONCURRENCY,
+            metavar='<concurrency>',
+            help=_('Maximum number of requests in flight')
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)', parsed_args)
+        knob_client = self.app.client_manager.knob
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
+
+        known = set()
+        # New keys are not given the name of a key already on the gate.
+        names = set()
+        for key in knob_client.gates.iter_keys(gate_id):
+            if key.get('name'):
+                names.add(key['name'])
+            try:
+                known.add(ssh_keys.parse(key.get('key_content', '')
+                                         ).fingerprint)
+            except ssh_keys.InvalidKey:
+                pass
+
+        given = {}
+        rows = []
+        to_add = []
+        for path in parsed_args.paths:
+            try:
+                keys = ssh_keys.read(path)
+            except (IOError, OSError) as e:
+                raise exceptions.CommandError(
+                    _("Key file '%(path)s' could not be read: %(error)s")
+                    % {'path': path, 'error': e})
+            for source, key in keys:
+                if isinstance(key, ssh_keys.InvalidKey):
+                    rows.append((source, '', '', 'invalid',
+                                 six.text_type(key)))
+                    continue
+                if key.fingerprint in known:
+                    rows.append((source, key.comment, key.fingerprint,
+                                 'skipped', _('already on gate')))
+                    continue
+                if key.fingerprint in given:
+                    rows.append((source, key.comment, key.fingerprint,
+                                 'skipped', _('duplicate of %s')
+                                 % given[key.fingerprint]))
+                    continue
+                given[key.fingerprint] = source
+                # Filled in with the outcome once the keys are added.
+                rows.append(None)
+                to_add.append((len(rows) - 1, source,
+                               self._unique_name(key, names), key))
+
+        results = knob_client.gates.add_keys(
+            gate_id,
+            [{'name': name, 'key_content': key.content}
+             for _index, _source, name, key in to_add],
+            concurrency=parsed_args.concurrency)
+        for (index, source, name, key), result in zip(to_add, results):
+            if result.ok:
+                rows[index] = (source, name, key.fingerprint, 'added', '')
+            else:
+                rows[index] = (source, name, key.fingerprint, 'error',
+                               six.text_type(result.error))
+
+        self._summary = collections.Counter(row[3] for row in rows)
+        columns = ['source', 'name', 'fingerprint', 'status', 'detail']
+        return columns, rows
+
+    def produce_output(self, parsed_args, column_names, data):
+        result = super(GateAddKeys, self).produce_output(
+            parsed_args, column_names, data)
+        self.app.stderr.write(
+            _('%(added)d added, %(skipped)d skipped, %(invalid)d invalid, '
+              '%(error)d failed\n') % dict(
+                  (status, self._summary[status])
+                  for status in ('added', 'skipped', 'invalid', 'error')))
+        return result
+
+    @staticmethod
+    def _unique_name(key, names):
+        """Names a key after its comment, made unique among `names`.
+
+        `names` holds the names of the keys on the gate and of those
+        named so far; the new name is added to it.
+        """
+        base = key.comment.split()[0] if key.comment else (
+            os.path.splitext(os.path.basename(
+                key.source.rsplit(':', 1)[0]))[0])
+        name, count = base, 1
+        while name in names:
+            count += 1
+            name = '%s-%d' % (base, count)
+        names.add(name)
+        return name
+
     
 class GateRemoveKey(command.Command):
     """Remove public key from SSH gate."""
@@ -369,18 +944,22 @@ class GateRemoveKey(command.Command):
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)', parsed_args)
         knob_client = self.app.client_manager.knob
+        gate_id = _resolve(knob_client.gates.resolve, parsed_args.gate_id)
+        key_id = _resolve(knob_client.gates.resolve_key, gate_id,
+                          parsed_args.key_id)
         try:
-            knob_client.gates.remove_key(parsed_args.gate_id,
-                                         parsed_args.key_id)
+            knob_client.gates.remove_key(gate_id, key_id)
         except exceptions.HTTPNotFound:
             raise exceptions.CommandError(_('Key not found: %s')
                                    % parsed_args.key_id)
 
 
-class GateListKeys(command.Lister):
+class GateListKeys(_WatchMixin, command.Lister):
     """List targets accessible via gate."""
 
     log = logging.getLogger(__name__ + ".ListKeys")
+    watch_columns = ['id', 'name', 'gate_id', 'created_at']
+    watch_key = 'id'
 
     def get_parser(self, prog_name):
         parser = super(GateListKeys, self).get_parser(prog_name)
@@ -389,16 +968,200 @@ class GateListKeys(command.Lister):
             metavar='<gate_id>',
             help=_("Request facet terms for all projects (admin only)")
         )
+        parser.add_argument(
+            '--page-size',
+            type=_page_size,
+            default=knob_utils.DEFAULT_PAGE_SIZE,
+            metavar='<page-size>',
+            help=_('Number of rows fetched per request')
+        )
+        self.add_list_arguments(parser)
+        self.add_watch_argument(parser)
         return parser
 
+    def make_watcher(self, parsed_args):
+        gates = self.app.client_manager.knob.gates
+        return gates.watch_keys(
+            _resolve(gates.resolve, parsed_args.gate_id),
+            page_size=parsed_args.page_size)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
-        params = {}
-            
-        keys = self.app.client_manager.knob.gates.list_keys(parsed_args.gate_id,**params)
-        
-        columns = ['id','name', 'gate_id', 'created_at']
+        params = self.list_options(parsed_args)
+
+        gates = self.app.client_manager.knob.gates
+        keys = gates.iter_keys(
+            _resolve(gates.resolve, parsed_args.gate_id),
+            page_size=parsed_args.page_size, **params)
+
+        columns = self.list_columns(parsed_args, self.watch_columns)
         return (
             columns,
             (utils.get_dict_properties(s, columns) for s in keys)
         )
+
+
+class GateSync(command.Lister):
+    """Make the targets and keys of gates match a YAML manifest.
+
+    The manifest lists gates by id or name, each with the targets and the
+    keys it should have::
+
+        gates:
+          - name: web
+            targets:
+              - server_id: <nova id>
+                name: web-1
+            keys:
+              - name: alice
+                key: ssh-ed25519 AAAA... alice@example.com
+              - name: bob
+                key_file: keys/bob.pub
+
+    Targets and keys missing on a gate are added and the ones not in the
+    manifest removed.  A gate without a targets or keys section keeps
+    what it has of it.
+    """
+
+    log = logging.getLogger(__name__ + '.GateSync')
+
+    def get_parser(self, prog_name):
+        parser = super(GateSync, self).get_parser(prog_name)
+        parser.add_argument(
+            'manifest',
+            metavar='<manifest>',
+            help=_('YAML file describing the gates')
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            default=False,
+            help=_('Only show the operations that would be made')
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=knob_utils.DEFAULT_CONCURRENCY,
+            metavar='<concurrency>',
+            help=_('Maximum number of requests in flight')
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=10,
+            metavar='<requests/s>',
+            help=_('Maximum number of changes made per second, 0 for no '
+                   'limit (default: 10)')
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)', parsed_args)
+        knob_client = self.app.client_manager.knob
+        self._timings = []
+
+        start = time.time()
+        manifest = self._load_manifest(parsed_args.manifest)
+        gate_ids = self._resolve_gates(knob_client, manifest)
+        results = sync.fetch(knob_client.gates, gate_ids,
+                             concurrency=parsed_args.concurrency)
+        for result in results:
+            if not result.ok:
+                raise exceptions.CommandError(
+                    _('Could not read gate %(gate)s: %(error)s')
+                    % {'gate': result.item, 'error': result.error})
+        self._timings.append(('fetch', time.time() - start))
+
+        start = time.time()
+        operations = []
+        for entry, result in zip(manifest, results):
+            operations.extend(sync.plan(result.result, entry['targets'],
+                                        entry['keys']))
+        self._timings.append(('plan', time.time() - start))
+
+        columns = ['gate_id', 'action', 'item', 'status', 'detail']
+        if parsed_args.dry_run:
+            return columns, [(op.gate_id, op.action, op.item, 'planned', '')
+                             for op in operations]
+
+        start = time.time()
+        results = sync.apply(knob_client.gates, operations,
+                             concurrency=parsed_args.concurrency,
+                             rate=parsed_args.rate)
+        self._timings.append(('apply', time.time() - start))
+        return columns, _batch_rows_of_operations(results)
+
+    def produce_output(self, parsed_args, column_names, data):
+        result = super(GateSync, self).produce_output(
+            parsed_args, column_names, data)
+        self.app.stderr.write(', '.join(
+            '%s %.2fs' % timing for timing in self._timings) + '\n')
+        return result
+
+    def _load_manifest(self, path):
+        """Returns the manifest gates, with keys read and validated."""
+        try:
+            with open(path) as f:
+                manifest = yaml.safe_load(f) or {}
+        except (IOError, OSError, yaml.YAMLError) as e:
+            raise exceptions.CommandError(
+                _("Manifest '%(path)s' could not be read: %(error)s")
+                % {'path': path, 'error': e})
+        base = os.path.dirname(os.path.abspath(path))
+
+        gates = []
+        for number, gate in enumerate(manifest.get('gates') or [], 1):
+            if not isinstance(gate, dict) or not (
+                    gate.get('id') or gate.get('name')):
+                raise exceptions.CommandError(
+                    _('Gate %d of the manifest has no id or name') % number)
+            targets = gate.get('targets')
+            if targets is not None:
+                targets = [
+                    dict(target,
+                         name=target.get('name') or target['server_id'])
+                    for target in targets]
+            keys = gate.get('keys')
+            if keys is not None:
+                keys = [self._load_key(key, base) for key in keys]
+            gates.append({'id': gate.get('id'), 'name': gate.get('name'),
+                          'targets': targets, 'keys': keys})
+        return gates
+
+    @staticmethod
+    def _load_key(key, base):
+        content = key.get('key')
+        source = key.get('name')
+        if content is None and key.get('key_file'):
+            source = os.path.join(base, key['key_file'])
+            try:
+                with open(source) as f:
+                    content = f.read()
+            except (IOError, OSError) as e:
+                raise exceptions.CommandError(
+                    _("Key file '%(path)s' could not be read: %(error)s")
+                    % {'path': source, 'error': e})
+        try:
+            parsed = ssh_keys.parse(content or '', source)
+        except ssh_keys.InvalidKey as e:
+            raise exceptions.CommandError(
+                _('Invalid key %(key)s: %(error)s')
+                % {'key': source, 'error': e})
+        name = key.get('name') or parsed.comment or parsed.fingerprint
+        return {'name': name, 'key_content': parsed.content}
+
+    @staticmethod
+    def _resolve_gates(knob_client, manifest):
+        """Returns the IDs of the manifest gates, looking up names once."""
+        names = [gate['name'] for gate in manifest if gate['id'] is None]
+        ids = dict(zip(names, _resolve(knob_client.gates.resolve_all, names)))
+        gate_ids = []
+        for gate in manifest:
+            if gate['id'] is not None:
+                gate_ids.append(gate['id'])
+                continue
+            if ids[gate['name']] == gate['name']:
+                raise exceptions.CommandError(
+                    _('No gate is named %s') % gate['name'])
+            gate_ids.append(ids[gate['name']])
+        return gate_ids
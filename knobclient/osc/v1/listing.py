@@ -0,0 +1,90 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Options shared by the Knob v1 list commands"""
+
+from knobclient.i18n import _
+from knobclient import exc as exceptions
+
+SORT_DIRECTIONS = ('asc', 'desc')
+
+
+def _split(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class ListOptionsMixin(object):
+    """Adds --fields, --filter, --sort and --limit to a listing.
+
+    The options are passed to the manager, which asks the server for
+    them and applies filters and sort order again to what it returns.
+    """
+
+    def add_list_arguments(self, parser):
+        parser.add_argument(
+            '--fields',
+            type=_split,
+            metavar='<field>[,<field>,...]',
+            help=_('Fetch and show only these fields')
+        )
+        parser.add_argument(
+            '--filter',
+            action='append',
+            dest='filters',
+            default=[],
+            metavar='<key>=<value>',
+            help=_('List only the rows whose <key> field is <value> '
+                   '(repeat option to filter on several fields)')
+        )
+        parser.add_argument(
+            '--sort',
+            type=_split,
+            metavar='<field>[:<direction>][,...]',
+            help=_('Order the rows by these fields, direction being '
+                   '"asc" (default) or "desc"')
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            metavar='<count>',
+            help=_('List at most <count> rows')
+        )
+
+    def list_options(self, parsed_args):
+        """Returns the options as keyword arguments of a manager listing."""
+        filters = {}
+        for value in parsed_args.filters:
+            key, sep, wanted = value.partition('=')
+            if not sep or not key:
+                raise exceptions.CommandError(
+                    _('Invalid filter %s, expected <key>=<value>') % value)
+            filters[key] = wanted
+        sort = []
+        for value in parsed_args.sort or ():
+            key, _sep, direction = value.partition(':')
+            direction = direction.lower() or SORT_DIRECTIONS[0]
+            if direction not in SORT_DIRECTIONS:
+                raise exceptions.CommandError(
+                    _('Invalid sort direction %(direction)s for %(key)s, '
+                      'expected one of %(directions)s')
+                    % {'direction': direction, 'key': key,
+                       'directions': ', '.join(SORT_DIRECTIONS)})
+            sort.append((key, direction))
+        if parsed_args.limit is not None and parsed_args.limit < 0:
+            raise exceptions.CommandError(_('--limit cannot be negative'))
+        return {'filters': filters or None, 'fields': parsed_args.fields,
+                'sort': sort or None, 'limit': parsed_args.limit}
+
+    def list_columns(self, parsed_args, columns):
+        """Returns the columns to show, the --fields if given."""
+        return parsed_args.fields or columns
@@ -18,8 +18,12 @@ import logging
 from osc_lib.command import command
 from osc_lib import utils
 
+from knobclient.i18n import _
+from knobclient import exc as exceptions
+from knobclient.osc.v1 import listing
 
-class ListService(command.Lister):
+
+class ListService(listing.ListOptionsMixin, command.Lister):
     """List Knob services."""
 
     log = logging.getLogger(__name__ + ".ListService")
@@ -32,19 +36,65 @@ class ListService(command.Lister):
             default=False,
             help="Request facet terms for all projects (admin only)"
         )
+        region_group = parser.add_mutually_exclusive_group()
+        region_group.add_argument(
+            "--region",
+            metavar='<region>',
+            action='append',
+            dest='regions',
+            help=_("Region to query (repeat option to query several "
+                   "regions at once)")
+        )
+        region_group.add_argument(
+            "--all-regions",
+            action='store_true',
+            default=False,
+            help=_("Query every region with a knob endpoint at once")
+        )
+        parser.add_argument(
+            "--region-timeout",
+            type=float,
+            metavar='<seconds>',
+            help=_("Give up on a region that takes longer than this")
+        )
+        self.add_list_arguments(parser)
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
 
-        columns = ['tenant_id', 'name', 'project_id','status']
-        params = {
-            "all_projects": parsed_args.all_projects
-        }
-        gates = self.app.client_manager.knob.services.list(**params)
-        
-        return (
-            columns,
-            (utils.get_dict_properties(s, columns) for s in gates)
-        )
-        
\ No newline at end of file
+        columns = self.list_columns(
+            parsed_args, ['tenant_id', 'name', 'project_id', 'status'])
+        params = self.list_options(parsed_args)
+        params["all_projects"] = parsed_args.all_projects
+        services = self.app.client_manager.knob.services
+        if not (parsed_args.regions or parsed_args.all_regions):
+            gates = services.list(**params)
+            return (
+                columns,
+                (utils.get_dict_properties(s, columns) for s in gates)
+            )
+
+        try:
+            results = services.iter_regions(
+                regions=parsed_args.regions,
+                timeout=parsed_args.region_timeout,
+                **params)
+        except ValueError as e:
+            raise exceptions.CommandError(
+                _('--region and --all-regions cannot be used with '
+                  '--endpoint: %s') % e)
+        return ['region'] + columns, self._region_rows(results, columns)
+
+    def _region_rows(self, results, columns):
+        # Rows of a region are shown as soon as it answers, not after the
+        # slowest region.
+        for result in results:
+            if not result.ok:
+                self.log.warning(_('Region %(region)s failed: %(error)s'),
+                                 {'region': result.item,
+                                  'error': result.error})
+                continue
+            for service in result.result:
+                yield [result.item] + list(
+                    utils.get_dict_properties(service, columns))
@@ -14,11 +14,13 @@
 """Knob v1 target configuration"""
 
 import logging
-import sys
 
 from osc_lib.command import command
 from osc_lib import utils
+import six
 
+from knobclient.common import ssh_config
+from knobclient.common import utils as knob_utils
 from knobclient.i18n import _ 
 from knobclient import exc as exceptions
 
@@ -43,7 +45,9 @@ class GenerateConfig(command.Command):
         parser.add_argument(
             'target_id',
             metavar='<target_id>',
-            help=_('Target to connect to')
+            nargs='?',
+            help=_('Target to connect to (comma-separated for several '
+                   'targets, omitted with --all)')
         )
         parser.add_argument(
             'user',
@@ -56,29 +60,156 @@ class GenerateConfig(command.Command):
             metavar='<target_key_file>',
             help=_('target private key file path')
         )
-        
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            default=False,
+            help=_('Generate the config of every target on the gate')
+        )
+        parser.add_argument(
+            '--output',
+            metavar='<file>',
+            help=_('Atomically replace this file, e.g. one included from '
+                   '~/.ssh/config, instead of writing to stdout')
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=knob_utils.DEFAULT_CONCURRENCY,
+            metavar='<concurrency>',
+            help=_('Maximum number of requests in flight')
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            default=False,
+            help=_('Regenerate every config instead of reusing the ones '
+                   'cached for unchanged gates and targets')
+        )
+        parser.add_argument(
+            '--cache-dir',
+            metavar='<directory>',
+            default=knob_utils.env('KNOB_SSH_CONFIG_CACHE_DIR'),
+            help=_('Directory of the SSH config cache '
+                   '(Env: KNOB_SSH_CONFIG_CACHE_DIR)')
+        )
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug('take_action(%s)', parsed_args)
         knob_client = self.app.client_manager.knob
+        gates = knob_client.gates
+
+        targets = None
+        try:
+            gate_id = gates.resolve(parsed_args.gate_id)
+            if parsed_args.all:
+                targets = list(gates.iter_targets(gate_id))
+                target_ids = [self._target_id(target) for target in targets]
+            elif parsed_args.target_id:
+                target_ids = [gates.resolve_target(gate_id, target_id)
+                              for target_id
+                              in parsed_args.target_id.split(',')
+                              if target_id]
+            else:
+                raise exceptions.CommandError(
+                    _('Either <target_id> or --all is required'))
+        except exceptions.NoUniqueMatch as e:
+            raise exceptions.CommandError(six.text_type(e))
 
         fields = {
-            'gate_id': parsed_args.gate_id,
+            'gate_id': gate_id,
             'gate_key_file': parsed_args.gate_key_file,
-            'target_id': parsed_args.target_id,
             'user': parsed_args.user,
             'target_key_file': parsed_args.target_key_file
             }
-            
-        try:
-            target = knob_client.targets.generate_config(**fields)
-        except exceptions.HTTPNotFound:
-            raise exceptions.CommandError(_('Target not found: %s')
-                                   % parsed_args.target_id)
-                
-        sys.stdout.write(target)
-        return
 
+        configs = {}
+        revisions = {}
+        cache = None
+        if not parsed_args.no_cache:
+            cache = ssh_config.ConfigCache(parsed_args.cache_dir)
+            revisions = self._revisions(knob_client, gate_id, target_ids,
+                                        targets, parsed_args.concurrency)
+            for target_id in target_ids:
+                if target_id in revisions:
+                    config = cache.get(dict(fields, target_id=target_id),
+                                       revisions[target_id])
+                    if config is not None:
+                        configs[target_id] = config
+            self.log.debug('%d of %d SSH configs cached', len(configs),
+                           len(target_ids))
+
+        missing = [target_id for target_id in target_ids
+                   if target_id not in configs]
+        if len(target_ids) == 1 and missing and not parsed_args.all:
+            try:
+                results = [knob_utils.ItemResult(
+                    missing[0], knob_client.targets.generate_config(
+                        target_id=missing[0], **fields), None)]
+            except exceptions.HTTPClientError as e:
+                if e.status_code != 404:
+                    raise
+                raise exceptions.CommandError(_('Target not found: %s')
+                                              % parsed_args.target_id)
+        elif missing:
+            results = knob_client.targets.generate_configs(
+                missing, concurrency=parsed_args.concurrency, **fields)
+        else:
+            results = []
 
+        failed = []
+        for result in results:
+            if not result.ok:
+                failed.append(result)
+                self.log.warning(_('No config for target %(target)s: '
+                                   '%(error)s'),
+                                 {'target': result.item,
+                                  'error': result.error})
+                continue
+            configs[result.item] = result.result
+            if cache is not None and result.item in revisions:
+                cache.put(dict(fields, target_id=result.item),
+                          revisions[result.item], result.result)
 
+        config = ssh_config.merge(configs[target_id] for target_id
+                                  in target_ids if target_id in configs)
+        if parsed_args.output:
+            ssh_config.write_atomic(parsed_args.output, config)
+        else:
+            self.app.stdout.write(config)
+        return 1 if failed else 0
+
+    @staticmethod
+    def _target_id(target):
+        return target.get('server_id') or target['id']
+
+    def _revisions(self, knob_client, gate_id, target_ids, targets=None,
+                   concurrency=knob_utils.DEFAULT_CONCURRENCY):
+        """Revision of the gate and target each target's config is from.
+
+        The records of the targets are fetched one by one unless the
+        listing of the gate is given as `targets`.  Targets missing from
+        the gate get no revision, so their config is neither served from
+        nor stored in the cache.
+        """
+        gates = knob_client.gates
+        try:
+            gate = gates.get(gate_id)
+        except exceptions.HTTPClientError as e:
+            if e.status_code != 404:
+                raise
+            raise exceptions.CommandError(_('Gate not found: %s') % gate_id)
+        if targets is None:
+            targets = []
+            for result in knob_utils.run_concurrently(
+                    lambda target_id: gates.get_target(gate_id, target_id),
+                    target_ids, concurrency):
+                if result.ok:
+                    targets.append(result.result)
+                elif getattr(result.error, 'status_code', None) != 404:
+                    raise result.error
+        gate_revision = ssh_config.revision(gate)
+        return dict((self._target_id(target),
+                     '%s %s' % (gate_revision, ssh_config.revision(target)))
+                    for target in targets)
@@ -0,0 +1,55 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import argparse
+
+from cliff import lister
+from cliff import show
+import mock
+import testtools
+
+from knobclient.osc.v1 import batch
+
+
+class FormatTest(testtools.TestCase):
+
+    def setUp(self):
+        super(FormatTest, self).setUp()
+        self.batch = batch.RunBatch(mock.Mock(), None)
+
+    def test_lister_columns(self):
+        cmd = mock.Mock(spec=lister.Lister)
+        result = (('ID', 'Name', 'Status'), [('g1', 'one', 'ACTIVE')])
+        self.assertEqual(
+            [{'ID': 'g1', 'Name': 'one', 'Status': 'ACTIVE'}],
+            self.batch._format(cmd, argparse.Namespace(columns=[]), result))
+        self.assertEqual(
+            [{'ID': 'g1', 'Status': 'ACTIVE'}],
+            self.batch._format(
+                cmd, argparse.Namespace(columns=['status', 'ID']), result))
+
+    def test_show_columns(self):
+        cmd = mock.Mock(spec=show.ShowOne)
+        result = (('Gate ID', 'Name'), ('g1', 'one'))
+        self.assertEqual(
+            {'Gate ID': 'g1'},
+            self.batch._format(
+                cmd, argparse.Namespace(columns=['gate_id']), result))
+        self.assertRaises(
+            ValueError, self.batch._format, cmd,
+            argparse.Namespace(columns=['bogus']), result)
+
+    def test_subcommand_stdout(self):
+        app = mock.Mock()
+        subcommand_app = batch._SubcommandApp(app)
+        self.assertIs(app.stderr, subcommand_app.stdout)
+        self.assertIs(app.client_manager, subcommand_app.client_manager)
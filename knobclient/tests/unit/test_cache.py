@@ -0,0 +1,83 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import testtools
+
+from knobclient.common import cache
+
+
+class ResourceTypeTest(testtools.TestCase):
+
+    def test_resource_type(self):
+        self.assertEqual('gates', cache.resource_type('/gates?limit=10'))
+        self.assertEqual('gates', cache.resource_type('/gates/g1'))
+        self.assertEqual('keys', cache.resource_type('/gates/g1/keys'))
+        self.assertEqual('keys', cache.resource_type('/gates/g1/keys/k1'))
+        self.assertIsNone(cache.resource_type('/'))
+
+
+@mock.patch('time.time')
+class ResponseCacheTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ResponseCacheTest, self).setUp()
+        self.cache = cache.ResponseCache(ttl={'gates': 30})
+
+    def test_cacheable(self, time):
+        self.assertTrue(self.cache.cacheable('/gates'))
+        self.assertFalse(self.cache.cacheable('/ssh_services'))
+
+    def test_fresh_entry(self, time):
+        time.return_value = 100
+        self.cache.store('/gates', b'body', 'etag')
+        time.return_value = 129
+        self.assertEqual((b'body', None), self.cache.lookup('/gates'))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test_stale_entry_is_revalidated(self, time):
+        time.return_value = 100
+        self.cache.store('/gates', b'body', 'etag')
+        time.return_value = 130
+        self.assertEqual((None, 'etag'), self.cache.lookup('/gates'))
+        self.assertEqual(b'body', self.cache.renew('/gates'))
+        self.assertEqual((b'body', None), self.cache.lookup('/gates'))
+        self.assertEqual(1, self.cache.revalidated)
+
+    def test_stale_entry_without_etag_is_dropped(self, time):
+        time.return_value = 100
+        self.cache.store('/gates', b'body')
+        time.return_value = 130
+        self.assertEqual((None, None), self.cache.lookup('/gates'))
+        self.assertIsNone(self.cache.renew('/gates'))
+
+    def test_least_recently_used_evicted(self, time):
+        time.return_value = 100
+        self.cache.max_entries = 2
+        self.cache.store('/gates/a', b'a')
+        self.cache.store('/gates/b', b'b')
+        self.cache.lookup('/gates/a')
+        self.cache.store('/gates/c', b'c')
+        self.assertEqual(b'a', self.cache.lookup('/gates/a')[0])
+        self.assertIsNone(self.cache.lookup('/gates/b')[0])
+        self.assertEqual(b'c', self.cache.lookup('/gates/c')[0])
+
+    def test_invalidate(self, time):
+        time.return_value = 100
+        urls = ['/gates?limit=10', '/gates/a', '/gates/a/keys',
+                '/gates/a/keys/k', '/gates/b', '/gates/b/keys']
+        for url in urls:
+            self.cache.store(url, b'x')
+        self.cache.invalidate('/gates/a/keys')
+        self.assertEqual(
+            ['/gates/b', '/gates/b/keys'],
+            [url for url in urls if self.cache.lookup(url)[0] is not None])
@@ -0,0 +1,332 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import gzip
+import io
+import json
+import os
+
+from keystoneauth1 import exceptions as ks_exceptions
+from keystoneauth1 import plugin
+from keystoneauth1 import session as ks_session
+import mock
+import requests
+import testtools
+
+from knobclient import client
+from knobclient import exc
+
+ENDPOINT = 'http://knob.invalid:8080/v1'
+
+
+def make_response(status=200, body=None, headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = b'' if body is None else json.dumps(body).encode('utf-8')
+    resp.headers.update(headers or {})
+    resp.elapsed = datetime.timedelta(0)
+    return resp
+
+
+class ClientTestCase(testtools.TestCase):
+    """Sends the requests of a Client to a mocked Adapter.request."""
+
+    def setUp(self):
+        super(ClientTestCase, self).setUp()
+        patcher = mock.patch('keystoneauth1.adapter.Adapter.request',
+                             return_value=make_response(body={}))
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_client(self, **kwargs):
+        kwargs.setdefault('endpoint', ENDPOINT)
+        kwargs.setdefault('project_id', 'demo')
+        self.knob = client.Client(**kwargs)
+        return self.knob.gates.client
+
+    def sent_headers(self, index=-1):
+        return self.request.call_args_list[index][1]['headers']
+
+
+class HeadersTest(ClientTestCase):
+
+    @mock.patch.dict(os.environ, {'OS_USERNAME': 'env-user',
+                                  'OS_PROJECT_NAME': 'env-project'},
+                     clear=True)
+    def test_identity_headers(self):
+        http = self.make_client(project_name='demo-project')
+        http.get('/gates')
+        headers = self.sent_headers()
+        self.assertEqual('demo', headers['X-Project-Id'])
+        self.assertEqual('demo-project', headers['X-Project-Name'])
+        self.assertEqual('env-user', headers['X-User-Name'])
+        self.assertNotIn('X-User-Domain-Id', headers)
+        self.assertEqual('application/json', headers['Accept'])
+
+    def test_method_templates(self):
+        http = self.make_client()
+        http.delete('/gates/g1')
+        self.assertEqual('application/octet-stream',
+                         self.sent_headers()['Content-Type'])
+        self.assertNotIn('Accept', self.sent_headers())
+
+    def test_caller_headers_do_not_change_template(self):
+        http = self.make_client()
+        http.get('/gates', headers={'Accept': 'text/plain', 'X-Extra': '1'})
+        self.assertEqual('text/plain', self.sent_headers()['Accept'])
+        http.get('/gates')
+        self.assertEqual('application/json', self.sent_headers()['Accept'])
+        self.assertNotIn('X-Extra', self.sent_headers())
+
+    def test_decodes_body(self):
+        http = self.make_client()
+        self.request.return_value = make_response(body={'gates': []})
+        self.assertEqual({'gates': []}, http.get('/gates'))
+        self.request.return_value = make_response(status=204)
+        self.assertIsNone(http.delete('/gates/g1'))
+
+    def test_error_status(self):
+        http = self.make_client()
+        self.request.return_value = make_response(
+            status=404, body={'title': 'Not Found', 'description': 'g1'})
+        e = self.assertRaises(exc.HTTPClientError, http.get, '/gates/g1')
+        self.assertEqual(404, e.status_code)
+        self.assertIn('Not Found: g1', str(e))
+
+
+class FakeAuth(plugin.BaseAuthPlugin):
+    """Hands out token-1, token-2... a new one after each invalidate."""
+
+    def __init__(self):
+        super(FakeAuth, self).__init__()
+        self.tokens = 1
+
+    def get_token(self, session, **kwargs):
+        return 'token-%d' % self.tokens
+
+    def invalidate(self):
+        self.tokens += 1
+        return True
+
+
+class ReauthenticationTest(testtools.TestCase):
+
+    def test_rejected_token_replaced_for_one_request(self):
+        session = ks_session.Session(auth=FakeAuth())
+        knob = client.Client(session=session, endpoint=ENDPOINT)
+        responses = [make_response(status=401),
+                     make_response(body={'gates': []})]
+        tokens = []
+
+        def request(method, url, headers=None, **kwargs):
+            tokens.append(headers['X-Auth-Token'])
+            return responses.pop(0)
+        with mock.patch.object(session.session, 'request',
+                               side_effect=request):
+            self.assertEqual({'gates': []}, knob.gates.client.get('/gates'))
+        self.assertEqual(['token-1', 'token-2'], tokens)
+
+
+class CircuitBreakerTest(testtools.TestCase):
+
+    def setUp(self):
+        super(CircuitBreakerTest, self).setUp()
+        knob = client.Client(endpoint=ENDPOINT,
+                             project_id='demo', circuit_failure_threshold=1,
+                             circuit_reset_timeout=0)
+        self.http = knob.gates.client
+
+    @mock.patch('keystoneauth1.adapter.Adapter.request',
+                return_value=make_response(status=503))
+    def test_failed_trial_opens_circuit_again(self, request):
+        self.http.circuit.record_failure()
+        self.assertRaises(exc.HTTPServerError, self.http.request, '/gates',
+                          'GET')
+        self.assertEqual(1, request.call_count)
+        self.assertEqual(self.http.circuit.OPEN, self.http.circuit.state)
+        self.assertEqual(1, self.http.retry_policy.metrics['circuit_opened'])
+
+    @mock.patch('keystoneauth1.adapter.Adapter.request',
+                side_effect=ks_exceptions.ConnectTimeout('timed out'))
+    def test_timeout_counts(self, request):
+        self.http.circuit.reset_timeout = 30
+        self.assertRaises(ks_exceptions.ConnectTimeout, self.http.request,
+                          '/gates', 'GET')
+        self.assertEqual(self.http.circuit.OPEN, self.http.circuit.state)
+
+    @mock.patch('keystoneauth1.adapter.Adapter.request',
+                side_effect=[ValueError('boom'), make_response(body={})])
+    def test_other_errors_do_not_count(self, request):
+        self.http.circuit.record_failure()
+        self.assertRaises(ValueError, self.http.request, '/gates', 'GET')
+        # The trial was given up, the next request is one.
+        self.http.request('/gates', 'GET')
+        self.assertEqual(2, request.call_count)
+        self.assertEqual(self.http.circuit.CLOSED, self.http.circuit.state)
+        self.assertNotIn('circuit_opened', self.http.retry_policy.metrics)
+
+
+class PoolTest(ClientTestCase):
+
+    def test_pool_size(self):
+        session = ks_session.Session()
+        self.make_client(session=session, pool_maxsize=32)
+        for scheme in ('http://', 'https://'):
+            adapter = session.session.adapters[scheme]
+            self.assertIsInstance(adapter, ks_session.TCPKeepAliveAdapter)
+            self.assertEqual(32, adapter._pool_maxsize)
+            self.assertEqual(requests.adapters.DEFAULT_POOLSIZE,
+                             adapter._pool_connections)
+
+    def test_default_pool_left_alone(self):
+        session = ks_session.Session()
+        adapter = session.session.adapters['https://']
+        self.make_client(session=session)
+        self.assertIs(adapter, session.session.adapters['https://'])
+
+    def test_keep_alive(self):
+        self.make_client().get('/gates')
+        self.assertNotIn('Connection', self.sent_headers())
+        self.make_client(keep_alive=False).get('/gates')
+        self.assertEqual('close', self.sent_headers()['Connection'])
+
+    def test_timeouts(self):
+        session = ks_session.Session(timeout=30)
+        self.make_client(session=session, connect_timeout=2).get('/gates')
+        self.assertEqual((2, 30), self.request.call_args[1]['timeout'])
+
+
+class ForRegionTest(testtools.TestCase):
+
+    def test_endpoint_override(self):
+        knob = client.Client(endpoint=ENDPOINT, project_id='demo')
+        self.assertRaises(ValueError, knob.gates.client.for_region,
+                          'RegionTwo')
+
+
+class CompressionTest(ClientTestCase):
+
+    body = {'name': 'x' * 2000}
+
+    def _sent_body(self, index=-1):
+        data = self.request.call_args_list[index][1]['data']
+        if self.sent_headers(index).get('Content-Encoding') == 'gzip':
+            data = gzip.GzipFile(fileobj=io.BytesIO(data)).read()
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def test_large_body_compressed(self):
+        http = self.make_client()
+        http.post('/gates', data=self.body)
+        self.assertEqual('gzip', self.sent_headers()['Content-Encoding'])
+        self.assertEqual(self.body, self._sent_body())
+
+    def test_small_body_sent_plain(self):
+        http = self.make_client()
+        http.post('/gates', data={'name': 'x'})
+        self.assertNotIn('Content-Encoding', self.sent_headers())
+        self.assertEqual({'name': 'x'}, self._sent_body())
+
+    def test_compression_off(self):
+        http = self.make_client(compression=False)
+        http.post('/gates', data=self.body)
+        self.assertNotIn('Content-Encoding', self.sent_headers())
+        self.assertEqual('identity', self.sent_headers()['Accept-Encoding'])
+
+    def test_rejected_gzip_falls_back(self):
+        for status in (400, 415):
+            http = self.make_client()
+            self.request.reset_mock()
+            self.request.side_effect = [make_response(status=status),
+                                        make_response(body={})]
+            http.post('/gates', data=self.body)
+            self.assertEqual(2, self.request.call_count)
+            self.assertNotIn('Content-Encoding', self.sent_headers())
+            self.assertEqual(self.body, self._sent_body())
+            self.assertIsNone(http.compress_threshold)
+
+    def test_plain_body_rejected_keeps_compressing(self):
+        http = self.make_client()
+        self.request.side_effect = [make_response(status=400),
+                                    make_response(status=400)]
+        self.assertRaises(exc.HTTPClientError, http.post, '/gates',
+                          data=self.body)
+        self.assertEqual(2, self.request.call_count)
+        self.assertEqual(client.DEFAULT_COMPRESS_THRESHOLD,
+                         http.compress_threshold)
+
+    def test_other_errors_not_retried(self):
+        http = self.make_client()
+        self.request.return_value = make_response(status=409)
+        self.assertRaises(exc.HTTPClientError, http.post, '/gates',
+                          data=self.body)
+        self.assertEqual(1, self.request.call_count)
+
+
+class JsonCodecTest(ClientTestCase):
+
+    def test_codec_used(self):
+        codec = mock.Mock(spec=['dumps', 'loads'])
+        codec.dumps.return_value = b'{}'
+        codec.loads.return_value = {'gates': []}
+        http = self.make_client()
+        http.codec = codec
+        self.assertEqual({'gates': []}, http.post('/gates', data={'a': 1}))
+        codec.dumps.assert_called_once_with({'a': 1})
+        codec.loads.assert_called_once_with(b'{}')
+        self.assertEqual(b'{}', self.request.call_args[1]['data'])
+
+    def test_codec_by_name(self):
+        http = self.make_client(json_codec='json')
+        self.assertEqual('json', http.codec.name)
+        self.assertRaises(ValueError, self.make_client, json_codec='yaml')
+
+
+class RequestHooksTest(ClientTestCase):
+
+    def test_hooks_get_timing(self):
+        http = self.make_client()
+        started, ended = [], []
+        hook = self.knob.add_request_hook(started.append, ended.append)
+        self.request.return_value = make_response(
+            body={'gates': {'id': 'g1'}}, headers={'Content-Length': '26'})
+        http.get('/gates/g1?fields=id')
+        self.assertEqual(1, len(started))
+        self.assertIs(started[0], ended[0])
+        timing = ended[0]
+        self.assertEqual(('GET', '/gates/{id}', 200, 1, 26),
+                         (timing.method, timing.template, timing.status,
+                          timing.attempts, timing.response_bytes))
+        self.assertIsNotNone(timing.elapsed)
+        self.assertIsNone(timing.error)
+        self.knob.remove_request_hook(hook)
+        http.get('/gates')
+        self.assertEqual(1, len(ended))
+
+    def test_error_recorded(self):
+        http = self.make_client()
+        ended = []
+        self.knob.add_request_hook(on_end=ended.append)
+        self.request.return_value = make_response(status=404, body={
+            'title': 'Not Found'})
+        self.assertRaises(exc.HTTPClientError, http.get, '/gates/g1')
+        self.assertEqual(404, ended[0].status)
+        self.assertIsInstance(ended[0].error, exc.HTTPClientError)
+
+    def test_failing_hook_does_not_fail_request(self):
+        http = self.make_client()
+        self.knob.add_request_hook(on_start=mock.Mock(
+            side_effect=RuntimeError('broken')))
+        self.request.return_value = make_response(body={'gates': []})
+        self.assertEqual({'gates': []}, http.get('/gates'))
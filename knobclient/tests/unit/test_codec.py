@@ -0,0 +1,61 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import importlib
+
+import mock
+import testtools
+
+from knobclient.common import codec
+
+
+class CodecTest(testtools.TestCase):
+
+    def _codecs(self):
+        codecs = []
+        for name in codec.CODECS:
+            try:
+                codecs.append(codec.get_codec(name))
+            except ValueError:
+                pass
+        return codecs
+
+    def test_round_trip(self):
+        document = {'name': u'caf\xe9/1', 'targets': [1, 2.5, None, True]}
+        for json_codec in self._codecs():
+            data = json_codec.dumps(document)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(document, json_codec.loads(data))
+
+    def test_to_primitive(self):
+        when = datetime.datetime(2016, 1, 2, 3, 4, 5)
+        for json_codec in self._codecs():
+            self.assertEqual({'at': '2016-01-02T03:04:05.000000'},
+                             json_codec.loads(json_codec.dumps({'at': when})))
+
+    def test_codec_instance(self):
+        json_codec = codec.StdlibCodec()
+        self.assertIs(json_codec, codec.get_codec(json_codec))
+
+    def test_unknown_codec(self):
+        self.assertRaises(ValueError, codec.get_codec, 'yaml')
+
+    @mock.patch.object(importlib, 'import_module', side_effect=ImportError)
+    def test_codec_not_installed(self, import_module):
+        self.assertRaises(ValueError, codec.get_codec, 'orjson')
+
+    @mock.patch.object(codec, '_default', None)
+    @mock.patch.object(importlib, 'import_module', side_effect=ImportError)
+    def test_default_falls_back_to_json(self, import_module):
+        self.assertEqual('json', codec.get_codec().name)
+        self.assertIs(codec.get_codec(), codec.get_codec())
@@ -0,0 +1,186 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import testtools
+
+from knobclient import exc
+from knobclient.v1 import gates
+
+
+class BatchTargetsTest(testtools.TestCase):
+
+    def setUp(self):
+        super(BatchTargetsTest, self).setUp()
+        self.client = mock.Mock()
+        self.manager = gates.GatesManager(self.client)
+        self.targets = [{'server_id': 's1'}, {'server_id': 's2'},
+                        {'server_id': 's3'}]
+
+    def test_per_target_results(self):
+        self.client.post.return_value = {'targets': [
+            {'server_id': 's2', 'status': 409, 'error': 'Conflict'},
+            {'server_id': 's1', 'name': 'one'}]}
+        results = self.manager.add_targets('g1', self.targets)
+        self.assertEqual([True, False, False],
+                         [result.ok for result in results])
+        self.assertEqual('one', results[0].result['name'])
+        self.assertNotIn('status', results[0].result)
+        self.assertIsInstance(results[1].error, exc.HTTPClientError)
+        self.assertEqual(409, results[1].error.status_code)
+        self.assertIsNone(results[1].result)
+        self.assertIn('No result for target s3', str(results[2].error))
+
+    def test_status_coerced(self):
+        self.client.post.return_value = {'targets': [
+            {'server_id': 's1', 'status': None},
+            {'server_id': 's2', 'status': '404'},
+            {'server_id': 's3', 'status': 'bogus'}]}
+        results = self.manager.add_targets('g1', self.targets)
+        self.assertEqual([True, False, False],
+                         [result.ok for result in results])
+        self.assertEqual(404, results[1].error.status_code)
+        self.assertIn("Invalid status 'bogus' for target s3",
+                      str(results[2].error))
+
+    def test_remove_results(self):
+        self.client.post.return_value = {'removed': [
+            {'server_id': 's1', 'status': 204},
+            {'server_id': 's2', 'status': 404}]}
+        results = self.manager.remove_targets('g1', ['s1', 's2', 's3'])
+        self.assertEqual([True, False, False],
+                         [result.ok for result in results])
+
+    def test_405_falls_back_to_single_calls(self):
+        self.client.post.side_effect = [
+            exc.HTTPClientError('Method Not Allowed', 405),
+            {'targets': {'server_id': 's1'}}]
+        results = self.manager.add_targets('g1', self.targets[:1])
+        self.assertTrue(results[0].ok)
+        self.assertIs(False, self.manager._batch_supported)
+        self.client.post.assert_called_with('/gates/g1/targets',
+                                            data={'server_id': 's1'})
+
+    def test_404_of_existing_gate_falls_back(self):
+        self.client.post.side_effect = [
+            exc.HTTPClientError('Not Found', 404),
+            {'targets': {'server_id': 's1'}}]
+        self.client.get.return_value = {'gates': {'id': 'g1'}}
+        results = self.manager.add_targets('g1', self.targets[:1])
+        self.assertTrue(results[0].ok)
+        self.assertIs(False, self.manager._batch_supported)
+
+    def test_404_of_missing_gate_raises(self):
+        self.client.post.side_effect = exc.HTTPClientError('Not Found', 404)
+        self.client.get.side_effect = exc.HTTPClientError('Not Found', 404)
+        self.assertRaises(exc.HTTPClientError, self.manager.add_targets,
+                          'g1', self.targets)
+        self.assertIsNone(self.manager._batch_supported)
+
+    def test_404_once_batch_is_known_raises(self):
+        self.manager._batch_supported = True
+        self.client.post.side_effect = exc.HTTPClientError('Not Found', 404)
+        self.assertRaises(exc.HTTPClientError, self.manager.add_targets,
+                          'g1', self.targets)
+        self.assertFalse(self.client.get.called)
+        self.assertIs(True, self.manager._batch_supported)
+
+
+class ResolveTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ResolveTest, self).setUp()
+        self.client = mock.Mock(project_id='p1')
+        self.manager = gates.GatesManager(self.client)
+        self.iter_gates = mock.patch.object(self.manager, 'iter_gates').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _gates(self, all_projects=False):
+        return [{'id': 'g1', 'name': 'one'}] + (
+            [{'id': 'g2', 'name': 'two'}] if all_projects else [])
+
+    def test_index_per_project_and_all_projects(self):
+        self.iter_gates.side_effect = self._gates
+        self.assertEqual('g1', self.manager.resolve('one'))
+        self.assertEqual('two', self.manager.resolve('two'))
+        self.assertEqual('g2', self.manager.resolve('two', all_projects=True))
+        self.assertEqual('g1', self.manager.resolve('one'))
+        self.client.project_id = 'p2'
+        self.assertEqual('g1', self.manager.resolve('one'))
+        self.assertEqual([False, False, True, False],
+                         [call[1]['all_projects'] for call
+                          in self.iter_gates.call_args_list])
+
+    def test_create_invalidates_every_index(self):
+        self.iter_gates.side_effect = self._gates
+        self.manager.resolve('one')
+        self.manager.resolve('one', all_projects=True)
+        self.client.post.return_value = {'gates': {'id': 'g3'}}
+        self.manager.create(name='three')
+        self.manager.resolve('one')
+        self.manager.resolve('one', all_projects=True)
+        self.assertEqual(4, self.iter_gates.call_count)
+
+
+@mock.patch('time.sleep')
+class WaitForAllTest(testtools.TestCase):
+
+    def setUp(self):
+        super(WaitForAllTest, self).setUp()
+        self.manager = gates.GatesManager(mock.Mock())
+        self.iter_gates = mock.patch.object(self.manager, 'iter_gates').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_unlisted_gate_polled_again(self, sleep):
+        self.iter_gates.side_effect = [
+            [{'id': 'g1', 'status': 'ACTIVE'}],
+            [{'id': 'g1', 'status': 'ACTIVE'},
+             {'id': 'g2', 'status': 'ERROR'}]]
+        done = self.manager.wait_for_all(['g1', 'g2'])
+        self.assertEqual(['ACTIVE', 'ERROR'],
+                         [done[gate_id]['status'] for gate_id in ('g1', 'g2')])
+        self.assertEqual(2, self.iter_gates.call_count)
+
+    def test_unlisted_gate_deleted(self, sleep):
+        self.iter_gates.side_effect = [
+            [{'id': 'g1', 'status': 'DELETING'}], []]
+        self.assertEqual({'g1': None},
+                         self.manager.wait_for_all(['g1'], 'DELETED'))
+        self.assertEqual(2, self.iter_gates.call_count)
+
+
+class SelectTest(testtools.TestCase):
+
+    def _fetch(self, count):
+        pages = []
+
+        def fetch_page(marker, limit):
+            pages.append(limit)
+            start = 0 if marker is None else int(marker) + 1
+            return [{'id': str(i), 'status': 'ACTIVE' if i > 5 else 'DOWN'}
+                    for i in range(start, min(start + limit, count))]
+        return fetch_page, pages
+
+    def test_limit_shrinks_pages(self):
+        fetch_page, pages = self._fetch(20)
+        items = list(gates.GatesManager._select(
+            fetch_page, 10, 'id', False, None, None, 2))
+        self.assertEqual(['0', '1'], [item['id'] for item in items])
+        self.assertEqual([2], pages)
+
+    def test_limit_with_filters_keeps_page_size(self):
+        fetch_page, pages = self._fetch(20)
+        items = list(gates.GatesManager._select(
+            fetch_page, 10, 'id', False, {'status': 'ACTIVE'}, None, 1))
+        self.assertEqual(['6'], [item['id'] for item in items])
+        # The second page is prefetched.
+        self.assertEqual([10, 10], pages)
@@ -0,0 +1,63 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import testtools
+
+from knobclient.common import jsonstream
+
+
+def chunked(document, size):
+    data = document.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterArrayTest(testtools.TestCase):
+
+    items = [{'id': 'a', 'name': u'caf\xe9'}, {'id': 'b', 'tags': [1, 2]},
+             {'id': 'c', 'nested': {'list': [{'x': None}]}}]
+
+    def test_any_chunk_size(self):
+        document = json.dumps({'count': 3, 'gates': self.items,
+                               'next': None}, indent=1)
+        for size in (1, 2, 3, 7, 64, 100000):
+            self.assertEqual(self.items, list(jsonstream.iter_array(
+                chunked(document, size), 'gates')))
+
+    def test_top_level_array(self):
+        self.assertEqual(self.items, list(jsonstream.iter_array(
+            chunked(json.dumps(self.items), 5))))
+
+    def test_empty_array(self):
+        self.assertEqual([], list(jsonstream.iter_array(
+            chunked('{"gates": [ ]}', 4), 'gates')))
+
+    def test_missing_key(self):
+        for document in ('{}', '{"other": [1]}'):
+            self.assertRaises(KeyError, list, jsonstream.iter_array(
+                chunked(document, 3), 'gates'))
+
+    def test_truncated_document(self):
+        self.assertRaises(ValueError, list, jsonstream.iter_array(
+            chunked('{"gates": [{"id": "a"}, {"id"', 4), 'gates'))
+
+    def test_malformed_document(self):
+        self.assertRaises(ValueError, list, jsonstream.iter_array(
+            chunked('{"gates": [1 2]}', 4), 'gates'))
+
+    def test_items_are_yielded_as_they_arrive(self):
+        def chunks():
+            yield b'{"gates": [{"id": "a"}, '
+            raise AssertionError('read past the first item')
+        self.assertEqual({'id': 'a'},
+                         next(jsonstream.iter_array(chunks(), 'gates')))
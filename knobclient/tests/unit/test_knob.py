@@ -0,0 +1,53 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import subprocess
+import sys
+
+import mock
+import six
+import testtools
+
+import knobclient
+from knobclient import knob
+
+_IMPORTED = '''
+import sys
+import knobclient
+from knobclient import knob
+knob.Knob().build_option_parser('knob', None).parse_args(['--debug'])
+print(' '.join(sorted(sys.modules)))
+print('__version__' in vars(knobclient))
+'''
+
+
+class KnobTest(testtools.TestCase):
+
+    def test_heavy_modules_not_imported(self):
+        output = subprocess.check_output([sys.executable, '-c', _IMPORTED])
+        modules, version = output.decode('utf-8').splitlines()
+        modules = modules.split()
+        self.assertIn('knobclient.knob', modules)
+        self.assertNotIn('knobclient.client', modules)
+        self.assertEqual([], [module for module in modules
+                              if module.split('.')[0] == 'keystoneauth1'])
+        if sys.version_info >= (3, 7):
+            # The version is only resolved for --version.
+            self.assertEqual('False', version)
+
+    @mock.patch.object(knobclient, '__version__', '1.2.3', create=True)
+    @mock.patch('sys.stderr', new_callable=six.StringIO)
+    def test_version(self, stderr):
+        parser = knob.Knob().build_option_parser('knob', None)
+        e = self.assertRaises(SystemExit, parser.parse_args, ['--version'])
+        self.assertEqual(0, e.code)
+        self.assertEqual('%s 1.2.3\n' % parser.prog, stderr.getvalue())
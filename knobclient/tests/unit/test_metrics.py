@@ -0,0 +1,78 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+import shutil
+import tempfile
+
+import testtools
+
+from knobclient.common import metrics
+
+
+def make_timing(method='GET', url='/gates', elapsed=0.1, status=200):
+    timing = metrics.RequestTiming(method, url)
+    timing.status = status
+    timing.elapsed = elapsed
+    timing.add('wait', elapsed)
+    return timing
+
+
+class UrlTemplateTest(testtools.TestCase):
+
+    def test_url_template(self):
+        self.assertEqual('/gates', metrics.url_template('/gates?limit=10'))
+        self.assertEqual('/gates/{id}/targets/{id}',
+                         metrics.url_template('/gates/g1/targets/s1/'))
+        self.assertEqual('/gates/{id}/targets/batch',
+                         metrics.url_template('/gates/g1/targets/batch'))
+
+
+class LatencyHistogramTest(testtools.TestCase):
+
+    def test_percentiles(self):
+        histogram = metrics.LatencyHistogram(ratio=1.01)
+        for index in range(1, 101):
+            histogram.record(make_timing(url='/gates/%d' % index,
+                                         elapsed=index / 1000.0))
+        summary = histogram.summary()
+        self.assertEqual(['GET /gates/{id}'], list(summary))
+        latency = summary['GET /gates/{id}']['latency']
+        self.assertEqual(100, latency['count'])
+        self.assertEqual(0.1, latency['max'])
+        for percent in metrics.PERCENTILES:
+            exact = percent / 1000.0
+            value = latency['p%d' % percent]
+            self.assertTrue(exact <= value <= exact * 1.01,
+                            '%s not within 1%% of %s' % (value, exact))
+        self.assertEqual(['wait'], list(summary['GET /gates/{id}']['phases']))
+
+    def test_statuses_and_errors(self):
+        histogram = metrics.LatencyHistogram()
+        histogram.record(make_timing())
+        failed = make_timing(status=None)
+        failed.error = ValueError()
+        histogram.record(failed)
+        series = histogram.summary()['GET /gates']
+        self.assertEqual({'200': 1, 'None': 1}, series['statuses'])
+        self.assertEqual(1, series['errors'])
+
+    def test_write(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'metrics.json')
+        histogram = metrics.LatencyHistogram()
+        histogram.record(make_timing(method='POST'))
+        histogram.write(path)
+        with open(path) as f:
+            self.assertEqual(['POST /gates'], list(json.load(f)))
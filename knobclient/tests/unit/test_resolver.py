@@ -0,0 +1,77 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import testtools
+
+from knobclient.common import resolver
+from knobclient import exc
+
+UUID = '6f2c1c3e-8a44-4c47-9b7e-9f4b9a8b0c11'
+
+
+class NameResolverTest(testtools.TestCase):
+
+    def setUp(self):
+        super(NameResolverTest, self).setUp()
+        self.items = [{'id': 'id-web', 'name': 'web'},
+                      {'id': 'id-db1', 'name': 'db'},
+                      {'id': 'id-db2', 'name': 'db'},
+                      {'id': 'id-anon', 'name': None}]
+        self.list_func = mock.Mock(side_effect=lambda: self.items)
+        self.resolver = resolver.NameResolver(self.list_func, ttl=30)
+
+    def test_uuid_needs_no_listing(self):
+        self.assertEqual(UUID, self.resolver.resolve(UUID))
+        self.assertFalse(self.list_func.called)
+
+    def test_name_and_id(self):
+        self.assertEqual('id-web', self.resolver.resolve('web'))
+        self.assertEqual('id-anon', self.resolver.resolve('id-anon'))
+        self.assertEqual(1, self.list_func.call_count)
+
+    def test_ambiguous_name(self):
+        self.assertRaises(exc.NoUniqueMatch, self.resolver.resolve, 'db')
+
+    def test_unknown_name_returned_unchanged(self):
+        self.assertEqual('nope', self.resolver.resolve('nope'))
+
+    def test_unknown_name_refetches_index(self):
+        self.resolver.resolve('web')
+        self.items.append({'id': 'id-new', 'name': 'new'})
+        self.assertEqual('id-new', self.resolver.resolve('new'))
+        self.assertEqual(2, self.list_func.call_count)
+
+    @mock.patch('time.time')
+    def test_index_expires(self, time):
+        time.return_value = 100
+        self.resolver.resolve('web')
+        time.return_value = 129
+        self.resolver.resolve('web')
+        self.assertEqual(1, self.list_func.call_count)
+        time.return_value = 130
+        self.resolver.resolve('web')
+        self.assertEqual(2, self.list_func.call_count)
+
+    def test_invalidate(self):
+        self.resolver.resolve('web')
+        self.resolver.invalidate()
+        self.resolver.resolve('web')
+        self.assertEqual(2, self.list_func.call_count)
+
+    def test_resolve_all_lists_once(self):
+        self.assertEqual(['id-web', 'x', UUID, 'y', 'id-web'],
+                         self.resolver.resolve_all(
+                             ['web', 'x', UUID, 'y', 'web']))
+        self.assertEqual(1, self.list_func.call_count)
+        self.assertEqual(['x', 'y'], self.resolver.resolve_all(['x', 'y']))
+        self.assertEqual(2, self.list_func.call_count)
@@ -0,0 +1,133 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import mock
+import testtools
+
+from knobclient.common import retry
+
+
+class ParseRetryAfterTest(testtools.TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(2.5, retry.parse_retry_after('2.5'))
+        self.assertEqual(0.0, retry.parse_retry_after('-1'))
+
+    @mock.patch('time.time', return_value=784111767)
+    def test_date(self, time):
+        self.assertEqual(10, retry.parse_retry_after(
+            'Sun, 06 Nov 1994 08:49:37 GMT'))
+
+    def test_invalid(self):
+        self.assertIsNone(retry.parse_retry_after(None))
+        self.assertIsNone(retry.parse_retry_after('soon'))
+
+
+class RetryPolicyTest(testtools.TestCase):
+
+    def test_no_retries_by_default(self):
+        self.assertFalse(retry.RetryPolicy().should_retry('GET', 0))
+
+    def test_should_retry(self):
+        policy = retry.RetryPolicy(retries=2)
+        self.assertTrue(policy.should_retry('GET', 0))
+        self.assertTrue(policy.should_retry('get', 1, 503))
+        self.assertFalse(policy.should_retry('GET', 2, 503))
+        self.assertFalse(policy.should_retry('GET', 0, 404))
+        self.assertFalse(policy.should_retry('POST', 0))
+        self.assertFalse(policy.should_retry('POST', 0, 503))
+        self.assertTrue(policy.should_retry('POST', 0, 429))
+
+    @mock.patch('random.uniform', side_effect=lambda low, high: high)
+    def test_exponential_delay(self, uniform):
+        policy = retry.RetryPolicy(retries=5, backoff=0.5, max_backoff=3)
+        self.assertEqual([0.5, 1, 2, 3],
+                         [policy.delay(attempt) for attempt in range(4)])
+
+    def test_retry_after(self):
+        policy = retry.RetryPolicy(retries=1, max_backoff=30)
+        resp = mock.Mock(status_code=429, headers={'Retry-After': '7'})
+        self.assertEqual(7, policy.delay(0, resp))
+        resp.headers['Retry-After'] = '60'
+        self.assertEqual(30, policy.delay(0, resp))
+        self.assertEqual(2, policy.metrics['retry_after'])
+
+    def test_count_from_threads(self):
+        policy = retry.RetryPolicy()
+
+        def count():
+            for _i in range(1000):
+                policy.count('attempts')
+        threads = [threading.Thread(target=count) for _i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(4000, policy.metrics['attempts'])
+
+
+@mock.patch('time.time')
+class CircuitBreakerTest(testtools.TestCase):
+
+    def test_opens_after_threshold(self, time):
+        time.return_value = 100
+        breaker = retry.CircuitBreaker(2, reset_timeout=30)
+        self.assertFalse(breaker.record_failure())
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.record_failure())
+        self.assertEqual(breaker.OPEN, breaker.state)
+        self.assertFalse(breaker.allow())
+
+    def test_success_resets_failures(self, time):
+        time.return_value = 100
+        breaker = retry.CircuitBreaker(2)
+        breaker.record_failure()
+        breaker.record_success()
+        self.assertFalse(breaker.record_failure())
+        self.assertEqual(breaker.CLOSED, breaker.state)
+
+    def test_half_open_trial_success_closes(self, time):
+        time.return_value = 100
+        breaker = retry.CircuitBreaker(1, reset_timeout=30)
+        breaker.record_failure()
+        time.return_value = 130
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.HALF_OPEN, breaker.state)
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.CLOSED, breaker.state)
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_trial_failure_opens_again(self, time):
+        time.return_value = 100
+        breaker = retry.CircuitBreaker(3, reset_timeout=30)
+        for _i in range(3):
+            breaker.record_failure()
+        time.return_value = 130
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.record_failure())
+        self.assertEqual(breaker.OPEN, breaker.state)
+        time.return_value = 159
+        self.assertFalse(breaker.allow())
+
+    def test_released_trial_lets_another_through(self, time):
+        time.return_value = 100
+        breaker = retry.CircuitBreaker(1, reset_timeout=30)
+        breaker.record_failure()
+        time.return_value = 130
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.release()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.HALF_OPEN, breaker.state)
@@ -0,0 +1,95 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import base64
+import hashlib
+import os
+import shutil
+import struct
+import tempfile
+
+import testtools
+
+from knobclient.common import ssh_keys
+
+
+def make_blob(key_type, payload=b'\x00' * 32):
+    name = key_type.encode('ascii')
+    data = struct.pack('>I', len(name)) + name + payload
+    return base64.b64encode(data).decode('ascii')
+
+
+ED25519 = make_blob('ssh-ed25519')
+RSA = make_blob('ssh-rsa', b'\x01' * 64)
+
+
+class ParseTest(testtools.TestCase):
+
+    def test_public_key_line(self):
+        key = ssh_keys.parse('ssh-ed25519 %s alice@host\n' % ED25519,
+                             'id.pub:1')
+        self.assertEqual(('ssh-ed25519', ED25519, 'alice@host', 'id.pub:1'),
+                         tuple(key))
+        self.assertEqual('ssh-ed25519 %s alice@host' % ED25519, key.content)
+
+    def test_without_comment(self):
+        key = ssh_keys.parse('ssh-rsa %s' % RSA)
+        self.assertEqual('', key.comment)
+        self.assertEqual('ssh-rsa %s' % RSA, key.content)
+
+    def test_authorized_keys_options(self):
+        key = ssh_keys.parse(
+            'from="10.0.0.1",command="echo a b" ssh-ed25519 %s bob' % ED25519)
+        self.assertEqual('ssh-ed25519 %s bob' % ED25519, key.content)
+
+    def test_fingerprint(self):
+        digest = hashlib.sha256(base64.b64decode(ED25519)).digest()
+        expected = 'SHA256:' + base64.b64encode(digest).decode(
+            'ascii').rstrip('=')
+        self.assertEqual(expected,
+                         ssh_keys.parse('ssh-ed25519 ' + ED25519).fingerprint)
+
+    def test_invalid_keys(self):
+        for line in ('', 'not a key', 'ssh-ed25519',
+                     'ssh-ed25519 !!!notbase64!!!',
+                     'ssh-ed25519 %s' % RSA):
+            self.assertRaises(ssh_keys.InvalidKey, ssh_keys.parse, line)
+
+
+class ReadTest(testtools.TestCase):
+
+    def setUp(self):
+        super(ReadTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_file(self):
+        path = self._write('authorized_keys',
+                           '# comment\n\nssh-ed25519 %s a\nbroken\n' % ED25519)
+        keys = ssh_keys.read(path)
+        self.assertEqual(['%s:3' % path, '%s:4' % path],
+                         [source for source, _key in keys])
+        self.assertEqual('a', keys[0][1].comment)
+        self.assertIsInstance(keys[1][1], ssh_keys.InvalidKey)
+
+    def test_directory(self):
+        self._write('id_rsa', 'PRIVATE KEY')
+        self._write('b.pub', 'ssh-rsa %s b\n' % RSA)
+        self._write('a.pub', 'ssh-ed25519 %s a\n' % ED25519)
+        self.assertEqual(['a', 'b'], [key.comment for _source, key in
+                                      ssh_keys.read(self.directory)])
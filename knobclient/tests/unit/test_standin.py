@@ -0,0 +1,79 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import sys
+
+import requests
+import testtools
+
+from knobclient import client
+from knobclient import exc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir,
+                                os.pardir, os.pardir, 'tools'))
+import knob_standin  # noqa
+
+
+class KnobStandInTest(testtools.TestCase):
+    """Runs the client against tools/knob_standin.py in process."""
+
+    def setUp(self):
+        super(KnobStandInTest, self).setUp()
+        self.server = knob_standin.KnobStandIn().start()
+        self.addCleanup(self.server.stop)
+        self.knob = client.Client(endpoint=self.server.url, project_id='demo')
+        self.ids = [self.server.add_gate(name='gate-%d' % i)['id']
+                    for i in range(5)]
+
+    def test_list(self):
+        gates = self.knob.gates.list()
+        self.assertEqual(self.ids, [gate.id for gate in gates])
+        self.assertEqual('gate-0', gates[0].name)
+        self.assertEqual(1, self.server.requests['GET'])
+
+    def test_marker_and_limit(self):
+        gates = self.knob.gates.list(marker=self.ids[0], limit=2)
+        self.assertEqual(self.ids[1:3], [gate.id for gate in gates])
+        self.assertEqual([], self.knob.gates.list(marker=self.ids[-1]))
+
+    def test_paginate(self):
+        gates = list(self.knob.gates.iter_gates(page_size=2))
+        self.assertEqual(self.ids, [gate.id for gate in gates])
+        # Three pages, the last one short.
+        self.assertEqual(3, self.server.requests['GET'])
+
+    def test_get_target(self):
+        gates = self.knob.gates
+        gates.add_target(self.ids[0], server_id='s1', name='one')
+        target = gates.get_target(self.ids[0], 's1')
+        self.assertEqual(('s1', 'one'), (target.server_id, target.name))
+        e = self.assertRaises(exc.HTTPClientError, gates.get_target,
+                              self.ids[0], 's2')
+        self.assertEqual(404, e.status_code)
+
+    def test_etag_round_trip(self):
+        http = self.knob.gates.client
+        body, etag = http.get_if_changed('/gates')
+        self.assertEqual(self.ids, [gate['id'] for gate in body['gates']])
+        self.assertTrue(etag.startswith('"'))
+        self.assertEqual((None, etag), http.get_if_changed('/gates', etag))
+
+        url = self.server.url + '/v1/gates'
+        resp = requests.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(b'', resp.content)
+
+        self.server.add_gate(name='gate-5')
+        body, new_etag = http.get_if_changed('/gates', etag)
+        self.assertEqual(6, len(body['gates']))
+        self.assertNotEqual(etag, new_etag)
@@ -0,0 +1,75 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import testtools
+
+from knobclient.tests.unit import test_ssh_keys
+from knobclient.v1 import sync
+
+ED25519 = test_ssh_keys.ED25519
+RSA = test_ssh_keys.RSA
+
+
+class PlanTest(testtools.TestCase):
+
+    def setUp(self):
+        super(PlanTest, self).setUp()
+        self.state = sync.GateState(
+            'g1',
+            [{'server_id': 'keep', 'name': 'keep'},
+             {'server_id': 'old', 'name': 'old'}],
+            [{'id': 'k1', 'name': 'alice',
+              'key_content': 'ssh-ed25519 %s alice@laptop' % ED25519},
+             {'id': 'k2', 'name': 'gone',
+              'key_content': 'ssh-rsa %s gone' % RSA}])
+
+    def _summary(self, operations):
+        return sorted((op.action, op.item) for op in operations)
+
+    def test_in_sync(self):
+        self.assertEqual([], sync.plan(self.state, self.state.targets,
+                                       self.state.keys))
+
+    def test_none_leaves_alone(self):
+        self.assertEqual([], sync.plan(self.state, None, None))
+
+    def test_targets(self):
+        operations = sync.plan(
+            self.state,
+            [{'server_id': 'keep'}, {'server_id': 'new', 'name': 'n'}],
+            None)
+        self.assertEqual([('add_target', 'new'), ('remove_target', 'old')],
+                         self._summary(operations))
+        added = [op for op in operations if op.action == 'add_target'][0]
+        self.assertEqual({'server_id': 'new', 'name': 'n', 'gate_id': 'g1'},
+                         added.data)
+
+    def test_keys_match_on_fingerprint(self):
+        # Same key with another comment and name: nothing to change.
+        keys = [{'name': 'renamed',
+                 'key_content': 'ssh-ed25519 %s other comment' % ED25519}]
+        operations = sync.plan(self.state, None, keys)
+        self.assertEqual([('remove_key', 'gone')], self._summary(operations))
+        self.assertEqual({'id': 'k2'}, operations[0].data)
+
+    def test_add_key(self):
+        keys = self.state.keys + [{'name': 'bob',
+                                   'key_content': 'not parseable'}]
+        self.assertEqual([('add_key', 'bob')],
+                         self._summary(sync.plan(self.state, None, keys)))
+
+    def test_remove_unnamed_key(self):
+        state = sync.GateState('g1', [], [
+            {'id': 'k3', 'key_content': 'ssh-rsa %s' % RSA}])
+        operations = sync.plan(state, None, [])
+        self.assertEqual([('remove_key', 'k3')], self._summary(operations))
+        self.assertEqual({'id': 'k3'}, operations[0].data)
@@ -0,0 +1,152 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import testtools
+
+from knobclient.common import utils
+
+
+class FakeCollection(object):
+    """Marker/limit paginated collection, recording the pages asked for."""
+
+    def __init__(self, count, ignore_marker=False, iterators=False):
+        self.items = [{'id': '%03d' % i} for i in range(count)]
+        self.ignore_marker = ignore_marker
+        self.iterators = iterators
+        self.calls = []
+
+    def fetch_page(self, marker, limit):
+        self.calls.append(marker)
+        start = 0
+        if marker is not None and not self.ignore_marker:
+            start = [item['id'] for item in self.items].index(marker) + 1
+        page = self.items[start:start + limit]
+        return iter(page) if self.iterators else page
+
+
+class PaginateTest(testtools.TestCase):
+
+    def _ids(self, collection, **kwargs):
+        return [item['id'] for item in
+                utils.paginate(collection.fetch_page, **kwargs)]
+
+    def test_all_pages(self):
+        for prefetch in (True, False):
+            collection = FakeCollection(7)
+            self.assertEqual(
+                ['%03d' % i for i in range(7)],
+                self._ids(collection, page_size=3, prefetch=prefetch))
+            self.assertEqual([None, '002', '005'], collection.calls)
+
+    def test_exact_multiple_fetches_one_empty_page(self):
+        collection = FakeCollection(6)
+        self.assertEqual(6, len(self._ids(collection, page_size=3)))
+        self.assertEqual([None, '002', '005'], collection.calls)
+
+    def test_server_ignoring_marker(self):
+        for prefetch in (True, False):
+            collection = FakeCollection(6, ignore_marker=True)
+            self.assertEqual(
+                ['000', '001', '002'],
+                self._ids(collection, page_size=3, prefetch=prefetch))
+            self.assertEqual([None, '002'], collection.calls)
+
+    def test_server_ignoring_marker_iterator_pages(self):
+        collection = FakeCollection(6, ignore_marker=True, iterators=True)
+        self.assertEqual(
+            ['000', '001', '002'],
+            self._ids(collection, page_size=3, prefetch=False))
+
+    def test_server_ignoring_limit(self):
+        collection = FakeCollection(10)
+        collection.fetch_page = lambda marker, limit: collection.items
+        self.assertEqual(10, len(self._ids(collection, page_size=3)))
+
+    def test_marker_key(self):
+        items = [{'server_id': 'a'}, {'server_id': 'b'}]
+        pages = {None: items[:1], 'a': items[1:], 'b': []}
+
+        def fetch_page(marker, limit):
+            return pages[marker]
+        self.assertEqual(items, list(utils.paginate(
+            fetch_page, page_size=1, marker_key='server_id')))
+
+
+class SelectTest(testtools.TestCase):
+
+    items = [{'name': 'b', 'status': 'ACTIVE', 'size': 2},
+             {'name': 'a', 'status': 'ERROR', 'size': 10},
+             {'name': 'c', 'status': 'ACTIVE', 'size': 1}]
+
+    def test_nothing_to_do(self):
+        self.assertEqual(self.items, list(utils.select(self.items)))
+
+    def test_filters(self):
+        self.assertEqual(
+            ['b', 'c'],
+            [item['name'] for item in
+             utils.select(self.items, filters={'status': 'ACTIVE'})])
+
+    def test_filter_matches_string_value(self):
+        self.assertEqual(
+            ['a'],
+            [item['name'] for item in
+             utils.select(self.items, filters={'size': '10'})])
+
+    def test_sort(self):
+        self.assertEqual(
+            ['b', 'c', 'a'],
+            [item['name'] for item in utils.select(
+                self.items, sort=[('status', 'asc'), ('name', 'asc')])])
+        self.assertEqual(
+            ['a', 'b', 'c'],
+            [item['name'] for item in
+             utils.select(self.items, sort=[('size', 'desc')])])
+
+    def test_limit_is_lazy(self):
+        consumed = []
+
+        def items():
+            for item in self.items:
+                consumed.append(item)
+                yield item
+        self.assertEqual(
+            ['b'], [item['name'] for item in
+                    utils.select(items(), filters={'status': 'ACTIVE'},
+                                 limit=1)])
+        self.assertEqual(1, len(consumed))
+
+
+class IterConcurrentlyTest(testtools.TestCase):
+
+    def test_completion_order(self):
+        released = threading.Event()
+
+        def func(item):
+            if item == 'slow':
+                released.wait(5)
+            if item == 'bad':
+                raise ValueError(item)
+            return item.upper()
+        results = utils.iter_concurrently(func, ['slow', 'fast', 'bad'])
+        first = sorted([next(results), next(results)],
+                       key=lambda result: result.item)
+        self.assertEqual(['bad', 'fast'], [r.item for r in first])
+        self.assertIsInstance(first[0].error, ValueError)
+        self.assertEqual('FAST', first[1].result)
+        released.set()
+        self.assertEqual([('slow', 'SLOW', None)], list(results))
+
+    def test_no_items(self):
+        self.assertEqual([], list(utils.iter_concurrently(str, [])))
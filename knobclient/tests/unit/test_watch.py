@@ -0,0 +1,71 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from six.moves.urllib import parse
+import testtools
+
+from knobclient.common import watch
+
+
+class FakeClient(object):
+    """Serves a collection with ETags, optionally ignoring the marker."""
+
+    def __init__(self, items, ignore_marker=False):
+        self.items = items
+        self.ignore_marker = ignore_marker
+        self.urls = []
+
+    def get_if_changed(self, url, validator):
+        self.urls.append(url)
+        query = dict(parse.parse_qsl(url.split('?', 1)[1]))
+        start = 0
+        if 'marker' in query and not self.ignore_marker:
+            ids = [item['id'] for item in self.items]
+            start = ids.index(query['marker']) + 1
+        page = self.items[start:start + int(query['limit'])]
+        etag = repr(page)
+        if validator == etag:
+            return None, etag
+        return {'gates': page}, etag
+
+
+class CollectionWatcherTest(testtools.TestCase):
+
+    def setUp(self):
+        super(CollectionWatcherTest, self).setUp()
+        self.items = [{'id': str(i)} for i in range(4)]
+
+    def test_poll(self):
+        knob = FakeClient(self.items)
+        watcher = watch.CollectionWatcher(knob, '/gates', 'gates',
+                                          page_size=2)
+        self.assertEqual(self.items, watcher.poll())
+        self.assertEqual(3, len(knob.urls))
+        self.assertIsNone(watcher.poll())
+        self.items[3] = {'id': '3', 'name': 'changed'}
+        self.assertEqual(self.items, watcher.poll())
+
+    def test_server_ignoring_marker(self):
+        knob = FakeClient(self.items, ignore_marker=True)
+        watcher = watch.CollectionWatcher(knob, '/gates', 'gates',
+                                          page_size=2)
+        self.assertEqual(self.items[:2], watcher.poll())
+        self.assertEqual(2, len(knob.urls))
+        self.assertIsNone(watcher.poll())
+
+    def test_diff(self):
+        previous = [{'id': 'a'}, {'id': 'b', 'x': 1}, {'id': 'c'}]
+        current = [{'id': 'b', 'x': 2}, {'id': 'c'}, {'id': 'd'}]
+        self.assertEqual(
+            [(watch.CHANGED, {'id': 'b', 'x': 2}), (watch.ADDED, {'id': 'd'}),
+             (watch.REMOVED, {'id': 'a'})],
+            watch.diff(previous, current, 'id'))
@@ -9,13 +9,104 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import threading
+
 from six.moves.urllib import parse
 
+from knobclient.common import base
+from knobclient.common import resolver
 from knobclient.common import utils
-            
+from knobclient.common import watch
+from knobclient import exc as exceptions
+
+
+class Gate(base.Resource):
+    """A SSH gate.
+
+    Fields missing from a listing are fetched on first attribute access,
+    and `targets` lists the gate's targets on first access.
+    """
+
+    FIELDS = ('id', 'name', 'status', 'server_id', 'fip_id', 'port_id',
+              'tenant_id')
+    __slots__ = FIELDS + ('_targets',)
+
+    def _load_details(self):
+        self.update(self._manager.get(self['id']))
+
+    @property
+    def targets(self):
+        try:
+            return self._targets
+        except AttributeError:
+            self._targets = self._manager.list_targets(self['id'])
+            return self._targets
+
+
+class Target(base.Resource):
+    """A VM reachable through a gate."""
+
+    FIELDS = ('server_id', 'name', 'gate_id', 'routable')
+    __slots__ = FIELDS
+
+
+class Key(base.Resource):
+    """A public key authorized on a gate."""
+
+    FIELDS = ('id', 'name', 'gate_id', 'key_content', 'created_at')
+    __slots__ = FIELDS
+
+
+def _batch_records(items, keys, records):
+    """Pairs the items of a batch call with the server's record of each.
+
+    A record carries the `server_id` of its target and, when that target
+    failed, the HTTP `status` and an `error` message; a null status
+    means success.  Items the server sent no record for, or a status
+    that is not a number, count as failed.
+
+    :param items: items as sent
+    :param keys: target ID of each item
+    :param records: list of records from the response
+    :returns: list of (item, record, error) tuples, with either the
+        record or the error None
+    """
+    by_key = dict((record.get('server_id'), record)
+                  for record in records or ())
+    results = []
+    for item, key in zip(items, keys):
+        record = by_key.get(key)
+        if record is None:
+            results.append((item, None, exceptions.HTTPError(
+                'No result for target %s in batch response' % key)))
+            continue
+        record = dict(record)
+        status = record.pop('status', None)
+        message = record.pop('error', None)
+        try:
+            status = int(status or 200)
+        except (TypeError, ValueError):
+            results.append((item, None, exceptions.HTTPError(
+                'Invalid status %r for target %s in batch response'
+                % (status, key))))
+            continue
+        error = None
+        if status >= 400:
+            error_class = (exceptions.HTTPServerError if status >= 500
+                           else exceptions.HTTPClientError)
+            error = error_class(message or 'Target %s failed with status %s'
+                                % (key, status), status)
+            record = None
+        results.append((item, record, error))
+    return results
+
 
 class GatesManager(object):
 
+    # Pseudo-status to wait for until a gate is gone.
+    DELETED = 'DELETED'
+    FAILED_STATUSES = ('ERROR',)
+
     def __init__(self, client):
         """Initializes GatesManager with `client`.
 
@@ -23,12 +114,59 @@ class GatesManager(object):
         """
         super(GatesManager, self).__init__()
         self.client = client
-        
-    def list(self, **kwargs):
-        """Get a list of gates. """
+        # Unknown until the first batch call; False once the server has
+        # told us it has no batch endpoint.
+        self._batch_supported = None
+        # Name indexes of the gates and of the targets and keys of each
+        # gate, by project, kept for the life of the manager.
+        self._resolvers = {}
+        self._resolvers_lock = threading.Lock()
+
+    def list(self, stream=False, **kwargs):
+        """Get a list of gates.
+
+        :param stream: return an iterator decoding the gates one at a
+            time as they are received, instead of a list
+        """
         url = '/gates?%s' % parse.urlencode(kwargs)
+        if stream:
+            return (Gate(self, gate)
+                    for gate in self.client.get_stream(url, 'gates'))
         body = self.client.get(url)
-        return body['gates']
+        return [Gate(self, gate) for gate in body['gates']]
+
+    def iter_gates(self, page_size=utils.DEFAULT_PAGE_SIZE, stream=False,
+                   filters=None, fields=None, sort=None, limit=None,
+                   **kwargs):
+        """Iterate over gates, fetching them one page at a time.
+
+        :param page_size: number of gates requested per page
+        :param stream: decode each page as it is received, see `list`
+        :param filters: dict of field values the gates must have
+        :param fields: fields to fetch, all of them when None
+        :param sort: list of (field, direction) pairs to order by
+        :param limit: maximum number of gates
+
+        Filters and sort order are applied again to what the server
+        returns, for servers that ignore them, see
+        :func:`knobclient.common.utils.select`.
+        """
+        params = utils.list_params(kwargs, filters, fields, sort,
+                                   required_fields=('id',))
+
+        def fetch_page(marker, limit):
+            return self.list(stream=stream,
+                             **self._page_params(params, marker, limit))
+        return self._select(fetch_page, page_size, 'id', stream, filters,
+                            sort, limit)
+
+    def watch_gates(self, page_size=utils.DEFAULT_PAGE_SIZE, **kwargs):
+        """Returns a watcher polling the gate listing for changes.
+
+        :returns: :class:`knobclient.common.watch.CollectionWatcher`
+        """
+        return watch.CollectionWatcher(self.client, '/gates', 'gates',
+                                       params=kwargs, page_size=page_size)
 
     def get(self, gate_name):
         """Get the details for a specific gate.
@@ -36,43 +174,384 @@ class GatesManager(object):
         :param gate_id: ID of the gate
         """
         body = self.client.get('/gates/%s' % gate_name)
-        return body['gates']
+        return Gate(self, body['gates'], loaded=True)
 
     def create(self, **kwargs):
         """Create a gate."""
         body = self.client.post('/gates', data=kwargs)
-        return body['gates']
+        self._invalidate('gates')
+        return Gate(self, body['gates'], loaded=True)
+
+    def create_gates(self, gates, concurrency=utils.DEFAULT_CONCURRENCY,
+                     callback=None):
+        """Create several gates concurrently.
+
+        :param gates: list of dicts with the `create` fields
+        :param concurrency: maximum number of calls in flight
+        :param callback: called with each result as soon as it is done
+        :returns: list of :class:`knobclient.common.utils.ItemResult`
+        """
+        return utils.run_concurrently(
+            lambda gate: self.create(**gate), gates, concurrency,
+            callback=callback)
 
     def delete(self, gate_name):
         """Delete a gate."""
         self.client.delete("/gates/%s" % gate_name)
+        self._invalidate('gates')
+
+    def wait_for(self, gate, status='ACTIVE',
+                 timeout=utils.DEFAULT_WAIT_TIMEOUT,
+                 fail_statuses=FAILED_STATUSES):
+        """Wait until a gate reaches `status` or one of `fail_statuses`.
+
+        The gate is polled with exponential backoff and jitter, see
+        :func:`knobclient.common.utils.poll`.  A deleted gate is looked
+        for in the gate listing, as a GET of it fails once it is gone.
+
+        :param gate: ID of the gate
+        :param status: status to wait for, DELETED for the gate to be gone
+        :param timeout: seconds after which to give up
+        :returns: the gate, or None once it is deleted
+        :raises knobclient.exc.WaitTimeout: when `timeout` passes first
+        """
+        if status == self.DELETED:
+            return self.wait_for_all([gate], status, timeout,
+                                     fail_statuses)[gate]
+
+        def check():
+            current = self.get(gate)
+            return (current.get('status') in (status,) + tuple(fail_statuses),
+                    current)
+        return utils.poll(check, timeout)
+
+    def wait_for_all(self, gates, status='ACTIVE',
+                     timeout=utils.DEFAULT_WAIT_TIMEOUT,
+                     fail_statuses=FAILED_STATUSES):
+        """Wait for several gates at once, with one listing per poll.
+
+        A gate that is not listed is done when waiting for DELETED; for
+        any other status it is polled again, as a new gate may not be
+        listed yet.
+
+        :param gates: IDs of the gates
+        :returns: dict of gate ID to gate, None for deleted ones
+        :raises knobclient.exc.WaitTimeout: when `timeout` passes first
+        """
+        pending = set(gates)
+        done = {}
+
+        def check():
+            listed = dict((gate['id'], gate) for gate in self.iter_gates())
+            for gate_id in list(pending):
+                gate = listed.get(gate_id)
+                if gate is None:
+                    finished = status == self.DELETED
+                else:
+                    finished = gate.get('status') in (
+                        (status,) + tuple(fail_statuses))
+                if finished:
+                    done[gate_id] = gate
+                    pending.discard(gate_id)
+            return not pending, done
+        try:
+            return utils.poll(check, timeout)
+        except exceptions.WaitTimeout:
+            raise exceptions.WaitTimeout(
+                'Gates not %s after %s seconds: %s'
+                % (status, timeout, ', '.join(sorted(pending))))
 
     def add_target(self, gate, **kwargs):
         """Add target VM to list of allowed targets on gate"""
         body = self.client.post("/gates/%s/targets" % gate, data=kwargs)
-        return body['targets']
+        self._invalidate('targets', gate)
+        return Target(self, body['targets'])
         
+    def get_target(self, gate_id, target_id):
+        """Get the details of a target on gate.
+
+        :param target_id: server ID of the target
+        """
+        body = self.client.get('/gates/%s/targets/%s' % (gate_id, target_id))
+        return Target(self, body['targets'])
+
     def remove_target(self, gate_id, target_id):
         """Delete a target from gate."""
         self.client.delete("/gates/%s/targets/%s" % (gate_id, target_id))
+        self._invalidate('targets', gate_id)
+
+    def add_targets(self, gate, targets,
+                    concurrency=utils.DEFAULT_CONCURRENCY):
+        """Add several target VMs to gate.
+
+        Uses the batch endpoint when the server provides one and falls
+        back to concurrent single-target calls otherwise.
+
+        :param gate: ID of the gate
+        :param targets: list of dicts with the `add_target` fields
+        :param concurrency: maximum number of calls in flight on fallback
+        :returns: list of :class:`knobclient.common.utils.ItemResult`
+        """
+        targets = list(targets)
+        body = self._batch(gate, {'add': targets})
+        if body is not None:
+            return [
+                utils.ItemResult(
+                    target, None if record is None else Target(self, record),
+                    error)
+                for target, record, error in _batch_records(
+                    targets, [target['server_id'] for target in targets],
+                    body.get('targets'))]
+        return utils.run_concurrently(
+            lambda target: self.add_target(gate, **target),
+            targets, concurrency)
+
+    def remove_targets(self, gate, target_ids,
+                       concurrency=utils.DEFAULT_CONCURRENCY):
+        """Delete several targets from gate.
+
+        :param gate: ID of the gate
+        :param target_ids: list of target IDs
+        :param concurrency: maximum number of calls in flight on fallback
+        :returns: list of :class:`knobclient.common.utils.ItemResult`
+        """
+        target_ids = list(target_ids)
+        body = self._batch(gate, {'remove': target_ids})
+        if body is not None:
+            return [utils.ItemResult(target_id, None, error)
+                    for target_id, _record, error in _batch_records(
+                        target_ids, target_ids, body.get('removed'))]
+        return utils.run_concurrently(
+            lambda target_id: self.remove_target(gate, target_id),
+            target_ids, concurrency)
+
+    def _batch(self, gate, data):
+        """Post to the batch targets endpoint, None if it does not exist.
+
+        The response has a record for each target added in `targets` and
+        for each one removed in `removed`, see `_batch_records`.
+        """
+        if self._batch_supported is False:
+            return None
+        try:
+            body = self.client.post("/gates/%s/targets/batch" % gate,
+                                    data=data)
+        except exceptions.HTTPClientError as e:
+            if e.status_code == 404 and self._batch_supported is None:
+                # Either there is no batch endpoint or no such gate; a
+                # missing gate raises its own 404 here.
+                self.get(gate)
+            elif e.status_code != 405:
+                raise
+            self._batch_supported = False
+            return None
+        self._batch_supported = True
+        self._invalidate('targets', gate)
+        return body
         
-    def list_targets(self, gate, **kwargs):
-        """Get a list of targets on gate. """
+    def list_targets(self, gate, stream=False, **kwargs):
+        """Get a list of targets on gate.
+
+        :param stream: return an iterator decoding the targets one at a
+            time as they are received, instead of a list
+        """
         url = '/gates/%s/targets?%s' % (gate, parse.urlencode(kwargs))
+        if stream:
+            return (Target(self, target)
+                    for target in self.client.get_stream(url, 'targets'))
         body = self.client.get(url)
-        return body['targets']
+        return [Target(self, target) for target in body['targets']]
     
+    def iter_targets(self, gate, page_size=utils.DEFAULT_PAGE_SIZE,
+                     stream=False, filters=None, fields=None, sort=None,
+                     limit=None, **kwargs):
+        """Iterate over targets on gate, fetching them one page at a time.
+
+        :param page_size: number of targets requested per page
+        :param stream: decode each page as it is received
+        :param filters: dict of field values the targets must have
+        :param fields: fields to fetch, all of them when None
+        :param sort: list of (field, direction) pairs to order by
+        :param limit: maximum number of targets
+
+        Filters and sort order are applied again to what the server
+        returns, for servers that ignore them, see
+        :func:`knobclient.common.utils.select`.
+        """
+        params = utils.list_params(kwargs, filters, fields, sort,
+                                   required_fields=('server_id',))
+
+        def fetch_page(marker, limit):
+            return self.list_targets(
+                gate, stream=stream,
+                **self._page_params(params, marker, limit))
+        return self._select(fetch_page, page_size, 'server_id', stream,
+                            filters, sort, limit)
+
+    def watch_targets(self, gate, page_size=utils.DEFAULT_PAGE_SIZE,
+                      **kwargs):
+        """Returns a watcher polling the targets on gate for changes.
+
+        :returns: :class:`knobclient.common.watch.CollectionWatcher`
+        """
+        return watch.CollectionWatcher(
+            self.client, '/gates/%s/targets' % gate, 'targets',
+            marker_key='server_id', params=kwargs, page_size=page_size)
+
     def add_key(self, gate, **kwargs):
         """Add an authorized key to keys on gate"""
         body = self.client.post("/gates/%s/keys" % gate, data=kwargs)
-        return body['keys']
+        self._invalidate('keys', gate)
+        return Key(self, body['keys'])
         
+    def add_keys(self, gate, keys, concurrency=utils.DEFAULT_CONCURRENCY):
+        """Add several authorized keys to gate concurrently.
+
+        :param gate: ID of the gate
+        :param keys: list of dicts with the `add_key` fields
+        :param concurrency: maximum number of calls in flight
+        :returns: list of :class:`knobclient.common.utils.ItemResult`
+        """
+        return utils.run_concurrently(
+            lambda key: self.add_key(gate, **key), keys, concurrency)
+
     def remove_key(self, gate_id, key):
         """Delete an authorized key from gate."""
         self.client.delete("/gates/%s/keys/%s" % (gate_id, key))
+        self._invalidate('keys', gate_id)
         
-    def list_keys(self, gate_id, **kwargs):
-        """Get a list of authorized keys on gate. """
+    def list_keys(self, gate_id, stream=False, **kwargs):
+        """Get a list of authorized keys on gate.
+
+        :param stream: return an iterator decoding the keys one at a time
+            as they are received, instead of a list
+        """
         url = '/gates/%s/keys?%s' % (gate_id, parse.urlencode(kwargs))
+        if stream:
+            return (Key(self, key)
+                    for key in self.client.get_stream(url, 'keys'))
         body = self.client.get(url)
-        return body['keys']
\ No newline at end of file
+        return [Key(self, key) for key in body['keys']]
+
+    def iter_keys(self, gate_id, page_size=utils.DEFAULT_PAGE_SIZE,
+                  stream=False, filters=None, fields=None, sort=None,
+                  limit=None, **kwargs):
+        """Iterate over authorized keys on gate, one page at a time.
+
+        :param page_size: number of keys requested per page
+        :param stream: decode each page as it is received
+        :param filters: dict of field values the keys must have
+        :param fields: fields to fetch, all of them when None
+        :param sort: list of (field, direction) pairs to order by
+        :param limit: maximum number of keys
+
+        Filters and sort order are applied again to what the server
+        returns, for servers that ignore them, see
+        :func:`knobclient.common.utils.select`.
+        """
+        params = utils.list_params(kwargs, filters, fields, sort,
+                                   required_fields=('id',))
+
+        def fetch_page(marker, limit):
+            return self.list_keys(
+                gate_id, stream=stream,
+                **self._page_params(params, marker, limit))
+        return self._select(fetch_page, page_size, 'id', stream, filters,
+                            sort, limit)
+
+    def watch_keys(self, gate_id, page_size=utils.DEFAULT_PAGE_SIZE,
+                   **kwargs):
+        """Returns a watcher polling the keys on gate for changes.
+
+        :returns: :class:`knobclient.common.watch.CollectionWatcher`
+        """
+        return watch.CollectionWatcher(
+            self.client, '/gates/%s/keys' % gate_id, 'keys', params=kwargs,
+            page_size=page_size)
+
+    def resolve(self, gate, all_projects=False):
+        """Returns the ID of the gate named or identified by `gate`.
+
+        Names are looked up in an index of the gate listing, see
+        :class:`knobclient.common.resolver.NameResolver`.
+
+        :param all_projects: look the name up among the gates of all
+            projects (admin only)
+        :raises knobclient.exc.NoUniqueMatch: when several gates have the
+            name `gate`
+        """
+        return self._gate_resolver(all_projects).resolve(gate)
+
+    def resolve_all(self, gates, all_projects=False):
+        """Returns the IDs of several gates, see `resolve`.
+
+        The gates are listed at most once for all of them.
+        """
+        return self._gate_resolver(all_projects).resolve_all(gates)
+
+    def _gate_resolver(self, all_projects):
+        return self._resolver(
+            'gates', None,
+            lambda: self.iter_gates(all_projects=all_projects),
+            all_projects=all_projects)
+
+    def resolve_target(self, gate_id, target):
+        """Returns the server ID of the target named or identified by
+        `target` on gate.
+
+        :raises knobclient.exc.NoUniqueMatch: when several targets have
+            the name `target`
+        """
+        return self._resolver(
+            'targets', gate_id, lambda: self.iter_targets(gate_id),
+            id_key='server_id').resolve(target)
+
+    def resolve_key(self, gate_id, key):
+        """Returns the ID of the key named or identified by `key` on gate.
+
+        :raises knobclient.exc.NoUniqueMatch: when several keys have the
+            name `key`
+        """
+        return self._resolver(
+            'keys', gate_id, lambda: self.iter_keys(gate_id)).resolve(key)
+
+    def _resolver(self, kind, gate_id, list_func, id_key='id',
+                  all_projects=False):
+        # An index holds what one project sees, the gates of all projects
+        # being another listing than those of the project.
+        key = (kind, gate_id, self.client.project_id, all_projects)
+        with self._resolvers_lock:
+            found = self._resolvers.get(key)
+            if found is None:
+                found = resolver.NameResolver(list_func, id_key=id_key)
+                self._resolvers[key] = found
+            return found
+
+    def _invalidate(self, kind, gate_id=None):
+        with self._resolvers_lock:
+            found = [value for key, value in self._resolvers.items()
+                     if key[:2] == (kind, gate_id)]
+        for value in found:
+            value.invalidate()
+
+    @staticmethod
+    def _select(fetch_page, page_size, marker_key, stream, filters, sort,
+                limit):
+        prefetch = not stream
+        # Without a client-side filter or sort the pages after the limit
+        # are not needed, so neither asking for more nor prefetching them
+        # helps.  Filtered rows are not counted, they may take any number
+        # of pages.
+        if limit is not None and not (filters or sort):
+            page_size = max(1, min(page_size, limit))
+            prefetch = False
+        items = utils.paginate(fetch_page, page_size, marker_key=marker_key,
+                               prefetch=prefetch)
+        return utils.select(items, filters, sort, limit)
+
+    @staticmethod
+    def _page_params(params, marker, limit):
+        params = dict(params, limit=limit)
+        if marker is not None:
+            params['marker'] = marker
+        return params
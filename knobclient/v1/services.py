@@ -12,6 +12,16 @@
 
 from six.moves.urllib import parse
 
+from knobclient.common import base
+from knobclient.common import utils
+
+
+class SshService(base.Resource):
+    """A SSH service endpoint."""
+
+    FIELDS = ('id', 'name', 'tenant_id', 'project_id', 'status')
+    __slots__ = FIELDS
+
 
 class ServiceManager(object):
 
@@ -23,8 +33,18 @@ class ServiceManager(object):
         super(ServiceManager, self).__init__()
         self.client = client
         
-    def list(self, **kwargs):
-        """Get a list of gates."""
+    def list(self, filters=None, fields=None, sort=None, limit=None,
+             **kwargs):
+        """Get a list of ssh services.
+
+        :param filters: dict of field values the services must have
+        :param fields: fields to fetch, all of them when None
+        :param sort: list of (field, direction) pairs to order by
+        :param limit: maximum number of services
+
+        Filters and sort order are applied again to what the server
+        returns, see :func:`knobclient.common.utils.select`.
+        """
         params = {}
         if kwargs.get('index'):
             params['index'] = kwargs['index']
@@ -32,7 +52,50 @@ class ServiceManager(object):
             params['type'] = kwargs['type']
         if kwargs.get('all_projects') is not None:
             params['all_projects'] = kwargs['all_projects']
+        params = utils.list_params(params, filters, fields, sort)
+        if limit is not None:
+            params['limit'] = limit
         url = '/ssh_services?%s' % parse.urlencode(params, True)
         body = self.client.get(url)
-        return body
+        return list(utils.select((SshService(self, service)
+                                  for service in body),
+                                 filters, sort, limit))
+
+    def list_regions(self, regions=None, timeout=None,
+                     concurrency=utils.DEFAULT_CONCURRENCY, **kwargs):
+        """Get the ssh services of several regions at once.
+
+        Every region is queried concurrently over the same session; a
+        region that fails or times out does not affect the others.
+
+        :param regions: region names, all catalog regions when None
+        :param timeout: request timeout for each region, in seconds
+        :returns: list of :class:`knobclient.common.utils.ItemResult` with
+            the region name as item and its services as result
+        :raises ValueError: when the client has an endpoint override
+        """
+        regions, list_region = self._region_lister(regions, timeout, kwargs)
+        return utils.run_concurrently(list_region, regions, concurrency)
+
+    def iter_regions(self, regions=None, timeout=None,
+                     concurrency=utils.DEFAULT_CONCURRENCY, **kwargs):
+        """Like :meth:`list_regions`, yielding each region when it is done.
+
+        :returns: iterator of :class:`knobclient.common.utils.ItemResult`,
+            in the order the regions answer
+        :raises ValueError: when the client has an endpoint override
+        """
+        regions, list_region = self._region_lister(regions, timeout, kwargs)
+        return utils.iter_concurrently(list_region, regions, concurrency)
+
+    def _region_lister(self, regions, timeout, kwargs):
+        if regions is None:
+            regions = self.client.regions()
+        # Bound up front, so that a client that cannot be bound to other
+        # regions fails as a whole rather than region by region.
+        clients = dict((region, self.client.for_region(region, timeout))
+                       for region in regions)
 
+        def list_region(region):
+            return ServiceManager(clients[region]).list(**kwargs)
+        return regions, list_region
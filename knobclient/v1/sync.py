@@ -0,0 +1,129 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Reconciliation of the targets and keys of gates with a desired state.
+
+Syncing is done in three steps: :func:`fetch` the current state of the
+gates, :func:`plan` the operations that turn it into the desired state,
+and :func:`apply` them.
+"""
+
+import collections
+
+from knobclient.common import ssh_keys
+from knobclient.common import utils
+
+
+class GateState(collections.namedtuple('GateState',
+                                       ['gate_id', 'targets', 'keys'])):
+    """Targets and keys of a gate, both as lists of API records."""
+
+
+class Operation(collections.namedtuple('Operation',
+                                       ['gate_id', 'action', 'item',
+                                        'data'])):
+    """One call to make on a :class:`knobclient.v1.gates.GatesManager`.
+
+    `action` is one of add_target, remove_target, add_key and remove_key,
+    `item` the server ID or key name it is about, the key ID for a key
+    without a name, and `data` its fields.
+    """
+
+
+def fetch(gates, gate_ids, concurrency=utils.DEFAULT_CONCURRENCY):
+    """Lists the targets and keys of every gate, gates concurrently.
+
+    :param gates: :class:`knobclient.v1.gates.GatesManager`
+    :returns: list of :class:`knobclient.common.utils.ItemResult` with the
+        gate ID as item and its :class:`GateState` as result
+    """
+    def fetch_gate(gate_id):
+        return GateState(gate_id, list(gates.iter_targets(gate_id)),
+                         list(gates.iter_keys(gate_id)))
+    return utils.run_concurrently(fetch_gate, gate_ids, concurrency)
+
+
+def _key_identity(key_content):
+    """Keys are the same when their fingerprints are."""
+    try:
+        return ssh_keys.parse(key_content).fingerprint
+    except ssh_keys.InvalidKey:
+        return key_content.strip()
+
+
+def plan(state, targets, keys):
+    """Returns the operations turning `state` into the desired state.
+
+    Targets are matched on their server ID and keys on their fingerprint;
+    as neither can be updated in place, matching ones are left alone.
+
+    :param state: current :class:`GateState`
+    :param targets: desired targets, as dicts of `add_target` fields, or
+        None to leave the targets alone
+    :param keys: desired keys, as dicts of `add_key` fields, or None to
+        leave the keys alone
+    :returns: list of :class:`Operation`
+    """
+    gate_id = state.gate_id
+    operations = []
+
+    if targets is not None:
+        current = dict((target['server_id'], target)
+                       for target in state.targets)
+        desired = dict((target['server_id'], target) for target in targets)
+        for server_id, target in desired.items():
+            if server_id not in current:
+                operations.append(Operation(gate_id, 'add_target', server_id,
+                                            dict(target, gate_id=gate_id)))
+        for server_id in current:
+            if server_id not in desired:
+                operations.append(Operation(gate_id, 'remove_target',
+                                            server_id, None))
+
+    if keys is not None:
+        current = dict((_key_identity(key.get('key_content', '')), key)
+                       for key in state.keys)
+        desired = dict((_key_identity(key['key_content']), key)
+                       for key in keys)
+        for identity, key in desired.items():
+            if identity not in current:
+                operations.append(Operation(gate_id, 'add_key', key['name'],
+                                            key))
+        for identity, key in current.items():
+            if identity not in desired:
+                operations.append(Operation(
+                    gate_id, 'remove_key', key.get('name') or key['id'],
+                    {'id': key['id']}))
+    return operations
+
+
+def apply(gates, operations, concurrency=utils.DEFAULT_CONCURRENCY,
+          rate=None):
+    """Makes the calls of `operations` concurrently.
+
+    :param gates: :class:`knobclient.v1.gates.GatesManager`
+    :param rate: maximum number of calls started per second, if any
+    :returns: list of :class:`knobclient.common.utils.ItemResult` with the
+        :class:`Operation` as item
+    """
+    def call(operation):
+        if operation.action == 'add_target':
+            return gates.add_target(operation.gate_id, **operation.data)
+        if operation.action == 'remove_target':
+            return gates.remove_target(operation.gate_id, operation.item)
+        if operation.action == 'add_key':
+            return gates.add_key(operation.gate_id, **operation.data)
+        if operation.action == 'remove_key':
+            return gates.remove_key(operation.gate_id,
+                                    operation.data['id'])
+        raise ValueError('Unknown operation %s' % operation.action)
+    return utils.run_concurrently(call, operations, concurrency, rate=rate)
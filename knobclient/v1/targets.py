@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from knobclient.common import utils
+
+
 class TargetsManager(object):
 
     def __init__(self, client):
@@ -24,5 +27,18 @@ class TargetsManager(object):
         """generate config for target."""
         body = self.client.post('/target_config', data=kwargs)
         return body['config']
-    
-        
+
+    def generate_configs(self, target_ids,
+                         concurrency=utils.DEFAULT_CONCURRENCY, **kwargs):
+        """Generate configs for several targets concurrently.
+
+        :param target_ids: IDs of the targets
+        :param concurrency: maximum number of requests in flight
+        :param kwargs: `generate_config` fields shared by all targets
+        :returns: list of :class:`knobclient.common.utils.ItemResult` with
+            the target ID as item and its config as result
+        """
+        return utils.run_concurrently(
+            lambda target_id: self.generate_config(target_id=target_id,
+                                                   **kwargs),
+            target_ids, concurrency)
@@ -0,0 +1,57 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compares sequential Client calls with concurrent AsyncClient calls.
+
+Usage: python tools/bench_async_client.py [calls] [latency-seconds]
+"""
+
+import asyncio
+import sys
+import time
+
+from knob_standin import KnobStandIn
+
+from knobclient import aio
+from knobclient import client
+
+
+def main(argv):
+    calls = int(argv[0]) if argv else 200
+    latency = float(argv[1]) if len(argv) > 1 else 0.02
+    server = KnobStandIn(latency=latency).start()
+    gate = server.add_gate(name='bench')
+    kwargs = {'endpoint': server.url, 'project_id': 'demo'}
+    try:
+        knob = client.Client(**kwargs)
+        start = time.time()
+        for _i in range(calls):
+            knob.gates.list_targets(gate['id'])
+        sync_time = time.time() - start
+
+        async def run():
+            async with aio.AsyncClient(**kwargs) as knob:
+                start = time.time()
+                await asyncio.gather(*[knob.gates.list_targets(gate['id'])
+                                       for _i in range(calls)])
+                return time.time() - start
+        async_time = asyncio.run(run())
+    finally:
+        server.stop()
+
+    print('%d calls, %.0f ms server latency' % (calls, latency * 1000))
+    print('Client       %8.3f s' % sync_time)
+    print('AsyncClient  %8.3f s' % async_time)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,92 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Bytes on the wire and latency with and without compression.
+
+An admin gate listing, a batch of targets added in one request and the
+SSH configs of a few targets are run against the stand-in server, over
+an unlimited link and over links slowed down to WAN bandwidths.  Bytes
+are those of the request and response bodies as sent; headers are left
+out.
+
+Usage: python tools/bench_compression.py [gates]
+"""
+
+import sys
+import time
+import uuid
+
+from knob_standin import KnobStandIn
+
+from knobclient import client
+
+# Link bandwidths in bytes per second, None for unlimited.
+BANDWIDTHS = (('unlimited', None), ('50 Mbit/s', 50e6 / 8),
+              ('10 Mbit/s', 10e6 / 8))
+
+
+def list_gates(knob, gate_id):
+    return sum(1 for _gate in knob.gates.iter_gates(page_size=1000))
+
+
+def add_targets(knob, gate_id):
+    targets = [{'gate_id': gate_id, 'server_id': str(uuid.uuid4()),
+                'name': 'target-%d' % i, 'routable': True}
+               for i in range(1000)]
+    return len(knob.gates.add_targets(gate_id, targets))
+
+
+def ssh_configs(knob, gate_id):
+    target_ids = [str(uuid.uuid4()) for _i in range(20)]
+    return len(knob.targets.generate_configs(
+        target_ids, gate_id=gate_id, gate_key_file='~/.ssh/gate',
+        user='ubuntu', target_key_file='~/.ssh/target'))
+
+
+def measure(server, compression, operation):
+    knob = client.Client(endpoint=server.url, project_id='demo',
+                         compression=compression)
+    gate_id = next(iter(server.gates))
+    server.traffic.clear()
+    start = time.time()
+    operation(knob, gate_id)
+    elapsed = time.time() - start
+    return (server.traffic['received'], server.traffic['sent'],
+            elapsed)
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 5000
+    server = KnobStandIn().start()
+    try:
+        for i in range(count):
+            server.add_gate(name='gate-%d' % i)
+        print('%-10s %-12s %-5s %10s %10s %9s'
+              % ('link', 'operation', 'gzip', 'sent KB', 'recv KB',
+                 'seconds'))
+        for link, bandwidth in BANDWIDTHS:
+            server.bandwidth = bandwidth
+            for name, operation in (('list gates', list_gates),
+                                    ('add targets', add_targets),
+                                    ('ssh configs', ssh_configs)):
+                for compression in (False, True):
+                    received, sent, elapsed = measure(server, compression,
+                                                      operation)
+                    print('%-10s %-12s %-5s %10.1f %10.1f %9.3f'
+                          % (link, name, 'on' if compression else 'off',
+                             received / 1e3, sent / 1e3, elapsed))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
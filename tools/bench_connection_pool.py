@@ -0,0 +1,65 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Connections opened and throughput of a client shared by many threads.
+
+Every connection the stand-in server accepts is a TCP (and, against a TLS
+endpoint, TLS) handshake, so fewer connections for the same requests means
+connections were reused rather than discarded.
+
+Usage: python tools/bench_connection_pool.py [threads] [requests/thread]
+"""
+
+from concurrent import futures
+import sys
+import time
+
+from knob_standin import KnobStandIn
+
+from knobclient import client
+
+
+def run(server, threads, calls, **pool_kwargs):
+    knob = client.Client(endpoint=server.url, project_id='demo',
+                         **pool_kwargs)
+    gate = server.add_gate(name='bench')
+
+    def worker(_i):
+        for _j in range(calls):
+            knob.gates.get(gate['id'])
+
+    before = server.connections
+    start = time.time()
+    with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    elapsed = time.time() - start
+    return server.connections - before, threads * calls / elapsed
+
+
+def main(argv):
+    threads = int(argv[0]) if argv else 64
+    calls = int(argv[1]) if len(argv) > 1 else 20
+    server = KnobStandIn(latency=0.02).start()
+    try:
+        print('%d threads x %d requests' % (threads, calls))
+        for name, kwargs in (('default pool', {}),
+                             ('pool_maxsize=%d' % threads,
+                              {'pool_maxsize': threads})):
+            connections, throughput = run(server, threads, calls, **kwargs)
+            print('%-18s %6d connections %8.0f requests/s'
+                  % (name, connections, throughput))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measures the client-side overhead of one _HTTPClient call.
+
+The session returns a canned response, so only header handling, status
+checking and decoding are timed.  The per-call header rebuild the client
+used before the precomputed templates is kept here as the baseline.
+
+Usage: python tools/bench_http_pipeline.py [calls]
+"""
+
+import os
+import sys
+import timeit
+
+from keystoneauth1 import session as ks_session
+import requests
+
+from knobclient import client
+
+
+class _CannedSession(ks_session.Session):
+
+    def __init__(self, body):
+        super(_CannedSession, self).__init__()
+        self._resp = requests.Response()
+        self._resp.status_code = 200
+        self._resp._content = body
+        self._resp.headers['Content-Type'] = 'application/json'
+
+    def request(self, url, method, **kwargs):
+        return self._resp
+
+
+class _PerCallHeaders(client._HTTPClient):
+    """Rebuilds the headers from the environment on every call."""
+
+    def get(self, *args, **kwargs):
+        headers = kwargs.setdefault('headers', {})
+        headers.setdefault('Content-Type', 'application/json')
+        headers.setdefault('Accept', 'application/json')
+        headers.setdefault('X-Project-Name', os.environ['OS_PROJECT_NAME'])
+        headers.setdefault('X-User-Name', os.environ['OS_USERNAME'])
+        headers.setdefault('X-User-Domain-Id',
+                           os.environ['OS_USER_DOMAIN_ID'])
+        headers.setdefault('X-Project-Domain-Id',
+                           os.environ['OS_PROJECT_DOMAIN_ID'])
+        return self.request(*args, method='GET', **kwargs).json()
+
+
+def main(argv):
+    calls = int(argv[0]) if argv else 20000
+    for name in ('OS_PROJECT_NAME', 'OS_USERNAME', 'OS_USER_DOMAIN_ID',
+                 'OS_PROJECT_DOMAIN_ID'):
+        os.environ.setdefault(name, 'bench')
+    session = _CannedSession(b'{"gates": {"id": "g1", "name": "bench"}}')
+    kwargs = {'endpoint': 'http://knob.invalid', 'project_id': 'demo'}
+
+    for name, cls in (('per-call headers', _PerCallHeaders),
+                      ('header templates', client._HTTPClient)):
+        http = cls(session, **kwargs)
+        best = min(timeit.repeat(lambda: http.get('/gates/g1'),
+                                 number=calls, repeat=5))
+        print('%-18s %7.2f us/call' % (name, best / calls * 1e6))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,92 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compares the JSON codecs on gate and target payloads.
+
+Each installed codec decodes a page of gates and a page of targets from
+bytes, as received, and encodes a batch of targets, as posted.
+jsonutils, which the client used before codecs, is the baseline.  Times
+are the best of several runs.
+
+Usage: python tools/bench_json_codec.py [items]
+"""
+
+import sys
+import timeit
+import uuid
+
+from oslo_serialization import jsonutils
+
+from knobclient.common import codec
+
+REPEAT = 5
+
+
+def gates(count):
+    return {'gates': [{'id': str(uuid.uuid4()), 'name': 'gate-%d' % i,
+                       'status': 'ACTIVE', 'server_id': str(uuid.uuid4()),
+                       'fip_id': str(uuid.uuid4()),
+                       'port_id': str(uuid.uuid4()), 'tenant_id': 'demo'}
+                      for i in range(count)]}
+
+
+def targets(count):
+    gate_id = str(uuid.uuid4())
+    return {'targets': [{'server_id': str(uuid.uuid4()),
+                         'name': 'target-%d' % i, 'gate_id': gate_id,
+                         'routable': bool(i % 2)}
+                        for i in range(count)]}
+
+
+class _Jsonutils(codec.Codec):
+
+    name = 'jsonutils'
+
+    def dumps(self, obj):
+        return jsonutils.dumps(obj).encode('utf-8')
+
+    def loads(self, content):
+        return jsonutils.loads(content)
+
+
+def best(func, number):
+    return min(timeit.repeat(func, number=number, repeat=REPEAT)) / number
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 1000
+    codecs = [_Jsonutils()]
+    for name in codec.CODECS:
+        try:
+            codecs.append(codec.get_codec(name))
+        except ValueError as e:
+            print('skipped: %s' % e)
+    payloads = (('decode gates', gates(count)),
+                ('decode targets', targets(count)),
+                ('encode targets', targets(count)))
+    number = max(1, 20000 // count)
+    print('%d items per payload, ms per call' % count)
+    print('%-16s' % '' + ''.join('%11s' % c.name for c in codecs))
+    for label, payload in payloads:
+        content = jsonutils.dumps(payload).encode('utf-8')
+        times = []
+        for c in codecs:
+            if label.startswith('decode'):
+                times.append(best(lambda: c.loads(content), number))
+            else:
+                times.append(best(lambda: c.dumps(payload), number))
+        row = ''.join('%11.3f' % (t * 1e3) for t in times)
+        print('%-16s' % label + row)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,80 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Memory held by decoded gates, as plain dicts and as Gate resources.
+
+A gate listing is decoded from JSON and either kept as is or turned into
+Gate objects; tracemalloc reports what stays allocated once the decoded
+dicts are dropped.  Records with a field Gate does not know show the cost
+of the overflow dict.
+
+Usage: python tools/bench_resources.py [gates]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+
+from knobclient.v1 import gates
+
+
+def listing(count, unknown_field):
+    records = []
+    for i in range(count):
+        record = {'id': str(uuid.uuid4()), 'name': 'gate-%d' % i,
+                  'status': 'ACTIVE', 'server_id': str(uuid.uuid4()),
+                  'fip_id': str(uuid.uuid4()), 'port_id': str(uuid.uuid4()),
+                  'tenant_id': 'demo'}
+        if unknown_field:
+            record['zone'] = 'nova'
+        records.append(record)
+    return json.dumps({'gates': records})
+
+
+def held(body, convert):
+    """Returns bytes held by the converted listing and seconds taken.
+
+    The time comes from a separate untraced run, as tracemalloc slows
+    allocation down.
+    """
+    start = time.time()
+    convert(json.loads(body)['gates'])
+    elapsed = time.time() - start
+
+    tracemalloc.start()
+    items = convert(json.loads(body)['gates'])
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size, elapsed
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 100000
+    print('%d gates' % count)
+    for unknown_field in (False, True):
+        body = listing(count, unknown_field)
+        print('%s:' % ('one unknown field' if unknown_field
+                       else 'known fields only'))
+        for name, convert in (
+                ('dict', lambda records: records),
+                ('Gate', lambda records: [gates.Gate(None, record)
+                                          for record in records])):
+            size, elapsed = held(body, convert)
+            print('  %-5s %8.1f MB %6d bytes/gate %6.2fs'
+                  % (name, size / 1e6, size // count, elapsed))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
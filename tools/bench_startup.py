@@ -0,0 +1,78 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tracks knob CLI startup with `python -X importtime`.
+
+Two scenarios run in fresh interpreters: `knob help`, and building the
+client for a password-authenticated command (no request is sent).  For
+each the total import time and the slowest top-level imports are printed.
+
+Usage: python tools/bench_startup.py [runs] [top]
+"""
+
+import os
+import subprocess
+import sys
+
+SCENARIOS = (
+    ('knob help', """
+import sys
+from knobclient import knob
+sys.stdout = open(__import__('os').devnull, 'w')
+knob.main(['help'])
+"""),
+    ('authenticated command', """
+from knobclient import knob
+app = knob.Knob()
+args = app.parser.parse_args([
+    '--os-auth-url', 'http://keystone.invalid/v3', '--os-username', 'demo',
+    '--os-password', 'secret', '--os-project-name', 'demo',
+    '--os-project-domain-id', 'default', '--os-user-domain-id', 'default',
+    '--os-identity-api-version', '3', '--no-token-cache'])
+app.create_client(args)
+"""),
+)
+
+
+def import_times(code):
+    """Returns {module: (self_us, cumulative_us)} for one interpreter."""
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            env=dict(os.environ, PYTHONWARNINGS='ignore'))
+    _out, err = proc.communicate()
+    times = {}
+    for line in err.decode('utf-8', 'replace').splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented below the one that triggered them.
+        times[name.rstrip()[1:]] = (int(self_us), int(cumulative))
+    return times
+
+
+def main(argv):
+    runs = int(argv[0]) if argv else 5
+    top = int(argv[1]) if len(argv) > 1 else 8
+    for name, code in SCENARIOS:
+        samples = [import_times(code) for _i in range(runs)]
+        best = min(samples, key=lambda t: sum(s for s, _c in t.values()))
+        total = sum(s for s, _c in best.values())
+        print('%s: %.1f ms in %d modules (best of %d)'
+              % (name, total / 1000.0, len(best), runs))
+        roots = [(c, n) for n, (_s, c) in best.items()
+                 if not n.startswith(' ')]
+        for cumulative, module in sorted(roots, reverse=True)[:top]:
+            print('  %8.1f ms  %s' % (cumulative / 1000.0, module))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Peak memory of listing a large collection, decoded whole or streamed.
+
+The stand-in server holds the gates in this process; each listing runs in
+a fresh interpreter whose peak RSS, above what it had once imported, is
+reported (Linux only, read from /proc).  The gates are counted and
+dropped as they arrive, as a caller printing or filtering them would.
+
+Usage: python tools/bench_stream_decode.py [gates ...]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from knob_standin import KnobStandIn
+
+CHILD = """
+import json, sys, time
+from knobclient import client
+
+def peak_kb():
+    # VmHWM, unlike ru_maxrss, does not carry over the RSS of the parent
+    # this interpreter was forked from.
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+
+knob = client.Client(endpoint=sys.argv[1], project_id='demo')
+base = peak_kb()
+start = time.time()
+count = sum(1 for _gate in knob.gates.list(stream=sys.argv[2] == 'stream'))
+elapsed = time.time() - start
+print(json.dumps({'count': count, 'elapsed': elapsed,
+                  'rss_kb': peak_kb() - base}))
+"""
+
+
+def measure(url, mode):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root] + sys.path))
+    out = subprocess.check_output([sys.executable, '-c', CHILD, url, mode],
+                                  env=env)
+    return json.loads(out.decode('utf-8'))
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10000, 100000]
+    server = KnobStandIn().start()
+    try:
+        print('%8s %-7s %10s %12s %9s'
+              % ('gates', 'mode', 'body MB', 'peak RSS MB', 'seconds'))
+        for size in sizes:
+            while len(server.gates) < size:
+                server.add_gate(name='gate-%d' % len(server.gates))
+            body = len(json.dumps({'gates': list(server.gates.values())}))
+            for mode in ('list', 'stream'):
+                result = measure(server.url, mode)
+                assert result['count'] == size
+                print('%8d %-7s %10.1f %12.1f %9.2f'
+                      % (size, mode, body / 1e6, result['rss_kb'] / 1024.0,
+                         result['elapsed']))
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
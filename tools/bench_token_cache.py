@@ -0,0 +1,72 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Compares cold and warm token cache knob invocations.
+
+Each invocation builds the CLI client with password authentication, lists
+gates and saves the token cache, like one `knob` run in a shell script.
+
+Usage: python tools/bench_token_cache.py [invocations] [latency-seconds]
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+
+from knob_standin import KnobStandIn
+
+from knobclient import knob
+
+
+def invoke(server, cache_dir, extra=()):
+    app = knob.Knob()
+    parser = app.build_option_parser('knob', '0')
+    args = parser.parse_args([
+        '--os-auth-url', server.auth_url, '--os-identity-api-version', '3',
+        '--os-username', 'demo', '--os-password', 'secret',
+        '--os-project-name', 'demo', '--os-project-domain-id', 'default',
+        '--os-user-domain-id', 'default',
+        '--token-cache-dir', cache_dir] + list(extra))
+    app.create_client(args).gates.list()
+    app.clean_up(None, 0, None)
+
+
+def main(argv):
+    runs = int(argv[0]) if argv else 20
+    latency = float(argv[1]) if len(argv) > 1 else 0.05
+    server = KnobStandIn(latency=latency).start()
+    cache_dir = tempfile.mkdtemp()
+    try:
+        results = []
+        for name, extra in (('cold (--no-token-cache)', ['--no-token-cache']),
+                            ('warm (token cache)', [])):
+            invoke(server, cache_dir, extra)
+            before = dict(server.requests)
+            start = time.time()
+            for _i in range(runs):
+                invoke(server, cache_dir, extra)
+            elapsed = (time.time() - start) / runs
+            requests = sum(server.requests.values()) - sum(before.values())
+            results.append((name, elapsed, float(requests) / runs))
+    finally:
+        server.stop()
+        shutil.rmtree(cache_dir)
+
+    print('%d invocations, %.0f ms server latency' % (runs, latency * 1000))
+    for name, elapsed, requests in results:
+        print('%-24s %7.1f ms/invocation %5.1f requests/invocation'
+              % (name, elapsed * 1000, requests))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,310 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process stand-in for the Knob API.
+
+Serves the v1 gate, target, key, ssh_services and target_config resources
+from memory so the client can be exercised without a deployment.  A
+minimal keystone v3 token API under /identity/v3 returns a catalog that
+points at the stand-in.  Responses are gzip or deflate encoded when the
+client accepts it, gzip request bodies are understood, and `bandwidth`
+(bytes per second) slows bodies down as a WAN link would:
+
+    server = KnobStandIn(latency=0.01).start()
+    knob = client.Client(endpoint=server.url, project_id='demo')
+    ...
+    server.stop()
+"""
+
+import collections
+import datetime
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+import zlib
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib import parse
+
+
+class _Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        with self.server.standin.lock:
+            self.server.standin.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self, method):
+        standin = self.server.standin
+        url = parse.urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        with standin.lock:
+            standin.requests[method] += 1
+            standin.traffic['received'] += len(body)
+        if standin.latency:
+            time.sleep(standin.latency)
+        standin.transfer(len(body))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        status, payload, headers = standin.handle(
+            method, url.path, parse.parse_qs(url.query), body, self.headers)
+        data = json.dumps(payload).encode('utf-8')
+        if method == 'GET' and status == 200:
+            headers['ETag'] = '"%s"' % hashlib.md5(data).hexdigest()
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                status, data = 304, b''
+        encoding = _encoding(self.headers.get('Accept-Encoding'))
+        if encoding and data:
+            headers['Content-Encoding'] = encoding
+            data = _ENCODERS[encoding](data)
+        with standin.lock:
+            standin.traffic['sent'] += len(data)
+        standin.transfer(len(data))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+
+def _gzip(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+_ENCODERS = {'gzip': _gzip, 'deflate': zlib.compress}
+
+
+def _encoding(accept_encoding):
+    """Returns the first response encoding accepted that is supported."""
+    for value in (accept_encoding or '').split(','):
+        encoding = value.split(';')[0].strip()
+        if encoding in _ENCODERS:
+            return encoding
+    return None
+
+
+def _error(status, title, description=None):
+    return status, {'title': title, 'description': description}, {}
+
+
+def _page(items, query, marker_key):
+    """Applies marker/limit pagination and field selection to a list of
+    items; other filters are ignored, as by servers without support for
+    them."""
+    items = list(items)
+    if 'marker' in query:
+        markers = [item[marker_key] for item in items]
+        marker = query['marker'][0]
+        items = items[markers.index(marker) + 1:] if marker in markers else []
+    if 'limit' in query:
+        items = items[:int(query['limit'][0])]
+    if 'fields' in query:
+        fields = query['fields'][0].split(',')
+        items = [dict((field, item[field]) for field in fields
+                      if field in item) for item in items]
+    return items
+
+
+class KnobStandIn(object):
+    """Threaded HTTP server holding gates, targets and keys in memory."""
+
+    def __init__(self, latency=0, host='127.0.0.1', port=0,
+                 regions=('RegionOne',), bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        # Body bytes received and sent, as they were on the wire.
+        self.traffic = collections.Counter()
+        self.regions = list(regions)
+        self.lock = threading.Lock()
+        self.requests = collections.Counter()
+        self.connections = 0
+        self.gates = collections.OrderedDict()
+        self.targets = collections.defaultdict(collections.OrderedDict)
+        self.keys = collections.defaultdict(collections.OrderedDict)
+        self.services = []
+        self._server = _Server((host, port), _Handler)
+        self._server.standin = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def transfer(self, size):
+        """Waits for `size` bytes to go through the link."""
+        if self.bandwidth and size:
+            time.sleep(float(size) / self.bandwidth)
+
+    def add_gate(self, **fields):
+        gate = {'id': str(uuid.uuid4()), 'server_id': str(uuid.uuid4()),
+                'fip_id': str(uuid.uuid4()), 'port_id': str(uuid.uuid4()),
+                'tenant_id': 'demo', 'status': 'ACTIVE'}
+        gate.update(fields)
+        with self.lock:
+            self.gates[gate['id']] = gate
+        return gate
+
+    @property
+    def auth_url(self):
+        return self.url + '/identity/v3'
+
+    def _token(self):
+        now = datetime.datetime.utcnow()
+        expires = now + datetime.timedelta(hours=1)
+        domain = {'id': 'default', 'name': 'Default'}
+        endpoints = [{'id': 'knob-public-%s' % region, 'interface': 'public',
+                      'region': region, 'region_id': region,
+                      'url': self.url + '/v1'} for region in self.regions]
+        token = {'token': {
+            'methods': ['password'],
+            'issued_at': now.strftime('%Y-%m-%dT%H:%M:%S.000000Z'),
+            'expires_at': expires.strftime('%Y-%m-%dT%H:%M:%S.000000Z'),
+            'user': {'id': 'demo', 'name': 'demo', 'domain': domain},
+            'project': {'id': 'demo', 'name': 'demo', 'domain': domain},
+            'catalog': [{'id': 'knob', 'type': 'ssh', 'name': 'knob',
+                         'endpoints': endpoints}],
+        }}
+        return 201, token, {'X-Subject-Token': uuid.uuid4().hex}
+
+    def handle(self, method, path, query, body, headers):
+        if path == '/identity/v3/auth/tokens' and method == 'POST':
+            with self.lock:
+                self.requests['auth'] += 1
+            return self._token()
+        match = re.match(r'^/v1/(?P<coll>[a-z_]+)'
+                         r'(?:/(?P<id>[^/]+))?'
+                         r'(?:/(?P<sub>targets|keys))?'
+                         r'(?:/(?P<sub_id>[^/]+))?/?$', path)
+        if not match:
+            return _error(404, 'Not Found', path)
+        data = json.loads(body.decode('utf-8')) if body else {}
+        with self.lock:
+            return self._route(method, match.groupdict(), query, data)
+
+    def _route(self, method, parts, query, data):
+        coll, gate_id = parts['coll'], parts['id']
+        sub, sub_id = parts['sub'], parts['sub_id']
+        if coll == 'ssh_services' and method == 'GET':
+            return 200, self.services, {}
+        if coll == 'target_config' and method == 'POST':
+            config = ('Host gate-%(gate_id)s\n'
+                      '    HostName 203.0.113.10\n'
+                      '    User knob\n'
+                      '    IdentityFile %(gate_key_file)s\n'
+                      '\n'
+                      'Host %(target_id)s\n'
+                      '    User %(user)s\n'
+                      '    IdentityFile %(target_key_file)s\n'
+                      '    ProxyJump gate-%(gate_id)s\n' % data)
+            return 200, {'config': config}, {}
+        if coll != 'gates':
+            return _error(404, 'Not Found', coll)
+
+        if gate_id is None:
+            if method == 'GET':
+                gates = _page(self.gates.values(), query, 'id')
+                return 200, {'gates': gates}, {}
+            if method == 'POST':
+                gate = dict(data, id=str(uuid.uuid4()), status='ACTIVE')
+                self.gates[gate['id']] = gate
+                return 200, {'gates': gate}, {}
+            return _error(405, 'Method Not Allowed')
+
+        if gate_id not in self.gates:
+            return _error(404, 'Not Found', 'Gate %s' % gate_id)
+        if sub is None:
+            if method == 'GET':
+                return 200, {'gates': self.gates[gate_id]}, {}
+            if method == 'DELETE':
+                del self.gates[gate_id]
+                self.targets.pop(gate_id, None)
+                self.keys.pop(gate_id, None)
+                return 200, {}, {}
+            return _error(405, 'Method Not Allowed')
+
+        items = (self.targets if sub == 'targets' else self.keys)[gate_id]
+        if sub == 'targets' and sub_id == 'batch' and method == 'POST':
+            added = []
+            for target in data.get('add', []):
+                item = dict(target, gate_id=gate_id)
+                items[item['server_id']] = item
+                added.append(item)
+            removed = []
+            for server_id in data.get('remove', []):
+                found = items.pop(server_id, None) is not None
+                removed.append({'server_id': server_id,
+                                'status': 204 if found else 404})
+            return 200, {'targets': added, 'removed': removed}, {}
+        if sub_id is None:
+            if method == 'GET':
+                marker_key = 'id' if sub == 'keys' else 'server_id'
+                return 200, {sub: _page(items.values(), query,
+                                        marker_key)}, {}
+            if method == 'POST':
+                item = dict(data, gate_id=gate_id)
+                if sub == 'keys':
+                    item.setdefault('id', str(uuid.uuid4()))
+                    item.setdefault('created_at', time.strftime(
+                        '%Y-%m-%dT%H:%M:%S'))
+                item_id = item['id'] if sub == 'keys' else item['server_id']
+                items[item_id] = item
+                return 200, {sub: item}, {}
+            return _error(405, 'Method Not Allowed')
+        return self._route_item(method, sub, items, sub_id)
+
+    @staticmethod
+    def _route_item(method, sub, items, item_id):
+        if item_id not in items:
+            return _error(404, 'Not Found', item_id)
+        if method == 'GET':
+            return 200, {sub: items[item_id]}, {}
+        if method == 'DELETE':
+            del items[item_id]
+            return 200, {}, {}
+        return _error(405, 'Method Not Allowed')